@@ -0,0 +1,173 @@
+"""Booking-storm benchmark: many members press "Book" on one class at once.
+
+Seeds a single class and ``--clients`` members with the factories from
+``tests/factories.py``, logs every member in, then releases all client
+threads through a barrier so their ``POST /bookings/book/<id>/`` requests
+hit ``BookingCreateView`` at the same moment. Requests run through the full
+middleware stack via the Django test client, each thread on its own
+database connection.
+
+Reports throughput, request latency percentiles, the time spent waiting
+on the class row (the seat reservation ``UPDATE`` or any ``FOR UPDATE``
+lock) and integrity violations, which must all be zero.
+
+Usage (against a local PostgreSQL configured via the DB_* env vars)::
+
+    python -m benchmarks.booking_storm --clients 300 --capacity 50 --output storm.json
+"""
+import argparse
+import sys
+import threading
+import time
+
+from benchmarks.common import (
+    benchmark_database,
+    result_envelope,
+    setup_django,
+    summarise_ms,
+    write_results,
+)
+
+
+def _is_lock_contended(sql):
+    """Return whether ``sql`` can wait on the gym class row lock."""
+    return ('UPDATE "classes_gymclass"' in sql) or ('FOR UPDATE' in sql)
+
+
+class _LockWaitTimer:
+    """``execute_wrapper`` accumulating time spent on row-lock statements."""
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        if not _is_lock_contended(sql):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+
+
+def _seed(clients, capacity):
+    from django.test import Client
+    from django.utils import timezone
+
+    from tests.factories import make_gym_class, make_user
+
+    gym_class = make_gym_class(
+        max_capacity=capacity,
+        scheduled_at=timezone.now() + timezone.timedelta(days=1),
+    )
+    logged_in = []
+    for _ in range(clients):
+        client = Client()
+        client.force_login(make_user())
+        logged_in.append(client)
+    return gym_class, logged_in
+
+
+def _storm(gym_class, clients):
+    from django.db import connection, connections
+    from django.urls import reverse
+
+    url = reverse('booking-create', kwargs={'class_id': gym_class.pk})
+    success_url = reverse('booking-list')
+    barrier = threading.Barrier(len(clients) + 1)
+    samples = [None] * len(clients)
+
+    def run(index, client):
+        timer = _LockWaitTimer()
+        try:
+            barrier.wait()
+            started = time.perf_counter()
+            with connection.execute_wrapper(timer):
+                response = client.post(url)
+            elapsed = time.perf_counter() - started
+            if response.status_code == 302 and response.url == success_url:
+                outcome = 'booked'
+            elif response.status_code == 302:
+                outcome = 'rejected'
+            else:
+                outcome = f'http_{response.status_code}'
+            samples[index] = (elapsed, timer.seconds, outcome)
+        except Exception as exc:  # reported in the results rather than aborting the storm
+            samples[index] = (None, timer.seconds, f'error_{type(exc).__name__}')
+        finally:
+            connections.close_all()
+
+    threads = [
+        threading.Thread(target=run, args=(index, client))
+        for index, client in enumerate(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    wall_started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - wall_started, samples
+
+
+def _violations(gym_class):
+    from django.db.models import Count
+
+    from src.bookings.models import Booking
+
+    gym_class.refresh_from_db()
+    booked = Booking.objects.filter(gym_class=gym_class).count()
+    duplicates = (
+        Booking.objects.filter(gym_class=gym_class)
+        .values('member')
+        .annotate(total=Count('pk'))
+        .filter(total__gt=1)
+        .count()
+    )
+    return {
+        'over_capacity': max(booked - gym_class.max_capacity, 0),
+        'duplicates': duplicates,
+        'counter_drift': abs(gym_class.booked_count - booked),
+    }, booked
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=200, help='Concurrent members (default: 200).')
+    parser.add_argument('--capacity', type=int, default=50, help='Class capacity (default: 50).')
+    parser.add_argument('--output', help='Write JSON results to this file instead of stdout.')
+    parser.add_argument('--keepdb', action='store_true', help='Reuse the test database between runs.')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    results = result_envelope('booking_storm', {'clients': args.clients, 'capacity': args.capacity})
+
+    with benchmark_database(keepdb=args.keepdb):
+        gym_class, clients = _seed(args.clients, args.capacity)
+        wall_seconds, samples = _storm(gym_class, clients)
+        violations, booked = _violations(gym_class)
+
+    outcomes = {}
+    for _, _, outcome in samples:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    latencies = [elapsed for elapsed, _, _ in samples if elapsed is not None]
+    results.update({
+        'wall_time_s': round(wall_seconds, 3),
+        'throughput_rps': round(len(latencies) / wall_seconds, 1) if wall_seconds else None,
+        'latency_ms': summarise_ms(latencies),
+        'lock_wait_ms': summarise_ms([waited for _, waited, _ in samples]),
+        'outcomes': outcomes,
+        'bookings_created': booked,
+        'violations': violations,
+    })
+    write_results(results, args.output)
+
+    expected = min(args.clients, args.capacity)
+    if any(violations.values()) or booked != expected:
+        print(f'Integrity check failed: {violations}, {booked} booked (expected {expected}).', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Shared helpers for the benchmark scripts.
+
+The benchmarks run against the database configured through the usual
+``DB_*`` environment variables, but always inside a throwaway test
+database so they never touch real data.
+"""
+import json
+import math
+import os
+import subprocess
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def setup_django():
+    """Configure Django for a standalone script run from any directory."""
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def benchmark_database(keepdb=False):
+    """Create the test database (and test environment) for the duration of a run."""
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    if connection.vendor != 'postgresql':
+        raise SystemExit('Benchmarks must run against PostgreSQL (check the DB_* settings).')
+
+    setup_test_environment()
+    # Seeding hundreds of members with the production hasher would dominate the run.
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def percentile(samples, pct):
+    """Return the nearest-rank percentile of ``samples`` (``pct`` in 0-100)."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarise_ms(samples):
+    """Summarise durations given in seconds as milliseconds."""
+    if not samples:
+        return {'count': 0}
+    return {
+        'count': len(samples),
+        'total': round(sum(samples) * 1000, 3),
+        'mean': round(sum(samples) / len(samples) * 1000, 3),
+        'p50': round(percentile(samples, 50) * 1000, 3),
+        'p95': round(percentile(samples, 95) * 1000, 3),
+        'p99': round(percentile(samples, 99) * 1000, 3),
+        'max': round(max(samples) * 1000, 3),
+    }
+
+
+def git_revision():
+    """Return the current commit hash, or ``None`` outside a git checkout."""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True,
+            text=True,
+            cwd=PROJECT_ROOT,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def result_envelope(name, parameters):
+    """Return the metadata shared by every benchmark result document."""
+    return {
+        'benchmark': name,
+        'revision': git_revision(),
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'parameters': parameters,
+    }
+
+
+def write_results(results, output=None):
+    """Write ``results`` as JSON to ``output`` (a path) or stdout."""
+    payload = json.dumps(results, indent=2, sort_keys=True)
+    if output:
+        Path(output).write_text(payload + '\n')
+    else:
+        print(payload)
@@ -0,0 +1,133 @@
+"""Per-request cost of opening database connections versus reusing them.
+
+Runs the same sequential stream of ``GET /classes/<id>/`` requests in one
+process per connection mode, each configured through the same environment
+variables production uses:
+
+* ``per_request`` -- ``DB_CONN_MAX_AGE=0``: a new connection for every request.
+* ``persistent`` -- ``DB_CONN_MAX_AGE=60`` with health checks.
+* ``pool`` -- ``DB_POOL=True``: a psycopg 3 connection pool.
+
+Requests go straight through Django's WSGI handler, so the
+``request_started`` / ``request_finished`` signals close or keep the
+connection exactly as they do under Gunicorn. The page cache is disabled
+so every request reads the class from the database.
+
+Usage (against a local PostgreSQL configured via the DB_* env vars)::
+
+    python -m benchmarks.db_connections --requests 500 --output connections.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import (
+    PROJECT_ROOT,
+    benchmark_database,
+    result_envelope,
+    setup_django,
+    summarise_ms,
+    write_results,
+)
+
+MODES = {
+    'per_request': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'False'},
+    'persistent': {'DB_CONN_MAX_AGE': '60', 'DB_CONN_HEALTH_CHECKS': 'True', 'DB_POOL': 'False'},
+    'pool': {'DB_POOL': 'True'},
+}
+
+
+def _wsgi_get(handler, path):
+    from wsgiref.util import setup_testing_defaults
+
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'HTTP_HOST': 'localhost'}
+    setup_testing_defaults(environ)
+    statuses = []
+    response = handler(environ, lambda status, headers: statuses.append(status))
+    try:
+        b''.join(response)
+    finally:
+        response.close()  # fires request_finished, as a WSGI server would
+    return statuses[0]
+
+
+def _measure(requests, warmup):
+    """Time ``requests`` page loads in this process; return latencies in seconds."""
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.urls import reverse
+
+    from tests.factories import make_gym_class
+
+    handler = WSGIHandler()
+    path = reverse('class-detail', kwargs={'pk': make_gym_class().pk})
+    for _ in range(warmup):
+        _wsgi_get(handler, path)
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        status = _wsgi_get(handler, path)
+        latencies.append(time.perf_counter() - started)
+        if not status.startswith('200'):
+            raise SystemExit(f'Unexpected response: {status}')
+    return latencies
+
+
+def _run_child(mode, requests, warmup, keepdb):
+    """Run one mode in a fresh interpreter, since DATABASES is read at startup."""
+    env = {**os.environ, **MODES[mode], 'CATALOGUE_CACHE_TIMEOUT': '0'}
+    result = subprocess.run(
+        [
+            sys.executable, '-m', 'benchmarks.db_connections',
+            '--child', '--requests', str(requests), '--warmup', str(warmup),
+            *(['--keepdb'] if keepdb else []),
+        ],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=PROJECT_ROOT,
+    )
+    if result.returncode:
+        raise SystemExit(f'{mode} run failed:\n{result.stderr}')
+    return json.loads(result.stdout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500, help='Timed requests per mode (default: 500).')
+    parser.add_argument('--warmup', type=int, default=20, help='Untimed requests per mode (default: 20).')
+    parser.add_argument(
+        '--modes', nargs='+', choices=list(MODES), default=list(MODES),
+        help='Connection modes to compare (default: all).',
+    )
+    parser.add_argument('--output', help='Write JSON results to this file instead of stdout.')
+    parser.add_argument('--keepdb', action='store_true', help='Reuse the test database between runs.')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        setup_django()
+        with benchmark_database(keepdb=args.keepdb):
+            latencies = _measure(args.requests, args.warmup)
+        print(json.dumps(latencies))
+        return 0
+
+    results = result_envelope('db_connections', {'requests': args.requests, 'warmup': args.warmup})
+    results['latency_ms'] = {
+        mode: summarise_ms(_run_child(mode, args.requests, args.warmup, args.keepdb)) for mode in args.modes
+    }
+    if 'per_request' in results['latency_ms']:
+        baseline = results['latency_ms']['per_request']['mean']
+        results['saved_per_request_ms'] = {
+            mode: round(baseline - summary['mean'], 3)
+            for mode, summary in results['latency_ms'].items()
+            if mode != 'per_request'
+        }
+    write_results(results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
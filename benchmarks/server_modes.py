@@ -0,0 +1,187 @@
+"""Throughput of the WSGI (sync workers) and ASGI (Uvicorn workers) serving modes.
+
+Seeds a schedule, then starts Gunicorn from ``gunicorn.conf.py`` once per
+``APP_SERVER`` mode with the same worker count, pointed at the benchmark
+database. ``--clients`` threads each hold one HTTP/1.1 keep-alive connection
+and request the class list and class detail pages for ``--duration``
+seconds. A connection the server closes is reopened and counted, so the
+results also show how much keep-alive each mode actually delivers. The page
+cache is disabled so every request reaches the database.
+
+Usage (against a local PostgreSQL configured via the DB_* env vars)::
+
+    python -m benchmarks.server_modes --clients 32 --duration 20 --workers 3 --output modes.json
+"""
+import argparse
+import http.client
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.common import (
+    PROJECT_ROOT,
+    benchmark_database,
+    result_envelope,
+    setup_django,
+    summarise_ms,
+    write_results,
+)
+
+MODES = ('wsgi', 'asgi')
+HOST = '127.0.0.1'
+
+
+def _seed(classes):
+    from django.urls import reverse
+    from django.utils import timezone
+
+    from tests.factories import make_gym_class
+
+    created = [
+        make_gym_class(scheduled_at=timezone.now() + timezone.timedelta(hours=hour + 1))
+        for hour in range(classes)
+    ]
+    return [reverse('class-list')] + [reverse('class-detail', kwargs={'pk': gc.pk}) for gc in created[:10]]
+
+
+def _start_server(mode, port, workers, database_name):
+    env = {
+        **os.environ,
+        'APP_SERVER': mode,
+        'GUNICORN_BIND': f'{HOST}:{port}',
+        'GUNICORN_WORKERS': str(workers),
+        'GUNICORN_ACCESS_LOG': os.devnull,
+        'DB_NAME': database_name,
+        'CATALOGUE_CACHE_TIMEOUT': '0',
+    }
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py'],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f'{mode} server exited:\n{server.stderr.read()}')
+        try:
+            connection = http.client.HTTPConnection(HOST, port, timeout=1)
+            connection.request('GET', '/classes/', headers={'Host': 'localhost'})
+            connection.getresponse().read()
+            connection.close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    _stop_server(server)
+    raise SystemExit(f'{mode} server did not start within 30s.')
+
+
+def _stop_server(server):
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+def _load(port, paths, clients, duration):
+    """Hammer the server from ``clients`` keep-alive connections; return per-client samples."""
+    barrier = threading.Barrier(clients + 1)
+    results = [None] * clients
+
+    def run(index):
+        latencies, opened, errors = [], 0, 0
+        connection = None
+        barrier.wait()
+        stop_at = time.monotonic() + duration
+        request_number = index
+        while time.monotonic() < stop_at:
+            if connection is None:
+                connection = http.client.HTTPConnection(HOST, port, timeout=30)
+                opened += 1
+            path = paths[request_number % len(paths)]
+            request_number += 1
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path, headers={'Host': 'localhost'})
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                connection.close()
+                connection = None
+                continue
+            latencies.append(time.perf_counter() - started)
+            if response.status != 200:
+                errors += 1
+            if response.will_close:
+                connection.close()
+                connection = None
+        if connection is not None:
+            connection.close()
+        results[index] = (latencies, opened, errors)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def _run_mode(mode, port, workers, database_name, paths, clients, duration):
+    server = _start_server(mode, port, workers, database_name)
+    try:
+        samples = _load(port, paths, clients, duration)
+    finally:
+        _stop_server(server)
+    latencies = [latency for client_latencies, _, _ in samples for latency in client_latencies]
+    return {
+        'requests': len(latencies),
+        'throughput_rps': round(len(latencies) / duration, 1),
+        'latency_ms': summarise_ms(latencies),
+        'connections_opened': sum(opened for _, opened, _ in samples),
+        'errors': sum(errors for _, _, errors in samples),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent keep-alive clients (default: 32).')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds of load per mode (default: 20).')
+    parser.add_argument('--workers', type=int, default=3, help='Gunicorn workers in both modes (default: 3).')
+    parser.add_argument('--classes', type=int, default=100, help='Classes to seed (default: 100).')
+    parser.add_argument('--port', type=int, default=8765, help='Local port for the server (default: 8765).')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES), help='Modes to run.')
+    parser.add_argument('--output', help='Write JSON results to this file instead of stdout.')
+    parser.add_argument('--keepdb', action='store_true', help='Reuse the test database between runs.')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.db import connection
+
+    results = result_envelope('server_modes', {
+        'clients': args.clients,
+        'duration_s': args.duration,
+        'workers': args.workers,
+        'classes': args.classes,
+    })
+    with benchmark_database(keepdb=args.keepdb):
+        paths = _seed(args.classes)
+        database_name = connection.settings_dict['NAME']
+        results['modes'] = {
+            mode: _run_mode(mode, args.port, args.workers, database_name, paths, args.clients, args.duration)
+            for mode in args.modes
+        }
+    write_results(results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""Project-wide middleware.
+
+Per-request SQL instrumentation, switched on with QUERY_INSTRUMENTATION.
+
+Every query a request runs on any database connection is timed through
+``connection.execute_wrapper``, so it works with DEBUG off. The totals are
+returned in a ``Server-Timing`` header (shown in the browser's network tab)
+and logged as one ``key=value`` line per request, with the same numbers in
+the record's ``request_stats`` extra for JSON log formatters. A query shape
+(the SQL with its literals and IN lists folded) that runs more than
+QUERY_REPEAT_THRESHOLD times in one request is logged as a likely N+1.
+
+Read-replica routing for safe requests, see ``config.routers``.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from config.routers import allow_replica_reads, reset_replica_reads
+
+logger = logging.getLogger(__name__)
+
+SLOWEST_SQL_LENGTH = 500
+PRIMARY_UNTIL_SESSION_KEY = '_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def query_shape(sql):
+    """Return ``sql`` with literals and placeholder lists folded, so repeats of one query compare equal."""
+    return _LITERAL.sub('?', _IN_LIST.sub('(%s, ...)', sql))
+
+
+class RequestStats:
+    """Queries, DB time and render time collected for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.slowest = (0.0, '')
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.queries += 1
+            self.db_time += elapsed
+            self.shapes[query_shape(sql)] += 1
+            if elapsed > self.slowest[0]:
+                self.slowest = (elapsed, sql)
+
+    def recording(self):
+        """Context manager timing the queries run on every connection until it exits."""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+    def start_render(self, response):
+        started = time.perf_counter()
+
+        def finish(response):
+            self.render_time += time.perf_counter() - started
+
+        response.add_post_render_callback(finish)
+
+    def repeated(self, threshold):
+        return [(sql, count) for sql, count in self.shapes.most_common() if count > threshold]
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1)
+
+
+def _logfmt(fields):
+    """Render ``fields`` as ``key=value`` pairs, quoting strings that contain spaces."""
+    return ' '.join(
+        f'{key}={json.dumps(value)}' if isinstance(value, str) and (' ' in value or not value) else f'{key}={value}'
+        for key, value in fields.items()
+    )
+
+
+class QueryInstrumentationMiddleware:
+    """Report the query count, DB time and render time of each request."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = settings.QUERY_REPEAT_THRESHOLD
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.query_stats = stats = RequestStats()
+        with stats.recording():
+            response = self.get_response(request)
+        self.report(request, response, stats)
+        return response
+
+    async def __acall__(self, request):
+        request.query_stats = stats = RequestStats()
+        # Connections belong to the thread running the request's sync_to_async() calls, not the event loop's.
+        recording = await sync_to_async(stats.recording)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recording.close)()
+        self.report(request, response, stats)
+        return response
+
+    def process_template_response(self, request, response):
+        # TemplateResponses render after the view returns, so time the render itself.
+        request.query_stats.start_render(response)
+        return response
+
+    def report(self, request, response, stats):
+        total = time.perf_counter() - stats.started
+        response.headers['Server-Timing'] = ', '.join([
+            f'db;dur={_ms(stats.db_time)};desc="{stats.queries} queries"',
+            f'render;dur={_ms(stats.render_time)}',
+            f'total;dur={_ms(total)}',
+        ])
+        slowest_time, slowest_sql = stats.slowest
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': stats.queries,
+            'db_ms': _ms(stats.db_time),
+            'render_ms': _ms(stats.render_time),
+            'total_ms': _ms(total),
+            'slowest_ms': _ms(slowest_time),
+            'slowest_sql': slowest_sql[:SLOWEST_SQL_LENGTH],
+        }
+        logger.info('request %s', _logfmt(fields), extra={'request_stats': fields})
+        for sql, count in stats.repeated(self.threshold):
+            fields = {'path': request.path, 'count': count, 'sql': sql[:SLOWEST_SQL_LENGTH]}
+            logger.warning('repeated query %s', _logfmt(fields), extra={'request_stats': fields})
+
+
+class ReplicaRoutingMiddleware:
+    """Let safe requests read from the replica, except just after their session wrote.
+
+    A successful unsafe request keeps the session on the primary for
+    REPLICA_STICKY_SECONDS. Must come after ``SessionMiddleware``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        # The settings only install the router when a replica is configured.
+        if 'config.routers.PrimaryReplicaRouter' not in settings.DATABASE_ROUTERS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sticky_seconds = settings.REPLICA_STICKY_SECONDS
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = allow_replica_reads(self.use_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_replica_reads(token)
+        self.stick_to_primary(request, response)
+        return response
+
+    async def __acall__(self, request):
+        # Loading the session is a sync database read.
+        token = allow_replica_reads(await sync_to_async(self.use_replica)(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            reset_replica_reads(token)
+        self.stick_to_primary(request, response)
+        return response
+
+    def use_replica(self, request):
+        if request.method not in SAFE_METHODS:
+            return False
+        return request.session.get(PRIMARY_UNTIL_SESSION_KEY, 0) < time.time()
+
+    def stick_to_primary(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            request.session[PRIMARY_UNTIL_SESSION_KEY] = time.time() + self.sticky_seconds
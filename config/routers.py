@@ -0,0 +1,57 @@
+"""Send the reads of safe requests to the read replica, when one is configured.
+
+``ReplicaRoutingMiddleware`` marks a ``GET``, ``HEAD`` or ``OPTIONS``
+request as allowed to read from the replica unless its session wrote
+something in the last REPLICA_STICKY_SECONDS, so a member who has just
+booked or cancelled sees the change on the next page instead of the
+replica's lagging copy. Writes, everything in a write request, and all
+queries outside a request (commands, the job worker) go to the primary, as
+do the reads of code wrapped in ``primary_reads()``.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+REPLICA_DATABASE = 'replica'
+
+# Sessions hold the sticky window itself and must never be read stale.
+PRIMARY_ONLY_APPS = {'sessions'}
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def allow_replica_reads(allowed=True):
+    """Let reads in the current context use the replica; returns a token for ``reset_replica_reads``."""
+    return _replica_reads.set(allowed)
+
+
+def reset_replica_reads(token):
+    _replica_reads.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Send the reads inside the block to the primary, even in a safe request."""
+    token = allow_replica_reads(False)
+    try:
+        yield
+    finally:
+        reset_replica_reads(token)
+
+
+class PrimaryReplicaRouter:
+    """Installed by the settings only when the ``replica`` database is configured."""
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            return REPLICA_DATABASE
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
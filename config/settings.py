@@ -89,11 +89,22 @@ INSTALLED_APPS = [
     # Local apps
     'src.classes',
     'src.bookings',
+    'src.jobs',
+    'src.metrics',
 ]
 
 MIDDLEWARE = [
+    # First, so it also counts the queries of the middleware below; inactive
+    # unless QUERY_INSTRUMENTATION is set.
+    'config.middleware.QueryInstrumentationMiddleware',
+    'src.metrics.middleware.PrometheusMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Answers If-None-Match / If-Modified-Since for every response with an ETag
+    # or Last-Modified, and adds a content ETag to pages without one.
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    # Needs the session; inactive unless a replica is configured.
+    'config.middleware.ReplicaRoutingMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -138,9 +149,108 @@ DATABASES = {
         or '',
         'HOST': os.environ.get('DB_HOST', 'localhost'),
         'PORT': os.environ.get('DB_PORT', '5432'),
+        # Reuse a worker's connection across requests instead of paying the
+        # TCP and auth handshake every time; the health check replaces
+        # connections the server has dropped before a request uses them.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True').lower() in ('true', '1', 'yes'),
     }
 }
 
+# Under ASGI (APP_SERVER=asgi, see gunicorn.conf.py) every request's sync work
+# runs in its own thread, each with its own connection, so persistent
+# connections pile up and go stale instead of being reused; Django's docs say
+# to turn them off there. DB_POOL shares a bounded set of connections instead.
+APP_SERVER = os.environ.get('APP_SERVER', 'wsgi').lower()
+if APP_SERVER == 'asgi':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+
+# DB_POOL=True switches to a psycopg 3 connection pool per worker process.
+# A sync worker serves one request per thread, so the pool defaults to one
+# connection per Gunicorn thread. Workers x DB_POOL_MAX_SIZE must stay below
+# the server's max_connections.
+DB_POOL = os.environ.get('DB_POOL', 'False').lower() in ('true', '1', 'yes')
+if DB_POOL:
+    _db_threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+    _db_pool_min_size = int(os.environ.get('DB_POOL_MIN_SIZE', '1'))
+    _db_pool_max_size = int(os.environ.get('DB_POOL_MAX_SIZE', str(max(_db_threads, _db_pool_min_size))))
+    if _db_pool_max_size < _db_pool_min_size:
+        raise ImproperlyConfigured('DB_POOL_MAX_SIZE must not be smaller than DB_POOL_MIN_SIZE.')
+    # The pool owns connection reuse; Django rejects persistent connections on top of it.
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': _db_pool_min_size,
+            'max_size': _db_pool_max_size,
+            # Seconds a request waits for a free connection before failing.
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        },
+    }
+
+# DB_REPLICA_HOST adds a read replica. GET, HEAD and OPTIONS requests read
+# from it, except for DB_REPLICA_STICKY_SECONDS after their session wrote
+# something, so members see their own bookings, and except for the pages they
+# store in the catalogue page cache; writes and everything outside a request
+# use the primary. The replica's other settings default to the primary's.
+DB_REPLICA_HOST = os.environ.get('DB_REPLICA_HOST')
+if DB_REPLICA_HOST:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': DB_REPLICA_HOST,
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'USER': os.environ.get('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.environ.get('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        # Tests run against the primary's test database only.
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['config.routers.PrimaryReplicaRouter']
+REPLICA_STICKY_SECONDS = float(os.environ.get('DB_REPLICA_STICKY_SECONDS', '5'))
+
+
+# Caching
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+#
+# CACHE_BACKEND=locmem is per process, so invalidation only reaches the
+# worker that made the change; production defaults to file (shared by the
+# containers mounting the cache volume) and refuses locmem with more than
+# one Gunicorn worker. redis needs the optional `redis` package.
+
+_CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'gym-app'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', '/var/tmp/gym-app-cache'),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://localhost:6379/1'),
+}
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'file' if IS_PRODUCTION else 'locmem').lower()
+if CACHE_BACKEND not in _CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f'CACHE_BACKEND must be one of: {", ".join(_CACHE_BACKENDS)}.'
+    )
+if IS_PRODUCTION and CACHE_BACKEND == 'locmem':
+    # The same worker count as gunicorn.conf.py.
+    _web_workers = int(os.environ.get('GUNICORN_WORKERS') or min(
+        (os.cpu_count() or 1) * 2 + 1, int(os.environ.get('GUNICORN_MAX_WORKERS', '3')),
+    ))
+    if _web_workers > 1:
+        raise ImproperlyConfigured(
+            'CACHE_BACKEND=locmem gives each Gunicorn worker its own page cache, which '
+            'changes made in other workers never invalidate; use file or redis.'
+        )
+
+CACHES = {
+    'default': {
+        'BACKEND': _CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': os.environ.get('CACHE_LOCATION') or _CACHE_BACKENDS[CACHE_BACKEND][1],
+        'KEY_PREFIX': 'gym',
+    }
+}
+
+# Seconds an anonymous catalogue page stays cached; 0 disables the page cache.
+CATALOGUE_CACHE_TIMEOUT = int(os.environ.get('CATALOGUE_CACHE_TIMEOUT', '60'))
+
+# Seconds shared caches (the Nginx micro-cache) may serve an anonymous
+# catalogue page without asking Django; 0 marks every page private.
+CATALOGUE_PROXY_CACHE_SECONDS = int(os.environ.get('CATALOGUE_PROXY_CACHE_SECONDS', '5'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -180,6 +290,18 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    # Hashed names and .gz/.br copies need collectstatic (run by entrypoint.sh),
+    # so development and tests keep the plain storage.
+    'staticfiles': {
+        'BACKEND': (
+            'config.storage.CompressedManifestStaticFilesStorage' if IS_PRODUCTION
+            else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+
 # Media files (user-uploaded content)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'mediafiles'
@@ -222,9 +344,36 @@ LOGGING = {
             'level': 'WARNING',
             'propagate': False,
         },
+        'config.middleware': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
+# ---------------------------------------------------------------------------
+# Query instrumentation
+# ---------------------------------------------------------------------------
+# QUERY_INSTRUMENTATION=True times every SQL query per request and reports the
+# totals in a Server-Timing header and one log line per request. A query run
+# more than QUERY_REPEAT_THRESHOLD times in one request is logged as an N+1.
+QUERY_INSTRUMENTATION = os.environ.get('QUERY_INSTRUMENTATION', 'False').lower() in ('true', '1', 'yes')
+QUERY_REPEAT_THRESHOLD = int(os.environ.get('QUERY_REPEAT_THRESHOLD', '5'))
+
+# ---------------------------------------------------------------------------
+# Email
+# ---------------------------------------------------------------------------
+# Booking confirmations, cancellations and class reminders are sent by the
+# job worker (manage.py run_worker), never from the request cycle.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False').lower() in ('true', '1', 'yes')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'Gym Class Management <noreply@localhost>')
+
 # Authentication
 LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/classes/'
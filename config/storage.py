@@ -0,0 +1,53 @@
+"""Static files storage: content-hashed names plus precompressed copies.
+
+``collectstatic`` stores every file under a name carrying a hash of its
+content (``css/main.3f2a9c1b7e4d.css``), so a deploy changes the URL of
+every asset it changes and Nginx can serve ``/static/`` as ``immutable``
+for a year. Next to each hashed text asset it writes a ``.gz`` and, with
+the ``brotli`` package installed, a ``.br`` copy, which Nginx sends as
+they are (``gzip_static``/``brotli_static``) instead of compressing each
+response.
+"""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    # Installed by requirements/base.txt; without it only .gz copies are written.
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.mjs', '.map', '.svg', '.json', '.txt', '.html', '.xml', '.ico')
+# Below this, the compressed copy saves less than the response headers weigh.
+MIN_COMPRESS_SIZE = 256
+
+
+def compressed_copies(content):
+    """Return ``{suffix: compressed bytes}`` for the encodings that make ``content`` smaller."""
+    copies = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        copies['.br'] = brotli.compress(content, quality=11)
+    return {suffix: data for suffix, data in copies.items() if len(data) < len(content)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """``ManifestStaticFilesStorage`` that also writes ``.gz``/``.br`` siblings of hashed files."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if not dry_run:
+            self.compress(set(self.hashed_files.values()))
+
+    def compress(self, names):
+        for name in names:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS) or self.size(name) < MIN_COMPRESS_SIZE:
+                continue
+            # Hashed names are content-addressed: existing copies are still current.
+            if self.exists(f'{name}.gz'):
+                continue
+            with self.open(name) as original:
+                content = original.read()
+            for suffix, data in compressed_copies(content).items():
+                self._save(f'{name}{suffix}', ContentFile(data))
@@ -6,6 +6,7 @@ from django.urls import include, path
 from django.views.generic import RedirectView
 
 from src.bookings.views import RegisterView
+from src.metrics.views import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -13,6 +14,7 @@ urlpatterns = [
     path('accounts/', include('django.contrib.auth.urls')),
     path('classes/', include('src.classes.urls')),
     path('bookings/', include('src.bookings.urls')),
+    path('metrics', metrics_view, name='metrics'),
     path('', RedirectView.as_view(url='/classes/', permanent=False)),
 ]
 
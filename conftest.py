@@ -1,6 +1,7 @@
 """Shared fixtures for the entire test suite."""
 import pytest
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import Client
 from django.utils import timezone
 
@@ -8,6 +9,14 @@ from src.classes.models import GymClass, Trainer
 from src.bookings.models import Booking
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Isolate tests from pages cached by earlier tests."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def user_factory(db):
     """Factory fixture that creates User instances."""
@@ -75,6 +84,9 @@ def booking_factory(db, user_factory, gym_class_factory):
     This intentionally skips model validation so tests can create bookings
     for past classes or over-capacity scenarios.  Do NOT copy this pattern
     into production code — use Booking.create_for_member() instead.
+
+    The denormalised ``GymClass.booked_count`` is still bumped (and refreshed
+    on the passed-in instance) so the class reflects the raw insert.
     """
     def _create_booking(member=None, gym_class=None, **kwargs):
         if member is None:
@@ -84,6 +96,8 @@ def booking_factory(db, user_factory, gym_class_factory):
         # Direct ORM create to bypass model validation (for test setup purposes)
         booking = Booking(member=member, gym_class=gym_class, **kwargs)
         Booking.objects.bulk_create([booking])
+        GymClass.adjust_booked_count({gym_class.pk: 1})
+        gym_class.refresh_from_db(fields=['booked_count'])
         booking.refresh_from_db()
         return booking
 
@@ -2,12 +2,13 @@
 set -e
 
 # Ensure volume mount points exist and are writable.
-mkdir -p /app/staticfiles /app/mediafiles
-chown -R app:app /app/staticfiles /app/mediafiles
+mkdir -p /app/staticfiles /app/mediafiles /var/tmp/gym-app-cache
+chown -R app:app /app/staticfiles /app/mediafiles /var/tmp/gym-app-cache
 
 echo "Applying database migrations..."
 su-exec app python manage.py migrate --noinput
 
+# In production this writes content-hashed names plus .gz/.br copies for Nginx.
 echo "Collecting static files..."
 su-exec app python manage.py collectstatic --noinput
 
@@ -2,16 +2,34 @@
 
 import multiprocessing
 import os
+import shutil
 
 # Server socket
 bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
 
+# Application
+# APP_SERVER=asgi serves config.asgi through Uvicorn workers: the async views
+# then wait on the database without tying up a worker, and keep-alive
+# connections are reused. APP_SERVER=wsgi (default) serves config.wsgi.
+app_server = os.getenv("APP_SERVER", "wsgi").lower()
+if app_server == "asgi":
+    wsgi_app = "config.asgi:application"
+    default_worker_class = "uvicorn_worker.UvicornWorker"
+elif app_server == "wsgi":
+    wsgi_app = "config.wsgi:application"
+    default_worker_class = "sync"
+else:
+    raise ValueError("APP_SERVER must be 'wsgi' or 'asgi'.")
+
 # Worker processes
 default_workers = multiprocessing.cpu_count() * 2 + 1
 # Keep auto workers bounded to reduce OOM risk in small containers.
 max_workers = int(os.getenv("GUNICORN_MAX_WORKERS", "3"))
 workers = int(os.getenv("GUNICORN_WORKERS", min(default_workers, max_workers)))
-worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", default_worker_class)
+# More than one thread switches sync workers to gthread; DB_POOL sizes each
+# worker's connection pool from the same variable.
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
 worker_tmp_dir = "/dev/shm"
 
 # Timeouts
@@ -26,3 +44,22 @@ loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
 
 # Process naming
 proc_name = "django-app"
+
+# Metrics
+# Every worker writes its Prometheus samples to mmap files in this directory
+# and /metrics merges them, so a scrape sees the totals of all workers. It
+# must be set before the workers import prometheus_client.
+prometheus_multiproc_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/dev/shm/gym-metrics")
+
+
+def on_starting(server):
+    # Start from empty counters rather than a previous run's files.
+    shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+    os.makedirs(prometheus_multiproc_dir)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    # Drop the live gauges of a worker that exited; its counters are kept.
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,21 +1,28 @@
+from datetime import timedelta
+
 from django.contrib import admin
-from django.db.models import Count, F, Value
-from django.db.models.functions import Greatest
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import Paginator
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.template.response import TemplateResponse
 from django.urls import path
+from django.utils import timezone
 
-from src.classes.models import GymClass
+from src.classes.models import TimeSlotStats, TrainerStats, WeeklyStats
 
-from .models import Booking
+from .cancellations import cancel_bookings
+from .forms import ReportFilterForm
+from .models import Booking, WaitlistEntry
+from .reports import astream_csv, class_report, peak_hour_grid, stream_csv
 
 
 @admin.action(description='Cancel selected bookings')
 def cancel_selected_bookings(modeladmin, request, queryset):
-    count = queryset.count()
-    # Bulk delete — no pre/post_delete signals depend on related fields.
-    # select_related added for forward-compatibility if signals are added later.
-    queryset.select_related('gym_class', 'member').delete()
-    modeladmin.message_user(request, f'Successfully cancelled {count} booking(s).')
+    released = cancel_bookings(queryset)
+    modeladmin.message_user(
+        request,
+        f'Successfully cancelled {sum(released.values())} booking(s) across {len(released)} class(es).',
+    )
 
 
 @admin.register(Booking)
@@ -30,6 +37,8 @@ class BookingAdmin(admin.ModelAdmin):
     date_hierarchy = 'booked_at'
     list_select_related = ['member', 'gym_class', 'gym_class__trainer']
     list_per_page = 25
+    report_per_page = 50
+    report_recent_weeks = 12
 
     @admin.display(description='Class Schedule', ordering='gym_class__scheduled_at')
     def get_class_schedule(self, obj):
@@ -46,31 +55,94 @@ class BookingAdmin(admin.ModelAdmin):
                 self.admin_site.admin_view(self.report_view),
                 name='bookings_booking_report',
             ),
+            path(
+                'report/csv/',
+                self.admin_site.admin_view(self.report_csv_view),
+                name='bookings_booking_report_csv',
+            ),
+            path(
+                'report/trainers/',
+                self.admin_site.admin_view(self.trainer_report_view),
+                name='bookings_booking_report_trainers',
+            ),
+            path(
+                'report/peak-hours/',
+                self.admin_site.admin_view(self.peak_hours_report_view),
+                name='bookings_booking_report_peak_hours',
+            ),
         ]
         return custom_urls + super().get_urls()
 
     def report_view(self, request):
-        classes = (
-            GymClass.objects.select_related('trainer')
-            .annotate(booking_count=Count('bookings'))
-            .annotate(
-                remaining_spots=Greatest(
-                    F('max_capacity') - F('booking_count'),
-                    Value(0),
-                )
-            )
-            .order_by('scheduled_at')
-        )
+        filter_form = ReportFilterForm(request.GET)
+        # Invalid bounds are shown on the form and the report falls back to all classes.
+        bounds = filter_form.cleaned_data if filter_form.is_valid() else {}
+        classes = class_report(**bounds)
+        page = Paginator(classes, self.report_per_page).get_page(request.GET.get('page'))
+        filter_query = request.GET.copy()
+        filter_query.pop('page', None)
         context = {
             **self.admin_site.each_context(request),
             'classes': classes,
+            'page_obj': page,
+            'filter_form': filter_form,
+            'filter_query': filter_query.urlencode(),
             'title': 'Bookings Per Class Report',
         }
         return TemplateResponse(
             request, 'admin/bookings/report.html', context
         )
 
+    def report_csv_view(self, request):
+        filter_form = ReportFilterForm(request.GET)
+        if not filter_form.is_valid():
+            return HttpResponseBadRequest('Invalid report date range.')
+        classes = class_report(**filter_form.cleaned_data)
+        # ASGI servers can only stream an async iterator; a sync one is buffered whole.
+        rows = astream_csv(classes) if isinstance(request, ASGIRequest) else stream_csv(classes)
+        response = StreamingHttpResponse(rows, content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="bookings-per-class.csv"'
+        return response
+
+    def trainer_report_view(self, request):
+        context = {
+            **self.admin_site.each_context(request),
+            'trainer_stats': TrainerStats.objects.select_related('trainer').order_by('-booked', 'trainer_id'),
+            'title': 'Trainer Utilisation',
+        }
+        return TemplateResponse(request, 'admin/bookings/report_trainers.html', context)
+
+    def peak_hours_report_view(self, request):
+        today = timezone.localdate()
+        # Weeks already scheduled ahead have no bookings to speak of yet.
+        recent_weeks = WeeklyStats.objects.filter(
+            week_start__lte=today - timedelta(days=today.weekday()),
+        ).order_by('-week_start')[:self.report_recent_weeks]
+        context = {
+            **self.admin_site.each_context(request),
+            'peak_hours': peak_hour_grid(TimeSlotStats.objects.all()),
+            'weekdays': ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+            'recent_weeks': recent_weeks,
+            'title': 'Peak Hours',
+        }
+        return TemplateResponse(request, 'admin/bookings/report_peak_hours.html', context)
+
     def changelist_view(self, request, extra_context=None):
         extra_context = extra_context or {}
         extra_context['report_url'] = 'report/'
         return super().changelist_view(request, extra_context=extra_context)
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ['gym_class', 'position', 'member', 'joined_at']
+    list_filter = ['gym_class']
+    search_fields = ['member__username', 'gym_class__name']
+    raw_id_fields = ['member', 'gym_class']
+    readonly_fields = ['position', 'joined_at']
+    list_select_related = ['member', 'gym_class']
+    list_per_page = 25
+
+    def has_add_permission(self, request):
+        # Positions are handed out by WaitlistEntry.join(); members queue from the class page.
+        return False
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BookingsConfig(AppConfig):
     name = 'src.bookings'
     verbose_name = 'Bookings'
+
+    def ready(self):
+        from src.bookings import notifications, signals  # noqa: F401
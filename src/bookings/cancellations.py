@@ -0,0 +1,73 @@
+"""Bulk cancellation of bookings, e.g. when a class or a trainer's week is called off.
+
+``cancel_bookings`` deletes the selected bookings in bounded chunks, each
+in its own short transaction, with one ``DELETE ... RETURNING`` statement
+per chunk. The returned rows give the seats released per class, which are
+subtracted from ``GymClass.booked_count`` once per class and chunk instead
+of once per booking, and the head of each class's waitlist is promoted
+into the freed seats in the same transaction. When every chunk is done,
+``bookings_cancelled`` is sent once per affected class.
+"""
+from collections import defaultdict
+
+from django.db import connections, router, transaction
+from django.db.models import Max
+
+from src.bookings.models import Booking, WaitlistEntry
+from src.bookings.signals import bookings_cancelled
+from src.classes.models import GymClass
+
+CANCEL_CHUNK_SIZE = 1000
+
+
+def _delete_chunk(queryset, chunk_size):
+    """Delete up to ``chunk_size`` bookings of ``queryset``; return their ``(gym_class_id, member_id)``."""
+    # Bookings of the same class land in the same chunk, so each chunk locks few classes.
+    chunk = queryset.order_by('gym_class_id', 'pk').values('pk')[:chunk_size]
+    sql, params = chunk.query.sql_with_params()
+    connection = connections[chunk.db]
+    quote = connection.ops.quote_name
+    meta = Booking._meta
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(meta.db_table)} WHERE {quote(meta.pk.column)} IN ({sql}) '
+            f'RETURNING {quote(meta.get_field("gym_class").column)}, {quote(meta.get_field("member").column)}',
+            params,
+        )
+        return cursor.fetchall()
+
+
+def cancel_bookings(queryset, chunk_size=CANCEL_CHUNK_SIZE, promote_waitlist=True):
+    """Delete every booking in ``queryset``; return the seats released per gym class pk.
+
+    The bookings are removed without loading them or sending ``post_delete``
+    per row; the counter, the waitlist promotion and ``bookings_cancelled``
+    cover what the per-booking receivers would have done. Pass
+    ``promote_waitlist=False`` when the classes themselves are called off.
+    """
+    # A read-only queryset would route to the replica; the deletes and their reads go to the primary.
+    using = router.db_for_write(Booking)
+    queryset = queryset.using(using)
+    # Bookings created by waitlist promotions along the way are not part of the selection.
+    last_pk = queryset.aggregate(last_pk=Max('pk'))['last_pk']
+    if last_pk is None:
+        return {}
+    queryset = queryset.filter(pk__lte=last_pk)
+    cancelled = defaultdict(list)
+    while True:
+        with transaction.atomic(using=using):
+            rows = _delete_chunk(queryset, chunk_size)
+            released = defaultdict(int)
+            for gym_class_id, member_id in rows:
+                released[gym_class_id] -= 1
+                cancelled[gym_class_id].append(member_id)
+            GymClass.adjust_booked_count(released)
+            if promote_waitlist:
+                for gym_class_id, delta in released.items():
+                    WaitlistEntry.promote(gym_class_id, seats=-delta)
+        if len(rows) < chunk_size:
+            break
+
+    for gym_class_id, member_ids in cancelled.items():
+        bookings_cancelled.send(sender=Booking, gym_class_id=gym_class_id, member_ids=member_ids)
+    return {gym_class_id: len(member_ids) for gym_class_id, member_ids in cancelled.items()}
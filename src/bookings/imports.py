@@ -0,0 +1,99 @@
+"""Bulk import of bookings, e.g. when migrating members from another system.
+
+``Booking.save`` validates each booking with several queries of its own,
+which takes minutes for tens of thousands of rows. ``import_bookings``
+enforces the same rules as ``Booking.validate_booking_rules`` for a whole
+batch at once -- one query for the members, one for the classes (start
+time and remaining seats), one for existing bookings -- then inserts the
+accepted rows with ``bulk_create`` and updates ``GymClass.booked_count``
+once per class.
+"""
+from collections import Counter
+from itertools import islice
+from typing import NamedTuple
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from src.bookings.models import CLASS_FULL_MESSAGE, CLASS_STARTED_MESSAGE, DUPLICATE_BOOKING_MESSAGE, Booking
+from src.classes.models import GymClass
+
+IMPORT_BATCH_SIZE = 1000
+UNKNOWN_MEMBER_MESSAGE = 'Unknown member.'
+UNKNOWN_CLASS_MESSAGE = 'Unknown class.'
+
+
+class RejectedBooking(NamedTuple):
+    row: int
+    member_id: int | None
+    gym_class_id: int | None
+    reason: str
+
+
+class BookingImportResult(NamedTuple):
+    created: int
+    rejected: list[RejectedBooking]
+
+
+def import_bookings(rows, batch_size=IMPORT_BATCH_SIZE):
+    """Create a booking for each ``(member_id, gym_class_id)`` in ``rows`` that passes the booking rules.
+
+    Rows are numbered from 1 in ``RejectedBooking.row``. Each batch of
+    ``batch_size`` rows commits on its own, so a long import never holds
+    its locks for more than one batch.
+    """
+    created, rejected = 0, []
+    numbered = enumerate(rows, start=1)
+    while batch := list(islice(numbered, batch_size)):
+        batch_created, batch_rejected = _import_batch(batch)
+        created += batch_created
+        rejected += batch_rejected
+    return BookingImportResult(created, rejected)
+
+
+def _import_batch(batch):
+    member_ids = {member_id for _, (member_id, _) in batch}
+    gym_class_ids = {gym_class_id for _, (_, gym_class_id) in batch}
+    with transaction.atomic():
+        known_members = set(get_user_model().objects.filter(pk__in=member_ids).values_list('pk', flat=True))
+        # Locking the classes stops concurrent bookings from taking the seats counted here.
+        classes = {
+            pk: (scheduled_at, max_capacity - booked_count)
+            for pk, scheduled_at, max_capacity, booked_count in GymClass.objects.select_for_update()
+            .filter(pk__in=gym_class_ids)
+            .order_by('pk')
+            .values_list('pk', 'scheduled_at', 'max_capacity', 'booked_count')
+        }
+        booked = set(
+            Booking.objects.filter(member_id__in=known_members, gym_class_id__in=classes)
+            .order_by()
+            .values_list('member_id', 'gym_class_id')
+        )
+        seats_left = {pk: seats for pk, (_, seats) in classes.items()}
+        now = timezone.now()
+
+        accepted, rejected = [], []
+        for row, (member_id, gym_class_id) in batch:
+            # Same order of checks as Booking.validate_booking_rules.
+            if member_id not in known_members:
+                reason = UNKNOWN_MEMBER_MESSAGE
+            elif gym_class_id not in classes:
+                reason = UNKNOWN_CLASS_MESSAGE
+            elif classes[gym_class_id][0] <= now:
+                reason = CLASS_STARTED_MESSAGE
+            elif (member_id, gym_class_id) in booked:
+                reason = DUPLICATE_BOOKING_MESSAGE
+            elif seats_left[gym_class_id] <= 0:
+                reason = CLASS_FULL_MESSAGE
+            else:
+                booked.add((member_id, gym_class_id))
+                seats_left[gym_class_id] -= 1
+                accepted.append(Booking(member_id=member_id, gym_class_id=gym_class_id))
+                continue
+            rejected.append(RejectedBooking(row, member_id, gym_class_id, reason))
+
+        # bulk_create sends no post_save, so count the new seats here.
+        Booking.objects.bulk_create(accepted)
+        GymClass.adjust_booked_count(Counter(booking.gym_class_id for booking in accepted))
+    return len(accepted), rejected
@@ -0,0 +1,62 @@
+from datetime import date, datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+
+from src.bookings.cancellations import cancel_bookings
+from src.bookings.models import Booking, WaitlistEntry
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class Command(BaseCommand):
+    help = (
+        'Cancel every booking of the matching upcoming classes, e.g. when a class or a '
+        "trainer's week is called off, and clear their waitlists. Classes that have started "
+        'are never touched.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--class', type=int, action='append', dest='gym_class_ids', metavar='ID',
+            help='Cancel the bookings of this class (repeatable).',
+        )
+        parser.add_argument('--trainer', type=int, metavar='ID', help="Only classes taught by this trainer.")
+        parser.add_argument('--date-from', type=date.fromisoformat, help='Only classes on or after this day.')
+        parser.add_argument('--date-to', type=date.fromisoformat, help='Only classes on or before this day.')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the bookings per class that would be cancelled without changing anything.',
+        )
+
+    def handle(self, *args, gym_class_ids, trainer, date_from, date_to, dry_run, **options):
+        if not (gym_class_ids or trainer or date_from or date_to):
+            raise CommandError('Give at least one of --class, --trainer, --date-from or --date-to.')
+        bookings = Booking.objects.filter(gym_class__scheduled_at__gt=timezone.now())
+        if gym_class_ids:
+            bookings = bookings.filter(gym_class_id__in=gym_class_ids)
+        if trainer:
+            bookings = bookings.filter(gym_class__trainer_id=trainer)
+        if date_from:
+            bookings = bookings.filter(gym_class__scheduled_at__gte=_day_start(date_from))
+        if date_to:
+            bookings = bookings.filter(gym_class__scheduled_at__lt=_day_start(date_to + timedelta(days=1)))
+
+        if dry_run:
+            released = dict(
+                bookings.order_by('gym_class_id').values_list('gym_class_id').annotate(total=Count('pk'))
+            )
+        else:
+            # The classes are called off, so nobody is promoted into the freed seats.
+            released = cancel_bookings(bookings, promote_waitlist=False)
+            WaitlistEntry.objects.filter(gym_class_id__in=released).delete()
+        for gym_class_id, count in sorted(released.items()):
+            self.stdout.write(f'Class {gym_class_id}: {count} booking(s)')
+        verb = 'would be cancelled' if dry_run else 'cancelled'
+        self.stdout.write(self.style.SUCCESS(
+            f'{sum(released.values())} booking(s) across {len(released)} class(es) {verb}.'
+        ))
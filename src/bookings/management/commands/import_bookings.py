@@ -0,0 +1,66 @@
+import csv
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from src.bookings.imports import IMPORT_BATCH_SIZE, import_bookings
+
+
+def _parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Import bookings from a CSV file with "username" and "gym_class_id" columns. '
+        'Rows breaking the booking rules are skipped and listed with the reason.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='Path to the CSV file to import.')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate every row and report what would be rejected without saving anything.',
+        )
+
+    def handle(self, *args, csv_path, dry_run, **options):
+        try:
+            csv_file = open(csv_path, newline='', encoding='utf-8')
+        except OSError as exc:
+            raise CommandError(f'Cannot read {csv_path}: {exc.strerror}.') from exc
+        with csv_file:
+            reader = csv.DictReader(csv_file)
+            missing = {'username', 'gym_class_id'} - set(reader.fieldnames or ())
+            if missing:
+                raise CommandError(f'Missing CSV column(s): {", ".join(sorted(missing))}.')
+            rows = []
+            if dry_run:
+                with transaction.atomic():
+                    result = import_bookings(self._member_rows(reader, rows))
+                    transaction.set_rollback(True)
+            else:
+                result = import_bookings(self._member_rows(reader, rows))
+
+        for rejected in result.rejected:
+            # Line 1 is the header.
+            username, gym_class_id = rows[rejected.row - 1]
+            self.stdout.write(f'line {rejected.row + 1}: {username},{gym_class_id}: {rejected.reason}')
+        summary = f'{result.created} booking(s) {"valid" if dry_run else "imported"}, {len(result.rejected)} rejected.'
+        self.stdout.write(self.style.SUCCESS(summary) if not result.rejected else self.style.WARNING(summary))
+
+    def _member_rows(self, reader, rows):
+        """Yield ``(member_id, gym_class_id)`` per CSV row, resolving usernames one batch at a time."""
+        users = get_user_model().objects
+        while batch := [(row['username'], row['gym_class_id']) for row in islice(reader, IMPORT_BATCH_SIZE)]:
+            rows += batch
+            member_ids = dict(
+                users.filter(username__in={username for username, _ in batch}).values_list('username', 'pk')
+            )
+            for username, gym_class_id in batch:
+                yield member_ids.get(username), _parse_id(gym_class_id)
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-18 08:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['member', 'booked_at'], name='booking_member_booked_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-18 08:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_booking_booking_member_booked_idx'),
+        ('classes', '0008_classtemplate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(editable=False)),
+                ('joined_at', models.DateTimeField(auto_now_add=True)),
+                ('gym_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='classes.gymclass')),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'waitlist entries',
+                'ordering': ['gym_class', 'position'],
+                'indexes': [models.Index(fields=['gym_class', 'position'], name='waitlist_class_position_idx')],
+                'constraints': [models.UniqueConstraint(fields=('member', 'gym_class'), name='unique_waitlist_entry')],
+            },
+        ),
+    ]
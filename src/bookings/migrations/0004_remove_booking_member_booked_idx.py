@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:32
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_waitlistentry'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='booking_member_booked_idx',
+        ),
+    ]
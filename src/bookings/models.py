@@ -1,8 +1,18 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models, transaction
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Max, OuterRef, Subquery
 from django.utils import timezone
 
+from src.metrics.instruments import SEAT_RESERVATION
+
+CLASS_STARTED_MESSAGE = 'Cannot book a class that has already started.'
+DUPLICATE_BOOKING_MESSAGE = 'This member already has a booking for this class.'
+CLASS_FULL_MESSAGE = 'This class is full.'
+CLASS_NOT_FULL_MESSAGE = 'This class still has free spots.'
+ALREADY_WAITLISTED_MESSAGE = 'This member is already on the waitlist for this class.'
+
 
 class Booking(models.Model):
     """Represents a reservation made by a member for a gym class."""
@@ -30,13 +40,53 @@ class Booking(models.Model):
 
     @classmethod
     def create_for_member(cls, *, member, gym_class_id):
-        """Create a booking atomically while enforcing booking rules."""
+        """Reserve a seat and create the booking in one short transaction.
+
+        The seat is claimed by ``GymClass.reserve_seat``, a single conditional
+        ``UPDATE`` that only succeeds while the class has room and has not
+        started, so no validation query runs before it. The class row stays
+        locked until the transaction commits, through the booking ``INSERT``
+        and the confirmation job it enqueues, so nothing else belongs in
+        this transaction. The ``unique_booking`` constraint rejects
+        duplicates on insert. Only a failed reservation pays for the queries
+        that pick the error message.
+        """
         from src.classes.models import GymClass
 
-        with transaction.atomic():
-            locked_class = GymClass.objects.select_for_update().get(pk=gym_class_id)
-            cls.validate_booking_rules(member=member, gym_class=locked_class)
-            return cls.objects.create(member=member, gym_class=locked_class)
+        try:
+            with transaction.atomic():
+                with SEAT_RESERVATION.time():
+                    reserved = GymClass.reserve_seat(gym_class_id)
+                if not reserved:
+                    cls._raise_reservation_error(member=member, gym_class_id=gym_class_id)
+                booking = cls(member=member, gym_class_id=gym_class_id)
+                # Rules are enforced by the reservation and the unique constraint,
+                # and the seat is already counted: skip full_clean() and the
+                # post_save counter increment.
+                booking._seat_reserved = True
+                super(Booking, booking).save(force_insert=True)
+        except IntegrityError as exc:
+            raise ValidationError(DUPLICATE_BOOKING_MESSAGE, code='duplicate') from exc
+        return booking
+
+    @classmethod
+    async def acreate_for_member(cls, *, member, gym_class_id):
+        """Async version of ``create_for_member``.
+
+        Transactions cannot span ``await``, so the whole reservation runs in
+        one call on the request's sync thread and keeps its atomicity.
+        """
+        return await sync_to_async(cls.create_for_member)(member=member, gym_class_id=gym_class_id)
+
+    @classmethod
+    def _raise_reservation_error(cls, *, member, gym_class_id):
+        """Explain why ``GymClass.reserve_seat`` refused a booking."""
+        from src.classes.models import GymClass
+
+        gym_class = GymClass.objects.get(pk=gym_class_id)
+        cls.validate_booking_rules(member=member, gym_class=gym_class)
+        # The counter said full even though the booking rows did not.
+        raise ValidationError(CLASS_FULL_MESSAGE, code='full')
 
     @classmethod
     def validate_booking_rules(
@@ -48,19 +98,19 @@ class Booking(models.Model):
     ):
         """Validate booking constraints shared by all write paths."""
         if gym_class.scheduled_at <= timezone.now():
-            raise ValidationError('Cannot book a class that has already started.')
+            raise ValidationError(CLASS_STARTED_MESSAGE, code='started')
 
         duplicate_qs = cls.objects.filter(member=member, gym_class=gym_class)
         if exclude_booking_id:
             duplicate_qs = duplicate_qs.exclude(pk=exclude_booking_id)
         if duplicate_qs.exists():
-            raise ValidationError('This member already has a booking for this class.')
+            raise ValidationError(DUPLICATE_BOOKING_MESSAGE, code='duplicate')
 
         booking_count_qs = cls.objects.filter(gym_class=gym_class)
         if exclude_booking_id:
             booking_count_qs = booking_count_qs.exclude(pk=exclude_booking_id)
         if booking_count_qs.count() >= gym_class.max_capacity:
-            raise ValidationError('This class is full.')
+            raise ValidationError(CLASS_FULL_MESSAGE, code='full')
 
     def __str__(self):
         return f'{self.member} \u2192 {self.gym_class}'
@@ -79,7 +129,139 @@ class Booking(models.Model):
         )
 
     def save(self, *args, **kwargs):
-        # WARNING: bulk_create() bypasses save() and therefore skips full_clean().
-        # Never use bulk_create() on Booking in production code.
+        # WARNING: bulk_create() bypasses save() and therefore skips full_clean()
+        # and the signals that maintain GymClass.booked_count.
+        # Never use bulk_create() on Booking in production code; bulk loads go
+        # through src.bookings.imports, which enforces the same rules set-wise.
         self.full_clean()
-        return super().save(*args, **kwargs)
+        # The counter is updated from post_save, so keep both writes in one transaction.
+        with transaction.atomic():
+            return super().save(*args, **kwargs)
+
+
+class WaitlistEntry(models.Model):
+    """A member queueing for a seat in a full gym class.
+
+    ``position`` is the member's ticket in the class's queue: tickets are
+    handed out in join order, promotion removes the head without touching
+    the rest, and leaving closes the gap behind the leaver. A member's place
+    in line is therefore their ticket minus the head's, read from two index
+    lookups rather than by counting the entries ahead of them.
+    """
+
+    member = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries',
+    )
+    gym_class = models.ForeignKey(
+        'classes.GymClass',
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries',
+    )
+    position = models.PositiveIntegerField(editable=False)
+    joined_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['gym_class', 'position']
+        verbose_name_plural = 'waitlist entries'
+        indexes = [
+            # The head of a class's queue, and the head lookup in position_of().
+            models.Index(fields=['gym_class', 'position'], name='waitlist_class_position_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['member', 'gym_class'],
+                name='unique_waitlist_entry',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.member} waiting for {self.gym_class} (#{self.position})'
+
+    @classmethod
+    def join(cls, *, member, gym_class_id):
+        """Add ``member`` to the end of a full class's waitlist and return the entry."""
+        from src.classes.models import GymClass
+
+        with transaction.atomic():
+            # Locking the class serialises ticket numbers with leave() and promotions.
+            gym_class = GymClass.objects.select_for_update().get(pk=gym_class_id)
+            if gym_class.scheduled_at <= timezone.now():
+                raise ValidationError(CLASS_STARTED_MESSAGE, code='started')
+            if Booking.objects.filter(member=member, gym_class=gym_class).exists():
+                raise ValidationError(DUPLICATE_BOOKING_MESSAGE, code='duplicate')
+            if not gym_class.is_full:
+                raise ValidationError(CLASS_NOT_FULL_MESSAGE, code='not_full')
+            tail = cls.objects.filter(gym_class=gym_class).aggregate(tail=Max('position'))['tail'] or 0
+            try:
+                with transaction.atomic():
+                    return cls.objects.create(member=member, gym_class=gym_class, position=tail + 1)
+            except IntegrityError as exc:
+                raise ValidationError(ALREADY_WAITLISTED_MESSAGE, code='waitlisted') from exc
+
+    @classmethod
+    def leave(cls, *, member, gym_class_id):
+        """Remove ``member`` from a class's waitlist; return whether they were on it."""
+        from src.classes.models import GymClass
+
+        with transaction.atomic():
+            list(GymClass.objects.select_for_update().filter(pk=gym_class_id).values_list('pk'))
+            entry = cls.objects.filter(member=member, gym_class_id=gym_class_id).first()
+            if entry is None:
+                return False
+            entry.delete()
+            cls.objects.filter(gym_class_id=gym_class_id, position__gt=entry.position).update(
+                position=F('position') - 1,
+            )
+        return True
+
+    @classmethod
+    def promote(cls, gym_class_id, seats=1):
+        """Book the head of the waitlist into up to ``seats`` freed seats; return the new bookings.
+
+        Must run inside the transaction that frees the seats. Entries
+        another transaction is already promoting are skipped with ``SKIP
+        LOCKED`` instead of waited for, and each promotion deletes one entry
+        without renumbering the rest of the queue. A member who has booked
+        the class meanwhile is dropped from the queue and the next one gets
+        the seat, until ``seats`` are filled or the queue runs out.
+        """
+        promoted = []
+        while len(promoted) < seats:
+            entries = list(
+                cls.objects.select_for_update(skip_locked=True, of=('self',))
+                .select_related('member')
+                .filter(gym_class_id=gym_class_id)
+                .order_by('position')[:seats - len(promoted)]
+            )
+            if not entries:
+                break
+            for entry in entries:
+                try:
+                    promoted.append(Booking.create_for_member(member=entry.member, gym_class_id=gym_class_id))
+                except ValidationError as exc:
+                    if exc.code != 'duplicate':
+                        # Started or full: nobody behind this member can be booked either.
+                        return promoted
+                entry.delete()
+        return promoted
+
+    @classmethod
+    def _position_query(cls, *, member, gym_class_id):
+        head = cls.objects.filter(gym_class_id=OuterRef('gym_class_id')).order_by('position').values('position')[:1]
+        return (
+            cls.objects.filter(member=member, gym_class_id=gym_class_id)
+            .annotate(place=F('position') - Subquery(head) + 1)
+            .values_list('place', flat=True)
+        )
+
+    @classmethod
+    def position_of(cls, *, member, gym_class_id):
+        """Return ``member``'s 1-based place in the class's waitlist, or ``None``."""
+        return cls._position_query(member=member, gym_class_id=gym_class_id).first()
+
+    @classmethod
+    async def aposition_of(cls, *, member, gym_class_id):
+        """Async version of ``position_of()``."""
+        return await cls._position_query(member=member, gym_class_id=gym_class_id).afirst()
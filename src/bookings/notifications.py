@@ -0,0 +1,124 @@
+"""Booking emails, sent by the job worker rather than in the request cycle.
+
+The receivers below only enqueue jobs, on the same connection and inside
+the same transaction as the booking write that triggers them, so a
+rolled-back booking never sends mail and a committed one always has its job.
+Class reminders are one job per class, run an hour before it starts, which
+emails every booked member over a single connection.
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail, send_mass_mail
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from src.bookings.models import Booking
+from src.bookings.signals import bookings_cancelled
+from src.classes.models import GymClass
+from src.jobs.models import Job
+from src.jobs.queue import enqueue, enqueue_many, register
+
+BOOKING_CONFIRMATION = 'bookings.confirmation'
+BOOKING_CANCELLATION = 'bookings.cancellation'
+CLASS_REMINDER = 'bookings.class_reminder'
+REMINDER_LEAD = timedelta(hours=1)
+
+
+def _starts(gym_class):
+    return f'{timezone.localtime(gym_class.scheduled_at):%a %d %b at %H:%M}'
+
+
+def _send_to_each(subject, message, emails):
+    """Send one message per address over a single connection."""
+    send_mass_mail([(subject, message, None, [email]) for email in emails])
+
+
+def _reminder_fields(gym_class):
+    return {
+        'kind': CLASS_REMINDER,
+        'payload': {'gym_class_id': gym_class.pk},
+        'run_at': max(gym_class.scheduled_at - REMINDER_LEAD, timezone.now()),
+        'key': f'class-reminder:{gym_class.pk}',
+    }
+
+
+def schedule_class_reminder(gym_class):
+    """(Re)schedule the reminder job of one upcoming class."""
+    if gym_class.scheduled_at > timezone.now():
+        fields = _reminder_fields(gym_class)
+        enqueue(fields.pop('kind'), fields.pop('payload'), **fields)
+
+
+def schedule_class_reminders(gym_classes):
+    """Schedule reminder jobs for newly created classes in one insert."""
+    now = timezone.now()
+    enqueue_many([Job(**_reminder_fields(gc)) for gc in gym_classes if gc.scheduled_at > now])
+
+
+@register(BOOKING_CONFIRMATION)
+def send_booking_confirmation(member_id, gym_class_id):
+    booking = (
+        Booking.objects.select_related('member', 'gym_class')
+        .filter(member_id=member_id, gym_class_id=gym_class_id)
+        .first()
+    )
+    # Nothing to confirm if the booking was cancelled before the job ran.
+    if booking is None or not booking.member.email:
+        return
+    send_mail(
+        f'Booking confirmed: {booking.gym_class.name}',
+        f'You are booked for {booking.gym_class.name} on {_starts(booking.gym_class)}.',
+        None,
+        [booking.member.email],
+    )
+
+
+@register(BOOKING_CANCELLATION)
+def send_cancellation_notices(gym_class_id, member_ids):
+    gym_class = GymClass.objects.filter(pk=gym_class_id).first()
+    if gym_class is None:
+        return
+    emails = get_user_model().objects.filter(pk__in=member_ids).exclude(email='').values_list('email', flat=True)
+    _send_to_each(
+        f'Booking cancelled: {gym_class.name}',
+        f'Your booking for {gym_class.name} on {_starts(gym_class)} has been cancelled.',
+        emails,
+    )
+
+
+@register(CLASS_REMINDER)
+def send_class_reminders(gym_class_id):
+    gym_class = GymClass.objects.filter(pk=gym_class_id).first()
+    if gym_class is None or gym_class.scheduled_at <= timezone.now():
+        return
+    _send_to_each(
+        f'Starting soon: {gym_class.name}',
+        f'{gym_class.name} starts {_starts(gym_class)}. See you there!',
+        gym_class.members.exclude(email='').values_list('email', flat=True),
+    )
+
+
+@receiver(post_save, sender=Booking)
+def enqueue_booking_confirmation(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        enqueue(BOOKING_CONFIRMATION, {'member_id': instance.member_id, 'gym_class_id': instance.gym_class_id})
+
+
+@receiver(post_delete, sender=Booking)
+def enqueue_cancellation_notice(sender, instance, origin=None, **kwargs):
+    # Bookings cascading from a deleted class or member are not cancellations to announce.
+    if isinstance(origin, Booking) or getattr(origin, 'model', None) is Booking:
+        enqueue(BOOKING_CANCELLATION, {'gym_class_id': instance.gym_class_id, 'member_ids': [instance.member_id]})
+
+
+@receiver(bookings_cancelled)
+def enqueue_bulk_cancellation_notice(sender, gym_class_id, member_ids, **kwargs):
+    enqueue(BOOKING_CANCELLATION, {'gym_class_id': gym_class_id, 'member_ids': list(member_ids)})
+
+
+@receiver(post_save, sender=GymClass)
+def enqueue_class_reminder(sender, instance, raw, **kwargs):
+    if not raw:
+        schedule_class_reminder(instance)
@@ -0,0 +1,86 @@
+"""Booking signals and the receivers keeping ``GymClass.booked_count`` in step with bookings.
+
+Booking writes run inside a transaction (``Booking.save`` wraps itself in
+``atomic`` and deletes go through the collector's transaction), so the
+counter update commits or rolls back together with the booking row.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from src.bookings.models import Booking, WaitlistEntry
+from src.classes.models import GymClass
+
+# Sent by src.bookings.cancellations once per class after a bulk cancellation,
+# instead of post_delete per booking: ``gym_class_id`` is the class and
+# ``member_ids`` lists the members whose bookings were removed. The rows are
+# already committed unless the caller wrapped the cancellation in a transaction.
+bookings_cancelled = Signal()
+
+
+@receiver(pre_save, sender=Booking)
+def remember_previous_gym_class(sender, instance, raw, **kwargs):
+    """Record the stored class of an existing booking before it is updated."""
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._previous_gym_class_id = (
+        Booking.objects.filter(pk=instance.pk)
+        .values_list('gym_class_id', flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Booking)
+def count_saved_booking(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        # Booking.create_for_member counts the seat when it reserves it.
+        if not getattr(instance, '_seat_reserved', False):
+            GymClass.adjust_booked_count({instance.gym_class_id: 1})
+        return
+    previous_id = getattr(instance, '_previous_gym_class_id', None)
+    if previous_id is not None and previous_id != instance.gym_class_id:
+        GymClass.adjust_booked_count({previous_id: -1, instance.gym_class_id: 1})
+    instance._previous_gym_class_id = None
+
+
+@receiver(post_delete, sender=Booking)
+def count_deleted_booking(sender, instance, origin=None, **kwargs):
+    # Bookings cascading from a deleted class have no counter left to update.
+    if isinstance(origin, GymClass) or getattr(origin, 'model', None) is GymClass:
+        return
+    GymClass.adjust_booked_count({instance.gym_class_id: -1})
+
+
+@receiver(post_delete, sender=Booking)
+def promote_from_waitlist(sender, instance, origin=None, **kwargs):
+    """Give the freed seat to the head of the waitlist, in the cancelling transaction."""
+    # Connected after count_deleted_booking, so the seat has been released already.
+    # Bookings cascading from a deleted class or member free no seat worth filling.
+    if not (isinstance(origin, Booking) or getattr(origin, 'model', None) is Booking):
+        return
+    WaitlistEntry.promote(instance.gym_class_id)
+
+
+@receiver(pre_save, sender=GymClass)
+def remember_previous_capacity(sender, instance, raw, **kwargs):
+    if raw or instance._state.adding:
+        return
+    instance._previous_max_capacity = (
+        GymClass.objects.filter(pk=instance.pk).values_list('max_capacity', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=GymClass)
+def promote_into_added_capacity(sender, instance, created, raw, **kwargs):
+    """Give seats added to a class to the head of its waitlist."""
+    if raw or created:
+        return
+    previous = getattr(instance, '_previous_max_capacity', None)
+    instance._previous_max_capacity = None
+    if previous is None or instance.max_capacity <= previous:
+        return
+    # Joins the caller's transaction, e.g. the admin's, or commits on its own.
+    with transaction.atomic():
+        WaitlistEntry.promote(instance.pk, seats=instance.max_capacity - previous)
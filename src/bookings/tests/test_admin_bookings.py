@@ -1,8 +1,16 @@
+from datetime import datetime
+
 import pytest
-from django.test import Client
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, Client
 from django.contrib.admin.sites import AdminSite
+from django.utils import timezone
 from src.bookings.models import Booking
 from src.bookings.admin import BookingAdmin
+from src.classes.stats import REFRESH_SCHEDULE_STATS
+from src.jobs import queue
+from src.jobs.models import Job
+from tests.helpers import future_datetime, past_datetime
 
 pytestmark = pytest.mark.integration
 
@@ -46,6 +54,34 @@ def test_cancel_selected_bookings_action(admin_client, booking_factory):
     assert Booking.objects.filter(pk=b3.pk).count() == 1
 
 
+def test_cancel_selected_bookings_action_releases_seats(admin_client, gym_class_factory, booking_factory):
+    gc = gym_class_factory(max_capacity=3)
+    b1 = booking_factory(gym_class=gc)
+    b2 = booking_factory(gym_class=gc)
+    booking_factory(gym_class=gc)
+
+    admin_client.post('/admin/bookings/booking/', {
+        'action': 'cancel_selected_bookings',
+        '_selected_action': [b1.pk, b2.pk],
+    })
+
+    gc.refresh_from_db()
+    assert gc.booked_count == 1
+
+
+def test_cancel_selected_bookings_action_reports_classes(admin_client, gym_class_factory, booking_factory):
+    spin, yoga = gym_class_factory(), gym_class_factory()
+    bookings = [booking_factory(gym_class=spin), booking_factory(gym_class=spin), booking_factory(gym_class=yoga)]
+
+    response = admin_client.post('/admin/bookings/booking/', {
+        'action': 'cancel_selected_bookings',
+        '_selected_action': [booking.pk for booking in bookings],
+    }, follow=True)
+
+    assert b'Successfully cancelled 3 booking(s) across 2 class(es).' in response.content
+    assert not Booking.objects.exists()
+
+
 def test_report_view_accessible_to_staff(admin_client):
     response = admin_client.get('/admin/bookings/booking/report/')
     assert response.status_code == 200
@@ -65,9 +101,7 @@ def test_report_view_context(admin_client, gym_class_factory, booking_factory, u
     booking_factory(gym_class=gc)
     booking_factory(gym_class=gc)
 
-    from src.bookings.models import Booking
-    u = user_factory()
-    Booking.objects.bulk_create([Booking(member=u, gym_class=gc)])  # over-capacity
+    booking_factory(gym_class=gc)  # over-capacity: bypasses the booking rules
 
     response = admin_client.get('/admin/bookings/booking/report/')
 
@@ -101,3 +135,152 @@ def test_get_class_schedule(admin_client, gym_class_factory, booking_factory):
 
     ma = BookingAdmin(model=Booking, admin_site=AdminSite())
     assert ma.get_class_schedule(booking) == gc.scheduled_at
+
+
+def _csv_lines(response):
+    return b''.join(response.streaming_content).decode().splitlines()
+
+
+def test_report_view_filters_by_date_range(admin_client, gym_class_factory):
+    inside = gym_class_factory(name='Inside', scheduled_at=timezone.make_aware(datetime(2030, 3, 10, 9)))
+    gym_class_factory(name='Before', scheduled_at=timezone.make_aware(datetime(2030, 3, 9, 23, 59)))
+    gym_class_factory(name='After', scheduled_at=timezone.make_aware(datetime(2030, 3, 12, 0, 0)))
+
+    response = admin_client.get(
+        '/admin/bookings/booking/report/', {'date_from': '2030-03-10', 'date_to': '2030-03-11'}
+    )
+
+    assert [gc.pk for gc in response.context['page_obj']] == [inside.pk]
+
+
+def test_report_view_paginates(admin_client, gym_class_factory, monkeypatch):
+    monkeypatch.setattr(BookingAdmin, 'report_per_page', 2)
+    for days in range(1, 4):
+        gym_class_factory(scheduled_at=future_datetime(days=days))
+
+    first = admin_client.get('/admin/bookings/booking/report/')
+    second = admin_client.get('/admin/bookings/booking/report/', {'page': 2})
+
+    assert len(first.context['page_obj']) == 2
+    assert len(second.context['page_obj']) == 1
+    assert 'page=2' in first.content.decode()
+
+
+def test_report_view_rejects_reversed_date_range(admin_client):
+    response = admin_client.get(
+        '/admin/bookings/booking/report/', {'date_from': '2030-03-11', 'date_to': '2030-03-10'}
+    )
+
+    assert response.status_code == 200
+    assert 'The start date must not be after the end date.' in response.content.decode()
+
+
+def test_report_csv_streams_filtered_rows(admin_client, gym_class_factory, booking_factory, trainer_factory):
+    gc = gym_class_factory(
+        name='Spin',
+        trainer=trainer_factory(first_name='Ada', last_name='Lovelace'),
+        scheduled_at=timezone.make_aware(datetime(2030, 3, 10, 9)),
+        max_capacity=5,
+    )
+    booking_factory(gym_class=gc)
+    gym_class_factory(scheduled_at=timezone.make_aware(datetime(2030, 4, 1, 9)))
+
+    response = admin_client.get('/admin/bookings/booking/report/csv/', {'date_to': '2030-03-31'})
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Type'] == 'text/csv'
+    assert _csv_lines(response) == [
+        'Class,Trainer,Scheduled at,Duration (min),Capacity,Booked,Remaining',
+        'Spin,Ada Lovelace,2030-03-10T09:00:00+00:00,60,5,1,4',
+    ]
+
+
+def test_report_csv_rejects_invalid_dates(admin_client):
+    response = admin_client.get('/admin/bookings/booking/report/csv/', {'date_from': 'yesterday'})
+
+    assert response.status_code == 400
+
+
+def test_report_csv_not_accessible_to_non_staff(user_factory):
+    user = user_factory()
+    client = Client()
+    client.login(username=user.username, password='testpass123')
+
+    response = client.get('/admin/bookings/booking/report/csv/')
+
+    assert response.status_code == 302
+    assert response.url.startswith('/admin/login/')
+
+
+def test_report_csv_streams_over_asgi(admin_user, gym_class_factory):
+    gym_class_factory(name='Async Spin')
+    client = AsyncClient()
+    client.force_login(admin_user)
+
+    response = async_to_sync(client.get)('/admin/bookings/booking/report/csv/')
+
+    async def read():
+        return b''.join([chunk async for chunk in response.streaming_content])
+
+    assert 'Async Spin' in async_to_sync(read)().decode()
+
+
+def test_trainer_report_lists_utilisation(admin_client, trainer_factory, gym_class_factory, booking_factory,
+                                          django_capture_on_commit_callbacks):
+    trainer = trainer_factory(first_name='Ada', last_name='Lovelace')
+    with django_capture_on_commit_callbacks(execute=True):
+        gc = gym_class_factory(trainer=trainer, max_capacity=4)
+        booking_factory(gym_class=gc)
+    # Booked seats reach the report through the queued refresh.
+    Job.objects.filter(kind=REFRESH_SCHEDULE_STATS).update(run_at=timezone.now())
+    queue.run_due_jobs(batch_size=100)
+
+    response = admin_client.get('/admin/bookings/booking/report/trainers/')
+
+    assert response.status_code == 200
+    stats = list(response.context['trainer_stats'])
+    assert [(s.trainer, s.booked, s.capacity) for s in stats] == [(trainer, 1, 4)]
+    assert '25%' in response.content.decode()
+
+
+def test_peak_hours_report_groups_by_weekday_and_hour(admin_client, gym_class_factory,
+                                                      django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        # Thursday 07:00 and Saturday 10:00 UTC.
+        gym_class_factory(scheduled_at=timezone.make_aware(datetime(2030, 1, 3, 7)))
+        gym_class_factory(scheduled_at=timezone.make_aware(datetime(2030, 1, 5, 10)))
+
+    response = admin_client.get('/admin/bookings/booking/report/peak-hours/')
+
+    assert response.status_code == 200
+    grid = {hour: [cell is not None for cell in cells] for hour, cells in response.context['peak_hours']}
+    assert grid == {
+        7: [False, False, False, True, False, False, False],
+        10: [False, False, False, False, False, True, False],
+    }
+    # Both classes are years ahead.
+    assert list(response.context['recent_weeks']) == []
+
+
+def test_peak_hours_report_lists_weeks_up_to_the_current_one(admin_client, gym_class_factory,
+                                                             django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        gym_class_factory(scheduled_at=past_datetime(days=14))
+        gym_class_factory(scheduled_at=future_datetime(days=14))
+
+    response = admin_client.get('/admin/bookings/booking/report/peak-hours/')
+
+    today = timezone.localdate()
+    assert [w.week_start <= today for w in response.context['recent_weeks']] == [True]
+
+
+def test_stats_reports_not_accessible_to_non_staff(user_factory):
+    user = user_factory()
+    client = Client()
+    client.login(username=user.username, password='testpass123')
+
+    for url in ('/admin/bookings/booking/report/trainers/', '/admin/bookings/booking/report/peak-hours/'):
+        response = client.get(url)
+        assert response.status_code == 302
+        assert response.url.startswith('/admin/login/')
@@ -0,0 +1,151 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+
+from config.routers import allow_replica_reads, reset_replica_reads
+
+from src.bookings.cancellations import cancel_bookings
+from src.bookings.models import Booking, WaitlistEntry
+from src.bookings.signals import bookings_cancelled
+from src.classes.models import GymClass
+from src.classes.signals import booked_count_changed
+from tests.helpers import future_datetime, past_datetime
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def listen():
+    """Return a function that starts recording the cancellation signals."""
+    calls = {'cancelled': [], 'booked_count_changed': []}
+
+    def on_cancelled(sender, gym_class_id, member_ids, **kwargs):
+        calls['cancelled'].append((gym_class_id, sorted(member_ids)))
+
+    def on_count_changed(sender, gym_class_ids, deltas, **kwargs):
+        calls['booked_count_changed'].append(deltas)
+
+    def start():
+        bookings_cancelled.connect(on_cancelled)
+        booked_count_changed.connect(on_count_changed)
+        return calls
+
+    yield start
+    bookings_cancelled.disconnect(on_cancelled)
+    booked_count_changed.disconnect(on_count_changed)
+
+
+def test_cancel_bookings_releases_seats_per_class(gym_class_factory, booking_factory, listen):
+    spin, yoga = gym_class_factory(max_capacity=5), gym_class_factory(max_capacity=5)
+    spin_bookings = [booking_factory(gym_class=spin) for _ in range(3)]
+    yoga_booking = booking_factory(gym_class=yoga)
+    kept = booking_factory(gym_class=yoga)
+    received = listen()
+
+    released = cancel_bookings(Booking.objects.exclude(pk=kept.pk))
+
+    assert released == {spin.pk: 3, yoga.pk: 1}
+    assert list(Booking.objects.all()) == [kept]
+    assert sorted(received['cancelled']) == sorted([
+        (spin.pk, sorted(booking.member_id for booking in spin_bookings)),
+        (yoga.pk, [yoga_booking.member_id]),
+    ])
+    assert received['booked_count_changed'] == [{spin.pk: -3, yoga.pk: -1}]
+    assert not GymClass.booked_count_drift().exists()
+
+
+def test_cancel_bookings_deletes_in_bounded_chunks(
+    gym_class_factory, booking_factory, listen, django_assert_max_num_queries
+):
+    classes = [gym_class_factory(max_capacity=10) for _ in range(3)]
+    for gc in classes:
+        for _ in range(4):
+            booking_factory(gym_class=gc)
+    received = listen()
+
+    # The selection's last pk, then per chunk of 5: savepoint pair, DELETE ... RETURNING,
+    # and at most two counter updates and two waitlist lookups; then one notification job per class.
+    with django_assert_max_num_queries(1 + 3 * 7 + 3):
+        released = cancel_bookings(Booking.objects.all(), chunk_size=5)
+
+    assert released == {gc.pk: 4 for gc in classes}
+    assert len(received['booked_count_changed']) == 3
+    assert [gym_class_id for gym_class_id, _ in received['cancelled']] == [gc.pk for gc in classes]
+    assert not Booking.objects.exists()
+    assert set(GymClass.objects.values_list('booked_count', flat=True)) == {0}
+
+
+def test_cancel_bookings_with_nothing_selected(db, listen):
+    received = listen()
+
+    assert cancel_bookings(Booking.objects.all()) == {}
+    assert received == {'cancelled': [], 'booked_count_changed': []}
+
+
+def test_cancel_bookings_command_cancels_upcoming_classes_of_a_trainer(
+    trainer_factory, gym_class_factory, booking_factory
+):
+    trainer = trainer_factory()
+    upcoming = gym_class_factory(trainer=trainer, scheduled_at=future_datetime(days=2))
+    finished = gym_class_factory(trainer=trainer, scheduled_at=past_datetime())
+    other_trainer = gym_class_factory(scheduled_at=future_datetime(days=2))
+    booking_factory(gym_class=upcoming)
+    booking_factory(gym_class=upcoming)
+    booking_factory(gym_class=finished)
+    booking_factory(gym_class=other_trainer)
+    out = StringIO()
+
+    call_command('cancel_bookings', '--trainer', str(trainer.pk), stdout=out)
+
+    assert not upcoming.bookings.exists()
+    assert finished.bookings.count() == 1
+    assert other_trainer.bookings.count() == 1
+    assert f'Class {upcoming.pk}: 2 booking(s)' in out.getvalue()
+    assert '2 booking(s) across 1 class(es) cancelled.' in out.getvalue()
+
+
+def test_cancel_bookings_command_dry_run_changes_nothing(gym_class_factory, booking_factory):
+    gc = gym_class_factory()
+    booking_factory(gym_class=gc)
+    out = StringIO()
+
+    call_command('cancel_bookings', '--class', str(gc.pk), '--dry-run', stdout=out)
+
+    assert gc.bookings.count() == 1
+    assert '1 booking(s) across 1 class(es) would be cancelled.' in out.getvalue()
+
+
+def test_cancel_bookings_command_requires_a_filter(db):
+    with pytest.raises(CommandError, match='at least one'):
+        call_command('cancel_bookings')
+
+
+def test_cancel_bookings_command_clears_the_waitlist_instead_of_promoting(
+    gym_class_factory, booking_factory, user_factory
+):
+    gc = gym_class_factory(max_capacity=1)
+    booking_factory(gym_class=gc)
+    WaitlistEntry.join(member=user_factory(), gym_class_id=gc.pk)
+
+    call_command('cancel_bookings', '--class', str(gc.pk), stdout=StringIO())
+
+    assert not gc.bookings.exists()
+    assert not WaitlistEntry.objects.exists()
+
+
+def test_cancel_bookings_deletes_on_the_primary_during_replica_reads(gym_class_factory, booking_factory):
+    gym_class = gym_class_factory(max_capacity=5)
+    booking_factory(gym_class=gym_class)
+    token = allow_replica_reads()
+    try:
+        with override_settings(DATABASE_ROUTERS=['config.routers.PrimaryReplicaRouter']):
+            # Unpinned, the selection would be read from the (unconfigured) replica.
+            assert Booking.objects.all().db == 'replica'
+            released = cancel_bookings(Booking.objects.all(), promote_waitlist=False)
+    finally:
+        reset_replica_reads(token)
+
+    assert released == {gym_class.pk: 1}
+    assert not Booking.objects.exists()
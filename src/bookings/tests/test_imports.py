@@ -0,0 +1,110 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from src.bookings.imports import (
+    UNKNOWN_CLASS_MESSAGE,
+    UNKNOWN_MEMBER_MESSAGE,
+    RejectedBooking,
+    import_bookings,
+)
+from src.bookings.models import CLASS_FULL_MESSAGE, CLASS_STARTED_MESSAGE, DUPLICATE_BOOKING_MESSAGE, Booking
+from src.classes.models import GymClass
+from tests.helpers import past_datetime
+
+pytestmark = pytest.mark.integration
+
+
+def test_import_creates_bookings_and_counts_seats(user_factory, gym_class_factory):
+    members = [user_factory() for _ in range(3)]
+    gc = gym_class_factory(max_capacity=5)
+
+    result = import_bookings([(member.pk, gc.pk) for member in members])
+
+    assert result == (3, [])
+    assert set(Booking.objects.values_list('member_id', flat=True)) == {member.pk for member in members}
+    gc.refresh_from_db()
+    assert gc.booked_count == 3
+    assert not GymClass.booked_count_drift().exists()
+
+
+def test_import_rejects_rows_breaking_the_booking_rules(user_factory, gym_class_factory, booking_factory):
+    member, other, latecomer = user_factory(), user_factory(), user_factory()
+    open_class = gym_class_factory(max_capacity=2)
+    past_class = gym_class_factory(scheduled_at=past_datetime())
+    booking_factory(member=other, gym_class=open_class)
+
+    result = import_bookings([
+        (member.pk, past_class.pk),
+        (other.pk, open_class.pk),
+        (member.pk, open_class.pk),
+        (member.pk, open_class.pk),
+        (latecomer.pk, open_class.pk),
+        (999999, open_class.pk),
+        (member.pk, 999999),
+    ])
+
+    assert result.created == 1
+    assert result.rejected == [
+        RejectedBooking(1, member.pk, past_class.pk, CLASS_STARTED_MESSAGE),
+        RejectedBooking(2, other.pk, open_class.pk, DUPLICATE_BOOKING_MESSAGE),
+        RejectedBooking(4, member.pk, open_class.pk, DUPLICATE_BOOKING_MESSAGE),
+        RejectedBooking(5, latecomer.pk, open_class.pk, CLASS_FULL_MESSAGE),
+        RejectedBooking(6, 999999, open_class.pk, UNKNOWN_MEMBER_MESSAGE),
+        RejectedBooking(7, member.pk, 999999, UNKNOWN_CLASS_MESSAGE),
+    ]
+    open_class.refresh_from_db()
+    assert open_class.booked_count == 2
+
+
+def test_import_validates_each_batch_with_a_fixed_number_of_queries(
+    user_factory, gym_class_factory, django_assert_max_num_queries
+):
+    members = [user_factory() for _ in range(30)]
+    classes = [gym_class_factory(max_capacity=30) for _ in range(3)]
+    rows = [(member.pk, gc.pk) for member in members for gc in classes]
+
+    # Per batch of 45: savepoint pair, members, classes, bookings, insert and one counter update per class.
+    with django_assert_max_num_queries(2 * (2 + 3 + 1 + 3)):
+        result = import_bookings(rows, batch_size=45)
+
+    assert result == (90, [])
+
+
+def test_import_bookings_command_reports_rejected_lines(tmp_path, user_factory, gym_class_factory):
+    member = user_factory(username='alice')
+    gc = gym_class_factory(max_capacity=1)
+    csv_file = tmp_path / 'bookings.csv'
+    csv_file.write_text(f'username,gym_class_id\nalice,{gc.pk}\nbob,{gc.pk}\nalice,not-a-class\n')
+    out = StringIO()
+
+    call_command('import_bookings', str(csv_file), stdout=out)
+
+    assert Booking.objects.get().member == member
+    assert f'line 3: bob,{gc.pk}: {UNKNOWN_MEMBER_MESSAGE}' in out.getvalue()
+    assert f'line 4: alice,not-a-class: {UNKNOWN_CLASS_MESSAGE}' in out.getvalue()
+    assert '1 booking(s) imported, 2 rejected.' in out.getvalue()
+
+
+def test_import_bookings_command_dry_run_saves_nothing(tmp_path, user_factory, gym_class_factory):
+    user_factory(username='alice')
+    gc = gym_class_factory()
+    csv_file = tmp_path / 'bookings.csv'
+    csv_file.write_text(f'username,gym_class_id\nalice,{gc.pk}\n')
+    out = StringIO()
+
+    call_command('import_bookings', str(csv_file), '--dry-run', stdout=out)
+
+    assert not Booking.objects.exists()
+    gc.refresh_from_db()
+    assert gc.booked_count == 0
+    assert '1 booking(s) valid, 0 rejected.' in out.getvalue()
+
+
+def test_import_bookings_command_requires_columns(tmp_path, db):
+    csv_file = tmp_path / 'bookings.csv'
+    csv_file.write_text('member,class\n')
+
+    with pytest.raises(CommandError, match='Missing CSV column'):
+        call_command('import_bookings', str(csv_file))
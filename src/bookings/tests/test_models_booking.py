@@ -1,6 +1,7 @@
 import pytest
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError, transaction
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 
 from src.bookings.models import Booking
 from src.classes.models import GymClass
@@ -80,6 +81,75 @@ def test_create_for_member_success_path(user_factory, gym_class_factory):
     assert booking.gym_class == gym_class
 
 
+def test_create_for_member_counts_the_reserved_seat(user_factory, gym_class_factory):
+    gym_class = gym_class_factory(max_capacity=2)
+
+    Booking.create_for_member(member=user_factory(), gym_class_id=gym_class.pk)
+
+    gym_class.refresh_from_db()
+    assert gym_class.booked_count == 1
+
+
+def test_create_for_member_success_path_uses_three_statements(user_factory, gym_class_factory):
+    user = user_factory()
+    gym_class = gym_class_factory()
+
+    with CaptureQueriesContext(connection) as ctx:
+        Booking.create_for_member(member=user, gym_class_id=gym_class.pk)
+
+    # Ignore the savepoints wrapping the test's own transaction.
+    statements = [q['sql'] for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]
+    assert len(statements) == 3
+    assert statements[0].startswith('UPDATE')
+    assert statements[1].startswith('INSERT INTO "bookings_booking"')
+    # The confirmation email job, committed with the booking.
+    assert statements[2].startswith('INSERT INTO "jobs_job"')
+
+
+def test_create_for_member_rejects_full_class(user_factory, gym_class_factory):
+    gym_class = gym_class_factory(max_capacity=1)
+    Booking.create_for_member(member=user_factory(), gym_class_id=gym_class.pk)
+
+    with pytest.raises(ValidationError, match='This class is full.') as exc_info:
+        Booking.create_for_member(member=user_factory(), gym_class_id=gym_class.pk)
+
+    assert exc_info.value.code == 'full'
+    gym_class.refresh_from_db()
+    assert gym_class.booked_count == 1
+    assert gym_class.bookings.count() == 1
+
+
+def test_create_for_member_rejects_started_class(user_factory, gym_class_factory):
+    gym_class = gym_class_factory(scheduled_at=past_datetime(days=1))
+
+    with pytest.raises(ValidationError, match='Cannot book a class that has already started.') as exc_info:
+        Booking.create_for_member(member=user_factory(), gym_class_id=gym_class.pk)
+
+    assert exc_info.value.code == 'started'
+
+
+def test_create_for_member_rejects_duplicate_and_releases_seat(user_factory, gym_class_factory):
+    user = user_factory()
+    gym_class = gym_class_factory(max_capacity=5)
+    Booking.create_for_member(member=user, gym_class_id=gym_class.pk)
+
+    with pytest.raises(ValidationError, match='This member already has a booking for this class.') as exc_info:
+        Booking.create_for_member(member=user, gym_class_id=gym_class.pk)
+
+    assert exc_info.value.code == 'duplicate'
+    gym_class.refresh_from_db()
+    assert gym_class.booked_count == 1
+
+
+def test_create_for_member_duplicate_on_full_class_reports_duplicate(user_factory, gym_class_factory):
+    user = user_factory()
+    gym_class = gym_class_factory(max_capacity=1)
+    Booking.create_for_member(member=user, gym_class_id=gym_class.pk)
+
+    with pytest.raises(ValidationError, match='This member already has a booking for this class.'):
+        Booking.create_for_member(member=user, gym_class_id=gym_class.pk)
+
+
 def test_create_for_member_raises_for_non_existent_class(user_factory):
     user = user_factory()
 
@@ -0,0 +1,145 @@
+import pytest
+from django.core.exceptions import ValidationError
+
+from src.bookings.models import (
+    ALREADY_WAITLISTED_MESSAGE,
+    CLASS_NOT_FULL_MESSAGE,
+    CLASS_STARTED_MESSAGE,
+    DUPLICATE_BOOKING_MESSAGE,
+    Booking,
+    WaitlistEntry,
+)
+from src.classes.models import GymClass
+from tests.helpers import past_datetime
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def full_class(gym_class_factory, booking_factory):
+    gc = gym_class_factory(max_capacity=1)
+    booking_factory(gym_class=gc)
+    return gc
+
+
+def _queue(gym_class, members):
+    return [WaitlistEntry.join(member=member, gym_class_id=gym_class.pk) for member in members]
+
+
+def test_join_hands_out_positions_in_order(full_class, user_factory):
+    entries = _queue(full_class, [user_factory() for _ in range(3)])
+
+    assert [entry.position for entry in entries] == [1, 2, 3]
+
+
+@pytest.mark.parametrize('message', [CLASS_NOT_FULL_MESSAGE, CLASS_STARTED_MESSAGE])
+def test_join_requires_a_full_upcoming_class(gym_class_factory, booking_factory, user_factory, message):
+    if message == CLASS_STARTED_MESSAGE:
+        gc = gym_class_factory(max_capacity=1, scheduled_at=past_datetime())
+        booking_factory(gym_class=gc)
+    else:
+        gc = gym_class_factory(max_capacity=2)
+
+    with pytest.raises(ValidationError, match=message):
+        WaitlistEntry.join(member=user_factory(), gym_class_id=gc.pk)
+
+
+def test_join_rejects_booked_and_already_waiting_members(full_class, user_factory):
+    booked_member = full_class.bookings.get().member
+    waiting = user_factory()
+    WaitlistEntry.join(member=waiting, gym_class_id=full_class.pk)
+
+    with pytest.raises(ValidationError, match=DUPLICATE_BOOKING_MESSAGE):
+        WaitlistEntry.join(member=booked_member, gym_class_id=full_class.pk)
+    with pytest.raises(ValidationError, match=ALREADY_WAITLISTED_MESSAGE):
+        WaitlistEntry.join(member=waiting, gym_class_id=full_class.pk)
+
+
+def test_position_of_follows_promotions_and_leavers(full_class, user_factory):
+    first, second, third, fourth = members = [user_factory() for _ in range(4)]
+    _queue(full_class, members)
+
+    full_class.bookings.get().delete()  # promotes `first`
+    assert WaitlistEntry.leave(member=third, gym_class_id=full_class.pk)
+
+    assert WaitlistEntry.position_of(member=first, gym_class_id=full_class.pk) is None
+    assert WaitlistEntry.position_of(member=second, gym_class_id=full_class.pk) == 1
+    assert WaitlistEntry.position_of(member=third, gym_class_id=full_class.pk) is None
+    assert WaitlistEntry.position_of(member=fourth, gym_class_id=full_class.pk) == 2
+
+
+def test_position_of_is_a_single_query(full_class, user_factory, django_assert_num_queries):
+    members = [user_factory() for _ in range(5)]
+    _queue(full_class, members)
+
+    with django_assert_num_queries(1):
+        assert WaitlistEntry.position_of(member=members[3], gym_class_id=full_class.pk) == 4
+
+
+def test_leave_when_not_waiting(full_class, user_factory):
+    assert WaitlistEntry.leave(member=user_factory(), gym_class_id=full_class.pk) is False
+
+
+def test_cancelling_a_booking_promotes_the_head_of_the_waitlist(full_class, user_factory):
+    first, second = user_factory(), user_factory()
+    _queue(full_class, [first, second])
+
+    full_class.bookings.get().delete()
+
+    assert list(Booking.objects.filter(gym_class=full_class).values_list('member', flat=True)) == [first.pk]
+    assert list(WaitlistEntry.objects.values_list('member', flat=True)) == [second.pk]
+    full_class.refresh_from_db()
+    assert full_class.booked_count == 1
+
+
+def test_promote_drops_members_who_booked_meanwhile(full_class, user_factory, booking_factory):
+    first, second, third = user_factory(), user_factory(), user_factory()
+    _queue(full_class, [first, second, third])
+    GymClass.objects.filter(pk=full_class.pk).update(max_capacity=3)
+    booking_factory(member=first, gym_class=full_class)
+
+    promoted = WaitlistEntry.promote(full_class.pk)
+
+    assert [booking.member for booking in promoted] == [second]
+    assert list(WaitlistEntry.objects.values_list('member', flat=True)) == [third.pk]
+
+
+def test_raising_capacity_promotes_into_the_added_seats(full_class, user_factory):
+    first, second, third = user_factory(), user_factory(), user_factory()
+    _queue(full_class, [first, second, third])
+
+    full_class.max_capacity = 3
+    full_class.save()
+
+    booked = set(Booking.objects.filter(gym_class=full_class).values_list('member', flat=True))
+    assert {first.pk, second.pk} <= booked
+    assert list(WaitlistEntry.objects.values_list('member', flat=True)) == [third.pk]
+    full_class.refresh_from_db()
+    assert full_class.booked_count == 3
+
+
+def test_saving_without_added_capacity_promotes_nobody(full_class, user_factory):
+    _queue(full_class, [user_factory()])
+
+    full_class.max_capacity = 1
+    full_class.name = 'Renamed'
+    full_class.save()
+
+    assert WaitlistEntry.objects.count() == 1
+
+
+def test_promote_stops_when_the_class_has_started(full_class, user_factory):
+    _queue(full_class, [user_factory()])
+    GymClass.objects.filter(pk=full_class.pk).update(scheduled_at=past_datetime(), max_capacity=2)
+
+    assert WaitlistEntry.promote(full_class.pk) == []
+    assert WaitlistEntry.objects.count() == 1
+
+
+def test_deleting_the_class_does_not_promote(full_class, user_factory):
+    _queue(full_class, [user_factory()])
+
+    full_class.delete()
+
+    assert not Booking.objects.exists()
+    assert not WaitlistEntry.objects.exists()
@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.db import transaction
+from django.utils import timezone
+
+from src.bookings.cancellations import cancel_bookings
+from src.bookings.models import Booking
+from src.bookings.notifications import (
+    BOOKING_CANCELLATION, BOOKING_CONFIRMATION, CLASS_REMINDER, REMINDER_LEAD,
+)
+from src.jobs.models import Job
+from src.jobs.queue import run_due_jobs
+
+pytestmark = pytest.mark.integration
+
+
+def run_all_jobs():
+    Job.objects.update(run_at=timezone.now())
+    while run_due_jobs(batch_size=10):
+        pass
+
+
+def test_booking_enqueues_confirmation_in_its_transaction(user_factory, gym_class_factory):
+    gym_class = gym_class_factory()
+
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            Booking.create_for_member(member=user_factory(), gym_class_id=gym_class.pk)
+            raise RuntimeError('rolled back')
+
+    assert not Job.objects.filter(kind=BOOKING_CONFIRMATION).exists()
+
+    user = user_factory()
+    Booking.create_for_member(member=user, gym_class_id=gym_class.pk)
+
+    job = Job.objects.get(kind=BOOKING_CONFIRMATION)
+    assert job.payload == {'member_id': user.pk, 'gym_class_id': gym_class.pk}
+
+
+def test_confirmation_job_emails_the_member(user_factory, gym_class_factory):
+    user = user_factory(email='sam@example.com')
+    gym_class = gym_class_factory(name='Spin')
+    Booking.create_for_member(member=user, gym_class_id=gym_class.pk)
+
+    run_due_jobs()
+
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].subject == 'Booking confirmed: Spin'
+    assert mail.outbox[0].to == ['sam@example.com']
+
+
+def test_confirmation_is_skipped_when_booking_was_cancelled(user_factory, gym_class_factory):
+    user = user_factory(email='sam@example.com')
+    gym_class = gym_class_factory()
+    Booking.create_for_member(member=user, gym_class_id=gym_class.pk).delete()
+
+    run_all_jobs()
+
+    assert [message.subject for message in mail.outbox] == [f'Booking cancelled: {gym_class.name}']
+
+
+def test_cancelling_a_booking_enqueues_a_notice(booking_factory):
+    booking = booking_factory()
+
+    booking.delete()
+
+    job = Job.objects.get(kind=BOOKING_CANCELLATION)
+    assert job.payload == {'gym_class_id': booking.gym_class_id, 'member_ids': [booking.member_id]}
+
+
+def test_deleting_a_class_does_not_announce_cancellations(booking_factory):
+    booking = booking_factory()
+    Job.objects.all().delete()
+
+    booking.gym_class.delete()
+
+    assert not Job.objects.filter(kind=BOOKING_CANCELLATION).exists()
+
+
+def test_bulk_cancel_enqueues_one_notice_per_class(user_factory, gym_class_factory, booking_factory):
+    spin, yoga = gym_class_factory(name='Spin'), gym_class_factory(name='Yoga')
+    for gym_class in (spin, spin, yoga):
+        booking_factory(member=user_factory(email='m@example.com'), gym_class=gym_class)
+
+    cancel_bookings(Booking.objects.all())
+
+    jobs = Job.objects.filter(kind=BOOKING_CANCELLATION)
+    assert sorted(len(job.payload['member_ids']) for job in jobs) == [1, 2]
+    run_all_jobs()
+    assert sorted(message.subject for message in mail.outbox) == [
+        'Booking cancelled: Spin', 'Booking cancelled: Spin', 'Booking cancelled: Yoga',
+    ]
+
+
+def test_class_reminder_runs_an_hour_before_and_is_rescheduled(gym_class_factory):
+    gym_class = gym_class_factory()
+
+    job = Job.objects.get(kind=CLASS_REMINDER)
+    assert job.run_at == gym_class.scheduled_at - REMINDER_LEAD
+
+    gym_class.scheduled_at += timedelta(days=1)
+    gym_class.save()
+
+    job = Job.objects.get(kind=CLASS_REMINDER)
+    assert job.run_at == gym_class.scheduled_at - REMINDER_LEAD
+
+
+def test_class_reminder_emails_every_booked_member(user_factory, gym_class_factory, booking_factory):
+    gym_class = gym_class_factory(name='Spin')
+    for email in ('a@example.com', 'b@example.com', ''):
+        booking_factory(member=user_factory(email=email), gym_class=gym_class)
+    Job.objects.exclude(kind=CLASS_REMINDER).delete()
+
+    run_all_jobs()
+
+    assert sorted(message.to[0] for message in mail.outbox) == ['a@example.com', 'b@example.com']
+    assert {message.subject for message in mail.outbox} == {'Starting soon: Spin'}
@@ -67,3 +67,17 @@ def test_booking_create_validation_error(auth_client, gym_class_factory):
 
     messages = list(get_messages(response.wsgi_request))
     assert any('Cannot book a class that has already started.' in str(m) for m in messages)
+
+
+def test_booking_create_full_class_shows_error(auth_client, gym_class_factory, booking_factory):
+    client, user = auth_client
+    gc = gym_class_factory(max_capacity=1)
+    booking_factory(gym_class=gc)
+    url = reverse('booking-create', kwargs={'class_id': gc.pk})
+
+    response = client.post(url)
+
+    assert response.status_code == 302
+    assert response.url == reverse('class-detail', kwargs={'pk': gc.pk})
+    messages = list(get_messages(response.wsgi_request))
+    assert any('This class is full.' in str(m) for m in messages)
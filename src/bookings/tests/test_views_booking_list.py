@@ -139,3 +139,74 @@ def test_booking_list_upcoming_section_has_cancel_button(auth_client, booking_fa
 
     cancel_url = reverse('booking-cancel', kwargs={'pk': booking.pk})
     assert cancel_url in content
+
+
+def test_booking_list_fetches_bookings_in_one_query(
+    auth_client, booking_factory, gym_class_factory, django_assert_num_queries
+):
+    """The dashboard reads the member's bookings with a single query."""
+    client, user = auth_client
+    booking_factory(member=user, gym_class=gym_class_factory(scheduled_at=future_datetime(days=1)))
+    booking_factory(member=user, gym_class=gym_class_factory(scheduled_at=past_datetime(days=1)))
+    url = reverse('booking-list')
+    client.get(url)  # warm up the session and user lookups
+
+    with django_assert_num_queries(4):  # session, user, version, bookings
+        response = client.get(url)
+
+    assert len(response.context['upcoming_bookings']) == 1
+    assert len(response.context['completed_bookings']) == 1
+
+
+def test_booking_list_paginates_completed_history(auth_client, booking_factory, gym_class_factory):
+    """Completed bookings are split into pages, most recent first."""
+    client, user = auth_client
+    bookings = [
+        booking_factory(member=user, gym_class=gym_class_factory(scheduled_at=past_datetime(days=days)))
+        for days in range(1, 15)
+    ]
+    url = reverse('booking-list')
+
+    first = client.get(url)
+    second = client.get(url + '?page=2')
+
+    assert [b.pk for b in first.context['completed_bookings']] == [b.pk for b in bookings[:12]]
+    assert [b.pk for b in second.context['completed_bookings']] == [b.pk for b in bookings[12:]]
+    assert 'rel="next"' in first.content.decode()
+
+
+def test_booking_list_answers_304_until_the_members_bookings_change(
+    auth_client, booking_factory, gym_class_factory, django_assert_num_queries
+):
+    client, user = auth_client
+    booking_factory(member=user, gym_class=gym_class_factory(scheduled_at=future_datetime(days=1)))
+    url = reverse('booking-list')
+    client.get(url)  # sets the CSRF cookie the logout form uses
+    first = client.get(url)
+
+    with django_assert_num_queries(3):  # session, user, version
+        unchanged = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+    booking_factory(gym_class=gym_class_factory())  # another member's booking
+    still_unchanged = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+    booking_factory(member=user, gym_class=gym_class_factory(scheduled_at=future_datetime(days=2)))
+    changed = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+    assert unchanged.status_code == 304
+    assert still_unchanged.status_code == 304
+    assert changed.status_code == 200
+    assert len(changed.context['upcoming_bookings']) == 2
+
+
+def test_booking_list_is_not_versioned_while_a_booked_class_may_be_running(
+    auth_client, booking_factory, gym_class_factory
+):
+    """A running class moves to the completed section when it ends, with nothing written."""
+    client, user = auth_client
+    running = gym_class_factory(scheduled_at=past_datetime(days=0, hours=1), duration_minutes=90)
+    booking_factory(member=user, gym_class=running)
+    url = reverse('booking-list')
+    client.get(url)
+
+    response = client.get(url)
+
+    assert not response.has_header('Last-Modified')
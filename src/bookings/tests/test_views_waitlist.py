@@ -0,0 +1,100 @@
+import pytest
+from django.urls import reverse
+
+from src.bookings.models import Booking, WaitlistEntry
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def full_class(gym_class_factory, booking_factory):
+    gc = gym_class_factory(max_capacity=1)
+    booking_factory(gym_class=gc)
+    return gc
+
+
+def test_join_waitlist_shows_position_on_class_page(auth_client, full_class):
+    client, user = auth_client
+    response = client.post(reverse('waitlist-join', kwargs={'class_id': full_class.pk}), follow=True)
+
+    assert response.redirect_chain[-1][0] == reverse('class-detail', kwargs={'pk': full_class.pk})
+    assert response.context['waitlist_position'] == 1
+    assert b'You are #1 on the waitlist' in response.content
+    assert WaitlistEntry.objects.filter(member=user, gym_class=full_class).exists()
+
+
+def test_join_waitlist_for_class_with_free_spots_shows_error(auth_client, gym_class_factory):
+    client, user = auth_client
+    gc = gym_class_factory(max_capacity=2)
+
+    response = client.post(reverse('waitlist-join', kwargs={'class_id': gc.pk}), follow=True)
+
+    assert b'This class still has free spots.' in response.content
+    assert not WaitlistEntry.objects.exists()
+
+
+def test_join_waitlist_for_missing_class_returns_404(auth_client, db):
+    client, user = auth_client
+    response = client.post(reverse('waitlist-join', kwargs={'class_id': 999999}))
+
+    assert response.status_code == 404
+
+
+def test_join_waitlist_requires_login(client, full_class):
+    response = client.post(reverse('waitlist-join', kwargs={'class_id': full_class.pk}))
+
+    assert response.status_code == 302
+    assert response.url.startswith(reverse('login'))
+
+
+def test_leave_waitlist(auth_client, full_class):
+    client, user = auth_client
+    WaitlistEntry.join(member=user, gym_class_id=full_class.pk)
+
+    response = client.post(reverse('waitlist-leave', kwargs={'class_id': full_class.pk}), follow=True)
+
+    assert b'You left the waitlist.' in response.content
+    assert response.context['waitlist_position'] is None
+    assert not WaitlistEntry.objects.exists()
+
+
+def test_full_class_page_offers_the_waitlist(auth_client, full_class):
+    client, user = auth_client
+
+    response = client.get(reverse('class-detail', kwargs={'pk': full_class.pk}))
+
+    assert b'Join Waitlist' in response.content
+    assert response.context['waitlist_position'] is None
+
+
+def test_cancel_view_promotes_the_head_of_the_waitlist(auth_client, gym_class_factory, booking_factory, user_factory):
+    client, user = auth_client
+    gc = gym_class_factory(max_capacity=1)
+    booking = booking_factory(member=user, gym_class=gc)
+    waiting = user_factory()
+    WaitlistEntry.join(member=waiting, gym_class_id=gc.pk)
+
+    client.post(reverse('booking-cancel', kwargs={'pk': booking.pk}))
+
+    assert Booking.objects.get(gym_class=gc).member == waiting
+    assert not WaitlistEntry.objects.exists()
+
+
+def test_admin_cancel_action_promotes_one_member_per_freed_seat(
+    admin_client, gym_class_factory, booking_factory, user_factory
+):
+    gc = gym_class_factory(max_capacity=2)
+    bookings = [booking_factory(gym_class=gc), booking_factory(gym_class=gc)]
+    waiting = [user_factory() for _ in range(3)]
+    for member in waiting:
+        WaitlistEntry.join(member=member, gym_class_id=gc.pk)
+
+    admin_client.post('/admin/bookings/booking/', {
+        'action': 'cancel_selected_bookings',
+        '_selected_action': [booking.pk for booking in bookings],
+    })
+
+    assert set(Booking.objects.values_list('member', flat=True)) == {waiting[0].pk, waiting[1].pk}
+    assert list(WaitlistEntry.objects.values_list('member', flat=True)) == [waiting[2].pk]
+    gc.refresh_from_db()
+    assert gc.booked_count == 2
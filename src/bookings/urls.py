@@ -1,9 +1,25 @@
+from django.conf import settings
 from django.urls import path
 
-from src.bookings.views import BookingCancelView, BookingCreateView, BookingListView
+from src.bookings.views import (
+    AsyncBookingCreateView,
+    AsyncBookingListView,
+    BookingCancelView,
+    BookingCreateView,
+    BookingListView,
+    WaitlistJoinView,
+    WaitlistLeaveView,
+)
+
+if settings.APP_SERVER == 'asgi':
+    booking_list, booking_create = AsyncBookingListView.as_view(), AsyncBookingCreateView.as_view()
+else:
+    booking_list, booking_create = BookingListView.as_view(), BookingCreateView.as_view()
 
 urlpatterns = [
-    path('', BookingListView.as_view(), name='booking-list'),
-    path('book/<int:class_id>/', BookingCreateView.as_view(), name='booking-create'),
+    path('', booking_list, name='booking-list'),
+    path('book/<int:class_id>/', booking_create, name='booking-create'),
     path('cancel/<int:pk>/', BookingCancelView.as_view(), name='booking-cancel'),
+    path('waitlist/join/<int:class_id>/', WaitlistJoinView.as_view(), name='waitlist-join'),
+    path('waitlist/leave/<int:class_id>/', WaitlistLeaveView.as_view(), name='waitlist-leave'),
 ]
@@ -2,9 +2,11 @@ from datetime import timedelta
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.views import redirect_to_login
 from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
 from django.db import IntegrityError
-from django.db.models import F, ExpressionWrapper, DateTimeField
+from django.db.models import Count, Max, Q
 from django.http import Http404
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
@@ -13,8 +15,10 @@ from django.views import View
 from django.views.generic import CreateView, DeleteView, ListView
 
 from src.bookings.forms import RegistrationForm
-from src.bookings.models import Booking
+from src.bookings.models import Booking, WaitlistEntry
+from src.classes.conditional import ConditionalPageMixin
 from src.classes.models import GymClass
+from src.metrics.instruments import BOOKINGS_CREATED, BOOKINGS_REJECTED
 
 
 class RegisterView(CreateView):
@@ -28,27 +32,74 @@ class RegisterView(CreateView):
         return super().dispatch(request, *args, **kwargs)
 
 
-class BookingListView(LoginRequiredMixin, ListView):
+class AsyncLoginRequiredMixin(LoginRequiredMixin):
+    """``LoginRequiredMixin`` for views with async handlers.
+
+    Resolves the user with ``request.auser()`` and stores it on the request
+    so later sync code (templates, context processors) does not look it up
+    again.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path(), self.get_login_url(), self.get_redirect_field_name())
+        return await super(LoginRequiredMixin, self).dispatch(request, *args, **kwargs)
+
+
+class BookingListView(LoginRequiredMixin, ConditionalPageMixin, ListView):
     model = Booking
     template_name = 'bookings/booking_list.html'
+    completed_paginate_by = 12
 
     def get_queryset(self):
+        # Only the columns the dashboard cards show.
         return (
             Booking.objects.filter(member=self.request.user)
             .select_related('gym_class', 'gym_class__trainer')
+            .only(
+                'booked_at',
+                'gym_class__name', 'gym_class__scheduled_at', 'gym_class__duration_minutes',
+                'gym_class__trainer__first_name', 'gym_class__trainer__last_name',
+            )
+            .order_by('gym_class__scheduled_at', 'pk')
         )
 
+    def get_page_version(self):
+        now = timezone.now()
+        started = Q(gym_class__scheduled_at__lte=now)
+        version = Booking.objects.filter(member=self.request.user).aggregate(
+            bookings=Count('id'),
+            last_booked=Max('booked_at'),
+            updated=Max('gym_class__updated_at'),
+            started=Count('id', filter=started),
+            last_start=Max('gym_class__scheduled_at', filter=started),
+            longest=Max('gym_class__duration_minutes'),
+        )
+        if version['last_start'] and version['last_start'] + timedelta(minutes=version['longest']) > now:
+            # A class may be running and move to the completed section at any
+            # moment; once every started class has ended, ``started`` counts them.
+            return None
+        last_modified = max(filter(None, (version['last_booked'], version['updated'])), default=None)
+        return last_modified, tuple(version.values())
+
+    def get(self, request, *args, **kwargs):
+        # One query for the whole dashboard; the split into upcoming and
+        # completed happens in memory.
+        self.object_list = list(self.get_queryset())
+        return self.render_to_response(self.get_context_data())
+
     def get_context_data(self, **kwargs):
+        bookings = self.object_list
         context = super().get_context_data(**kwargs)
         now = timezone.now()
-        qs = self.get_queryset().annotate(
-            end_time=ExpressionWrapper(
-                F('gym_class__scheduled_at') + timedelta(minutes=1) * F('gym_class__duration_minutes'),
-                output_field=DateTimeField(),
-            ),
-        )
-        context['upcoming_bookings'] = qs.filter(end_time__gt=now).order_by('gym_class__scheduled_at')
-        context['completed_bookings'] = qs.filter(end_time__lte=now).order_by('-gym_class__scheduled_at')
+        upcoming, completed = [], []
+        for booking in bookings:
+            (upcoming if booking.gym_class.end_time > now else completed).append(booking)
+        completed.reverse()
+        paginator = Paginator(completed, self.completed_paginate_by)
+        context['upcoming_bookings'] = upcoming
+        context['completed_bookings'] = paginator.get_page(self.request.GET.get('page'))
         return context
 
 
@@ -61,15 +112,24 @@ class BookingCreateView(LoginRequiredMixin, View):
             )
         except GymClass.DoesNotExist as exc:
             raise Http404('Class not found.') from exc
-        except IntegrityError:
+        except (IntegrityError, ValidationError) as exc:
+            return self.rejected(request, class_id, exc)
+        return self.booked(request, booking.gym_class)
+
+    def rejected(self, request, class_id, exc):
+        if isinstance(exc, IntegrityError):
+            BOOKINGS_REJECTED.labels(reason='duplicate').inc()
             messages.warning(request, 'You have already booked this class.')
-            return redirect('class-detail', pk=class_id)
-        except ValidationError as e:
-            for msg in e.messages:
+        else:
+            # Errors raised as a list carry no single code.
+            BOOKINGS_REJECTED.labels(reason=getattr(exc, 'code', None) or 'invalid').inc()
+            for msg in exc.messages:
                 messages.error(request, msg)
-            return redirect('class-detail', pk=class_id)
+        return redirect('class-detail', pk=class_id)
 
-        messages.success(request, f'Successfully booked {booking.gym_class.name}!')
+    def booked(self, request, gym_class):
+        BOOKINGS_CREATED.inc()
+        messages.success(request, f'Successfully booked {gym_class.name}!')
         return redirect('booking-list')
 
 
@@ -87,3 +147,48 @@ class BookingCancelView(LoginRequiredMixin, DeleteView):
             return redirect('booking-list')
         messages.success(self.request, f'Booking for {booking.gym_class.name} cancelled.')
         return super().form_valid(form)
+
+
+class WaitlistJoinView(LoginRequiredMixin, View):
+    def post(self, request, class_id):
+        try:
+            WaitlistEntry.join(member=request.user, gym_class_id=class_id)
+        except GymClass.DoesNotExist as exc:
+            raise Http404('Class not found.') from exc
+        except ValidationError as e:
+            for msg in e.messages:
+                messages.error(request, msg)
+        else:
+            messages.success(request, 'You joined the waitlist and will be booked in as soon as a spot frees up.')
+        return redirect('class-detail', pk=class_id)
+
+
+class WaitlistLeaveView(LoginRequiredMixin, View):
+    def post(self, request, class_id):
+        if WaitlistEntry.leave(member=request.user, gym_class_id=class_id):
+            messages.success(request, 'You left the waitlist.')
+        return redirect('class-detail', pk=class_id)
+
+
+# Async versions of the views above, routed instead of them under the ASGI
+# server (see urls.py). Under WSGI every async handler would cost the request
+# an async_to_sync hop and gain no concurrency.
+
+class AsyncBookingListView(AsyncLoginRequiredMixin, BookingListView):
+    async def get(self, request, *args, **kwargs):
+        self.object_list = [booking async for booking in self.get_queryset()]
+        return self.render_to_response(self.get_context_data())
+
+
+class AsyncBookingCreateView(AsyncLoginRequiredMixin, BookingCreateView):
+    async def post(self, request, class_id):
+        try:
+            booking = await Booking.acreate_for_member(
+                member=request.user,
+                gym_class_id=class_id,
+            )
+        except GymClass.DoesNotExist as exc:
+            raise Http404('Class not found.') from exc
+        except (IntegrityError, ValidationError) as exc:
+            return self.rejected(request, class_id, exc)
+        return self.booked(request, await GymClass.objects.only('name').aget(pk=booking.gym_class_id))
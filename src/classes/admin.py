@@ -1,9 +1,15 @@
-from django.contrib import admin
-from django.db.models import Count
+from datetime import timedelta
+
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.template.response import TemplateResponse
+from django.utils import timezone
 
 from src.bookings.models import Booking
 
-from .models import GymClass, Trainer
+from .forms import ScheduleGenerationForm
+from .models import ClassTemplate, GymClass, Trainer
+from .schedule import generate_schedule, plan_schedule
 
 
 class BookingInline(admin.TabularInline):
@@ -34,17 +40,65 @@ class GymClassAdmin(admin.ModelAdmin):
     raw_id_fields = ['trainer']
     inlines = [BookingInline]
     date_hierarchy = 'scheduled_at'
-    readonly_fields = ['created_at']
+    readonly_fields = ['booked_count', 'created_at']
+    list_select_related = ['trainer']
     list_per_page = 25
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        return qs.annotate(booking_count=Count('bookings'))
-
-    @admin.display(description='Bookings', ordering='booking_count')
+    @admin.display(description='Bookings', ordering='booked_count')
     def get_booking_count(self, obj):
-        return obj.booking_count
+        return obj.booked_count
 
     @admin.display(description='Available Spots')
     def get_available_spots(self, obj):
-        return max(obj.max_capacity - obj.booking_count, 0)
+        return obj.available_spots_display
+
+
+@admin.register(ClassTemplate)
+class ClassTemplateAdmin(admin.ModelAdmin):
+    list_display = [
+        'name', 'trainer', 'weekday', 'start_time', 'duration_minutes', 'max_capacity', 'is_active',
+    ]
+    list_filter = ['weekday', 'is_active', 'trainer']
+    search_fields = ['name']
+    raw_id_fields = ['trainer']
+    readonly_fields = ['created_at']
+    actions = ['generate_classes']
+    list_select_related = ['trainer']
+    list_per_page = 25
+
+    def has_generate_permission(self, request):
+        return request.user.has_perm('classes.add_gymclass')
+
+    @admin.action(description='Generate classes from selected templates', permissions=['generate'])
+    def generate_classes(self, request, queryset):
+        """Preview the sessions the selected templates produce, then create them on confirmation."""
+        templates = list(queryset)
+        submitted = 'start_date' in request.POST
+        today = timezone.localdate()
+        form = ScheduleGenerationForm(
+            request.POST if submitted else None,
+            initial={'start_date': today + timedelta(days=7 - today.weekday())},
+        )
+        planned = None
+        if form.is_valid():
+            if 'generate' in request.POST:
+                created, skipped = generate_schedule(templates, **form.cleaned_data)
+                self.message_user(request, f'Created {len(created)} class(es).')
+                if skipped:
+                    self.message_user(
+                        request, f'Skipped {len(skipped)} conflicting session(s).', messages.WARNING,
+                    )
+                return None
+            planned = plan_schedule(templates, **form.cleaned_data)
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Generate classes',
+            'opts': self.model._meta,
+            'templates': templates,
+            'form': form,
+            'planned': planned,
+            'conflict_count': sum(session.conflict is not None for session in planned or ()),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, 'admin/classes/classtemplate/generate_classes.html', context)
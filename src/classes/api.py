@@ -0,0 +1,106 @@
+"""JSON read API for the class catalogue, for the mobile app and kiosk screens.
+
+Rows are read with ``.values()`` (only the columns the payload needs, no
+model instances) and gzip-compressed. Every response carries an ETag built
+from ``GymClass.updated_at``, which moves on any change the payload shows,
+bookings and trainer edits included, whichever process made it. A poll
+whose ``If-None-Match`` still matches is answered ``304 Not Modified`` after one
+small version query, without loading or serialising the classes.
+"""
+import hashlib
+
+from django.core.paginator import InvalidPage
+from django.db.models import Count, Max
+from django.http import Http404, JsonResponse
+from django.utils import timezone
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition, require_GET
+
+from src.classes.models import GymClass
+from src.classes.pagination import AFTER_PARAM, BEFORE_PARAM, KeysetPaginator
+
+API_PAGE_SIZE = 100
+
+CLASS_FIELDS = (
+    'id', 'name', 'scheduled_at', 'duration_minutes', 'max_capacity', 'booked_count',
+    'trainer__first_name', 'trainer__last_name',
+)
+
+
+def _etag(*parts):
+    """Return a weak ETag for ``parts``.
+
+    Weak, because one ETag covers the gzip and the identity coding of the
+    same data; whether gzip_page compresses a response is only known after
+    the view runs, and a strong ETag would have to differ between them.
+    """
+    return 'W/"%s"' % hashlib.sha256('|'.join(str(part) for part in parts).encode()).hexdigest()[:32]
+
+
+def _catalogue(request):
+    qs = GymClass.objects.all()
+    if not request.GET.get('show_past'):
+        qs = qs.filter(scheduled_at__gte=timezone.now())
+    return qs
+
+
+def _spots(row):
+    return max(row['max_capacity'] - row['booked_count'], 0)
+
+
+def _serialize(row):
+    trainer = f'{row.pop("trainer__first_name") or ""} {row.pop("trainer__last_name") or ""}'.strip()
+    return {
+        **row,
+        'trainer': trainer or 'TBA',
+        'available_spots': _spots(row),
+        'is_full': _spots(row) == 0,
+    }
+
+
+def class_list_etag(request):
+    # Any edit or booking moves the maximum; an added, removed or started class the count.
+    version = _catalogue(request).aggregate(updated=Max('updated_at'), classes=Count('id'))
+    return _etag(request.GET.urlencode(), version['updated'], version['classes'])
+
+
+def class_etag(request, pk):
+    updated_at = GymClass.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    # An unknown class gets no ETag and falls through to the view's 404.
+    return updated_at and _etag(pk, updated_at)
+
+
+@require_GET
+@condition(etag_func=class_list_etag)
+@gzip_page
+def class_list(request):
+    paginator = KeysetPaginator(_catalogue(request).values(*CLASS_FIELDS), API_PAGE_SIZE)
+    try:
+        page = paginator.page(after=request.GET.get(AFTER_PARAM), before=request.GET.get(BEFORE_PARAM))
+    except InvalidPage as exc:
+        raise Http404(str(exc)) from exc
+    return JsonResponse({
+        'classes': [_serialize(row) for row in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    })
+
+
+@require_GET
+@condition(etag_func=class_etag)
+@gzip_page
+def class_detail(request, pk):
+    row = GymClass.objects.filter(pk=pk).values(*CLASS_FIELDS, 'description').first()
+    if row is None:
+        raise Http404('Class not found.')
+    return JsonResponse(_serialize(row))
+
+
+@require_GET
+@condition(etag_func=class_etag)
+@gzip_page
+def class_spots(request, pk):
+    row = GymClass.objects.filter(pk=pk).values('id', 'max_capacity', 'booked_count').first()
+    if row is None:
+        raise Http404('Class not found.')
+    return JsonResponse({'id': row['id'], 'available_spots': _spots(row), 'is_full': _spots(row) == 0})
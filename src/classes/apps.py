@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ClassesConfig(AppConfig):
     name = 'src.classes'
     verbose_name = 'Classes'
+
+    def ready(self):
+        from src.classes import signals, stats  # noqa: F401
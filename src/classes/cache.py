@@ -0,0 +1,251 @@
+"""Page cache for the public class catalogue.
+
+Rendered ``/classes/`` and ``/classes/<pk>/`` pages are cached for anonymous
+visitors. Detail pages are keyed by class pk and deleted when that class
+changes. A list page records the classes it shows and when it was
+rendered, and a change to one of them (a booking, a trainer rename) stamps
+that class, so only the pages showing it are rendered again. List pages
+also embed a catalogue-wide version, bumped when classes are added,
+removed or rescheduled, which can change what every list page shows.
+
+Invalidation runs after the surrounding transaction commits so a concurrent
+request cannot re-cache data that is about to change, and the page that
+refills the cache reads from the primary, never a lagging read replica.
+It only reaches processes sharing the cache: production defaults to the
+file backend, and the settings refuse ``locmem`` with several workers.
+
+The same anonymous pages are marked ``public`` for CATALOGUE_PROXY_CACHE_SECONDS
+so the Nginx micro-cache can answer bursts of visitors without reaching
+Django; that copy is never purged and may lag a booking by up to that many
+seconds. Pages for a session (logged in, or with flash messages) are
+``private``.
+"""
+import hashlib
+import time
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.template.response import TemplateResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from config.routers import primary_reads
+from src.metrics.instruments import CATALOGUE_CACHE_LOOKUPS
+
+LIST_VERSION_KEY = 'catalogue:list-version'
+HITS_KEY = 'catalogue:hits'
+MISSES_KEY = 'catalogue:misses'
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+
+def detail_page_key(gym_class_id):
+    return f'catalogue:detail:{gym_class_id}'
+
+
+def class_changed_key(gym_class_id):
+    return f'catalogue:changed:{gym_class_id}'
+
+
+def list_version():
+    """Return the catalogue-wide version, bumped when classes are added, removed or rescheduled."""
+    version = cache.get(LIST_VERSION_KEY)
+    if version is None:
+        # Never restart from a version that earlier pages may still be cached under.
+        version = time.time_ns()
+        cache.add(LIST_VERSION_KEY, version, timeout=None)
+    return version
+
+
+def list_page_key(query_string):
+    digest = hashlib.sha256(query_string.encode()).hexdigest()[:16]
+    return f'catalogue:list:{list_version()}:{digest}'
+
+
+def invalidate_classes(gym_class_ids, reorder=False):
+    """Drop cached pages showing any of ``gym_class_ids``.
+
+    With ``reorder``, the classes were added, removed or rescheduled and
+    every list page is dropped, since any of them may now show other classes.
+    """
+    cache.delete_many([detail_page_key(pk) for pk in gym_class_ids])
+    # A list page rendered before this moment and showing the class is stale.
+    changed_at = time.time_ns()
+    cache.set_many(
+        {class_changed_key(pk): changed_at for pk in gym_class_ids},
+        timeout=settings.CATALOGUE_CACHE_TIMEOUT,
+    )
+    if reorder:
+        try:
+            cache.incr(LIST_VERSION_KEY)
+        except ValueError:
+            cache.set(LIST_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_classes_on_commit(gym_class_ids, reorder=False):
+    """Schedule ``invalidate_classes`` for when the current transaction commits."""
+    ids = set(gym_class_ids)
+    if ids:
+        transaction.on_commit(partial(invalidate_classes, ids, reorder=reorder), robust=True)
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def get_stats():
+    """Return the hit/miss counters shared by every process using this cache."""
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / lookups if lookups else None,
+    }
+
+
+def reset_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+def is_shared_page(request):
+    """Return whether ``request`` gets the same page as every other anonymous visitor."""
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+        # Flash messages are per visitor and must not be cached or skipped.
+        and not len(messages.get_messages(request))
+    )
+
+
+class AnonymousPageCacheMixin:
+    """Serve rendered pages from the cache for anonymous ``GET`` requests.
+
+    Views provide ``get_page_cache_key()``. Responses carry an ``X-Cache``
+    header of ``HIT`` or ``MISS``. Works with sync and async views.
+    """
+
+    def get_page_cache_key(self):
+        raise NotImplementedError('Subclasses must define get_page_cache_key().')
+
+    def page_cache_enabled(self, request):
+        return settings.CATALOGUE_CACHE_TIMEOUT > 0 and request.method == 'GET' and is_shared_page(request)
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._async_dispatch(request, *args, **kwargs)
+        lookup = self._lookup_page(request, args, kwargs)
+        if lookup is None:
+            return super().dispatch(request, *args, **kwargs)
+        key, cached = lookup
+        if cached is not None:
+            return cached
+        filled_at = time.time_ns()
+        # The copy is served for CATALOGUE_CACHE_TIMEOUT, so it must not come
+        # from a replica still behind the change that invalidated the old one.
+        with primary_reads():
+            response = super().dispatch(request, *args, **kwargs)
+            if isinstance(response, TemplateResponse):
+                response.render()
+        return _store_on_render(key, filled_at, response)
+
+    async def _async_dispatch(self, request, *args, **kwargs):
+        # The lookup may load the session and user, which is sync-only.
+        lookup = await sync_to_async(self._lookup_page)(request, args, kwargs)
+        if lookup is None:
+            return await super().dispatch(request, *args, **kwargs)
+        key, cached = lookup
+        if cached is not None:
+            return cached
+        filled_at = time.time_ns()
+        with primary_reads():
+            response = await super().dispatch(request, *args, **kwargs)
+            if isinstance(response, TemplateResponse):
+                await sync_to_async(response.render)()
+        return _store_on_render(key, filled_at, response)
+
+    def _lookup_page(self, request, args, kwargs):
+        """Return ``None`` if the page cache does not apply, else ``(key, cached response or None)``."""
+        if not self.page_cache_enabled(request):
+            return None
+        self.request, self.args, self.kwargs = request, args, kwargs
+        key = self.get_page_cache_key()
+        cached = cache.get(key)
+        if cached is None or _shows_changed_class(cached):
+            _count(MISSES_KEY)
+            CATALOGUE_CACHE_LOOKUPS.labels(result='miss').inc()
+            return key, None
+        _count(HITS_KEY)
+        CATALOGUE_CACHE_LOOKUPS.labels(result='hit').inc()
+        response = HttpResponse(cached['content'], content_type=cached['content_type'])
+        # The page's validators, so ConditionalGetMiddleware can answer 304 without a query.
+        for header, value in cached.get('validators', {}).items():
+            response[header] = value
+        response['X-Cache'] = 'HIT'
+        return key, response
+
+
+class ProxyCacheHeadersMixin:
+    """Mark anonymous pages cacheable by shared caches and session pages private.
+
+    Anonymous pages are ``public`` with ``s-maxage`` CATALOGUE_PROXY_CACHE_SECONDS
+    and ``max-age=0``, so browsers still revalidate with the page's ETag.
+    List it first so it also covers ``304`` and page-cache responses.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._async_proxy_dispatch(request, *args, **kwargs)
+        return self._add_cache_headers(request, super().dispatch(request, *args, **kwargs))
+
+    async def _async_proxy_dispatch(self, request, *args, **kwargs):
+        response = await super().dispatch(request, *args, **kwargs)
+        # The messages check may load the session, which is sync-only.
+        return await sync_to_async(self._add_cache_headers)(request, response)
+
+    def _add_cache_headers(self, request, response):
+        if response.status_code not in (200, 304):
+            return response
+        patch_vary_headers(response, ['Cookie'])
+        if settings.CATALOGUE_PROXY_CACHE_SECONDS > 0 and is_shared_page(request):
+            patch_cache_control(response, public=True, max_age=0, s_maxage=settings.CATALOGUE_PROXY_CACHE_SECONDS)
+        else:
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+def _shows_changed_class(cached):
+    """Return whether a class on the cached page changed after the page was rendered."""
+    stamps = cache.get_many([class_changed_key(pk) for pk in cached.get('classes', ())])
+    return any(changed_at >= cached['filled_at'] for changed_at in stamps.values())
+
+
+def _store_on_render(key, filled_at, response):
+    if response.status_code == 200 and isinstance(response, TemplateResponse):
+        response.add_post_render_callback(partial(_store, key, filled_at))
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def _store(key, filled_at, response):
+    cache.set(
+        key,
+        {
+            'content': response.content,
+            'content_type': response['Content-Type'],
+            'validators': {
+                header: response[header] for header in VALIDATOR_HEADERS if response.has_header(header)
+            },
+            # Taken before the page's queries, so a change racing them counts as later.
+            'filled_at': filled_at,
+            'classes': [gym_class.pk for gym_class in (response.context_data or {}).get('object_list', ())],
+        },
+        timeout=settings.CATALOGUE_CACHE_TIMEOUT,
+    )
@@ -0,0 +1,80 @@
+"""Conditional ``GET`` for the HTML pages.
+
+Each page derives a version (a ``Last-Modified`` time and ETag parts) from
+one small query, and a request whose ``If-None-Match`` or
+``If-Modified-Since`` still matches is answered ``304 Not Modified``
+before the page's own queries run. ``GymClass.updated_at`` moves on every
+change a page shows, bookings and trainer edits included, whichever
+process wrote it. Anonymous catalogue pages check the page cache first, and a cached
+copy carries the validators it was stored with, so a hit or a ``304`` for
+it runs no query at all.
+
+The pages show the visitor's name, bookings and CSRF-protected forms, so
+the ETag also covers the user and the CSRF secret; a browser never reuses
+another visitor's copy or one holding a stale token. Pages with pending
+flash messages are always rendered in full.
+"""
+import hashlib
+from calendar import timegm
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+
+class ConditionalPageMixin:
+    """Answer conditional ``GET`` requests from ``get_page_version()``.
+
+    Views return ``(last_modified, etag_parts)`` from ``get_page_version()``,
+    or ``None`` when the page cannot be versioned (missing object, content
+    that changes with the clock); that request is then served in full, as
+    is every request to a view that does not override it. Works with sync
+    and async views.
+    """
+
+    def get_page_version(self):
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._async_conditional_dispatch(request, *args, **kwargs)
+        validators = self._page_validators(request, args, kwargs)
+        if validators is None:
+            return super().dispatch(request, *args, **kwargs)
+        response = get_conditional_response(request, *validators)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        return _set_validators(response, *validators)
+
+    async def _async_conditional_dispatch(self, request, *args, **kwargs):
+        # The version query and the user lookup are sync-only.
+        validators = await sync_to_async(self._page_validators)(request, args, kwargs)
+        if validators is None:
+            return await super().dispatch(request, *args, **kwargs)
+        response = get_conditional_response(request, *validators)
+        if response is None:
+            response = await super().dispatch(request, *args, **kwargs)
+        return _set_validators(response, *validators)
+
+    def _page_validators(self, request, args, kwargs):
+        """Return ``(etag, last_modified timestamp)`` for the page, or ``None`` to serve it in full."""
+        if request.method not in ('GET', 'HEAD') or len(messages.get_messages(request)):
+            return None
+        self.request, self.args, self.kwargs = request, args, kwargs
+        version = self.get_page_version()
+        if version is None:
+            return None
+        last_modified, parts = version
+        visitor = (request.user.pk, request.META.get('CSRF_COOKIE'), request.get_full_path())
+        raw = '|'.join(str(part) for part in (*visitor, *parts))
+        etag = quote_etag(hashlib.sha256(raw.encode()).hexdigest()[:32])
+        return etag, last_modified and timegm(last_modified.utctimetuple())
+
+
+def _set_validators(response, etag, last_modified):
+    if response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        if last_modified:
+            response.headers.setdefault('Last-Modified', http_date(last_modified))
+    return response
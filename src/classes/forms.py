@@ -0,0 +1,10 @@
+from django import forms
+
+MAX_GENERATED_WEEKS = 52
+
+
+class ScheduleGenerationForm(forms.Form):
+    """First day and length of the term to generate from class templates."""
+
+    start_date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}))
+    weeks = forms.IntegerField(min_value=1, max_value=MAX_GENERATED_WEEKS, initial=12)
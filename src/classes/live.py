@@ -0,0 +1,151 @@
+"""Live seat availability for class pages, as server-sent events.
+
+A trigger on ``classes_gymclass`` (migration 0010) sends a PostgreSQL
+``NOTIFY`` on the ``seat_availability`` channel whenever a class's free
+spots change, from a booking, a cancellation or an admin edit, and only
+once its transaction commits. Each ASGI worker holds a single ``LISTEN``
+connection and fans every notification out to the streams subscribed to
+that class, so thousands of open pages cost one database connection per
+worker and no queries per update. A stream only queries once, on connect,
+for the current figures, and hands its database connection back straight
+after, so an open page holds no connection or pool slot.
+"""
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.http import HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from src.classes.models import GymClass
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'seat_availability'
+MAX_STREAM_CLASSES = 50
+HEARTBEAT_SECONDS = 15
+RECONNECT_SECONDS = 5
+# A stream that falls this far behind drops updates; later ones carry the latest figure.
+STREAM_BUFFER = 100
+
+
+class SeatBroadcaster:
+    """Fans ``seat_availability`` notifications out to this process's open streams."""
+
+    def __init__(self):
+        self.subscribers = {}
+        self.listener = None
+        # Set while the listener's LISTEN is active on the current loop.
+        self.ready = None
+
+    def subscribe(self, gym_class_ids):
+        queue = asyncio.Queue(maxsize=STREAM_BUFFER)
+        self.subscribers[queue] = frozenset(gym_class_ids)
+        self._ensure_listener()
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.pop(queue, None)
+
+    def publish(self, payload):
+        update = json.loads(payload)
+        for queue, gym_class_ids in self.subscribers.items():
+            if update['id'] in gym_class_ids:
+                try:
+                    queue.put_nowait(update)
+                except asyncio.QueueFull:
+                    pass
+
+    def _ensure_listener(self):
+        if connections['default'].vendor != 'postgresql':
+            return
+        loop = asyncio.get_running_loop()
+        if self.listener is None or self.listener.done() or self.listener.get_loop() is not loop:
+            self.ready = asyncio.Event()
+            self.listener = loop.create_task(self._listen(self.ready))
+
+    async def listening(self):
+        """Wait until notifications are being received, or give up after RECONNECT_SECONDS."""
+        if self.ready is None:
+            return
+        try:
+            await asyncio.wait_for(self.ready.wait(), RECONNECT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning('The %s listener is not connected; streaming without it.', CHANNEL)
+
+    async def _listen(self, ready):
+        import psycopg
+
+        # Django's own connection parameters, OPTIONS (sslmode, ...) included;
+        # its cursor classes are for sync connections.
+        params = connections['default'].get_connection_params()
+        params.pop('cursor_factory', None)
+        while self.subscribers:
+            try:
+                async with await psycopg.AsyncConnection.connect(**params, autocommit=True) as conn:
+                    await conn.execute(f'LISTEN {CHANNEL}')
+                    ready.set()
+                    async for notify in conn.notifies():
+                        self.publish(notify.payload)
+            except (psycopg.Error, OSError):
+                ready.clear()
+                logger.warning('Lost the %s listener; reconnecting.', CHANNEL, exc_info=True)
+                await asyncio.sleep(RECONNECT_SECONDS)
+
+
+broadcaster = SeatBroadcaster()
+
+
+def _release_connection():
+    # Looked up here: connections are per thread, and this runs in the ORM's.
+    connections['default'].close()
+
+
+def _event(update):
+    return f'event: spots\ndata: {json.dumps(update)}\n\n'
+
+
+async def _stream(gym_class_ids):
+    # Read the current figures only once LISTEN is active, so no change falls in between.
+    queue = broadcaster.subscribe(gym_class_ids)
+    try:
+        await broadcaster.listening()
+        yield f'retry: {RECONNECT_SECONDS * 1000}\n\n'
+        snapshot = GymClass.objects.filter(pk__in=gym_class_ids).values('id', 'max_capacity', 'booked_count')
+        rows = [row async for row in snapshot]
+        # The stream may stay open for hours; the connection (or pool slot) goes back now.
+        await sync_to_async(_release_connection)()
+        for row in rows:
+            yield _event({'id': row['id'], 'available_spots': max(row['max_capacity'] - row['booked_count'], 0)})
+        while True:
+            try:
+                update = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle stream.
+                yield ': keep-alive\n\n'
+            else:
+                yield _event(update)
+    finally:
+        broadcaster.unsubscribe(queue)
+
+
+@require_GET
+async def seat_stream(request):
+    """Stream ``available_spots`` updates for the classes in ``?ids=1,2,3``."""
+    if not isinstance(request, ASGIRequest):
+        # A sync worker would be tied up for as long as the page stays open.
+        return HttpResponse('Live updates need the ASGI server (APP_SERVER=asgi).', status=501)
+    try:
+        gym_class_ids = {int(pk) for pk in request.GET.get('ids', '').split(',')}
+    except ValueError:
+        return HttpResponseBadRequest('ids must be a comma-separated list of class ids.')
+    if len(gym_class_ids) > MAX_STREAM_CLASSES:
+        return HttpResponseBadRequest(f'At most {MAX_STREAM_CLASSES} classes per stream.')
+    response = StreamingHttpResponse(_stream(gym_class_ids), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Tells Nginx to pass events through as they come instead of buffering them.
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from src.classes import cache
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counters of the anonymous catalogue page cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zero the counters after printing them.')
+
+    def handle(self, *args, **options):
+        stats = cache.get_stats()
+        ratio = 'n/a' if stats['hit_ratio'] is None else f'{stats["hit_ratio"]:.1%}'
+        self.stdout.write(f'hits: {stats["hits"]}')
+        self.stdout.write(f'misses: {stats["misses"]}')
+        self.stdout.write(f'hit ratio: {ratio}')
+        if options['reset']:
+            cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset.'))
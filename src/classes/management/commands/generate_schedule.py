@@ -0,0 +1,52 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from src.classes.forms import MAX_GENERATED_WEEKS
+from src.classes.models import ClassTemplate
+from src.classes.schedule import generate_schedule, plan_schedule
+
+
+class Command(BaseCommand):
+    help = 'Create the GymClass sessions of the active class templates for a number of weeks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('start_date', type=date.fromisoformat, help='First day of the term (YYYY-MM-DD).')
+        parser.add_argument('weeks', type=int, help=f'Number of weeks to generate (1-{MAX_GENERATED_WEEKS}).')
+        parser.add_argument(
+            '--template',
+            type=int,
+            action='append',
+            dest='template_ids',
+            help='Only use the template with this id (repeatable). Defaults to every active template.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the planned sessions and conflicts without creating anything.',
+        )
+
+    def handle(self, *args, start_date, weeks, template_ids, **options):
+        if not 1 <= weeks <= MAX_GENERATED_WEEKS:
+            raise CommandError(f'weeks must be between 1 and {MAX_GENERATED_WEEKS}.')
+        if template_ids:
+            templates = list(ClassTemplate.objects.filter(pk__in=template_ids))
+        else:
+            templates = list(ClassTemplate.objects.filter(is_active=True))
+
+        if options['dry_run']:
+            planned = plan_schedule(templates, start_date, weeks)
+            for session in planned:
+                gym_class = session.gym_class
+                self.stdout.write(
+                    f'{gym_class.scheduled_at:%Y-%m-%d %H:%M} {gym_class.name}: {session.conflict or "new"}'
+                )
+            conflicts = sum(session.conflict is not None for session in planned)
+            self.stdout.write(f'{len(planned) - conflicts} to create, {conflicts} conflicting.')
+            return
+
+        created, skipped = generate_schedule(templates, start_date, weeks)
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(created)} class(es) from {len(templates)} template(s); '
+            f'skipped {len(skipped)} conflicting session(s).'
+        ))
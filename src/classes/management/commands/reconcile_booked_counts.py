@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from src.classes.models import GymClass
+
+
+class Command(BaseCommand):
+    help = 'Repair GymClass.booked_count values that drifted from the bookings table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List drifted classes without changing them.',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            drifted = GymClass.booked_count_drift().order_by('pk')
+            for gym_class in drifted:
+                self.stdout.write(
+                    f'{gym_class.pk} {gym_class.name}: '
+                    f'stored {gym_class.booked_count}, actual {gym_class.actual_count}'
+                )
+            self.stdout.write(f'{len(drifted)} class(es) drifted.')
+            return
+
+        fixed = GymClass.reconcile_booked_counts()
+        self.stdout.write(self.style.SUCCESS(f'Reconciled booked_count for {fixed} class(es).'))
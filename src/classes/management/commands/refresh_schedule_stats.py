@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from src.classes.stats import rebuild_schedule_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the trainer, time-slot and weekly schedule statistics from GymClass. '
+        'Run reconcile_booked_counts first if booked counts may have drifted.'
+    )
+
+    def handle(self, *args, **options):
+        rows = rebuild_schedule_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt schedule stats: {rows['trainers']} trainer(s), "
+            f"{rows['time_slots']} time slot(s), {rows['weeks']} week(s)."
+        ))
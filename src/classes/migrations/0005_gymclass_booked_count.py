@@ -0,0 +1,35 @@
+# Generated by Django 6.0.2 on 2026-10-18 08:01
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_booked_count(apps, schema_editor):
+    GymClass = apps.get_model('classes', 'GymClass')
+    Booking = apps.get_model('bookings', 'Booking')
+    totals = (
+        Booking.objects.filter(gym_class=OuterRef('pk'))
+        .order_by()
+        .values('gym_class')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    GymClass.objects.update(booked_count=Coalesce(Subquery(totals), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+        ('classes', '0004_gymclass_members'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gymclass',
+            name='booked_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_booked_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-18 08:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0005_gymclass_booked_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gymclass',
+            index=models.Index(fields=['scheduled_at', 'id'], include=('name', 'trainer', 'duration_minutes', 'max_capacity', 'booked_count'), name='gymclass_schedule_cover_idx'),
+        ),
+    ]
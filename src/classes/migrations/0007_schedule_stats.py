@@ -0,0 +1,63 @@
+# Generated by Django 6.0.2 on 2026-10-18 08:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_schedule_stats(apps, schema_editor):
+    from src.classes.stats import rebuild_schedule_stats
+
+    rebuild_schedule_stats(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0006_gymclass_gymclass_schedule_cover_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrainerStats',
+            fields=[
+                ('classes', models.IntegerField(default=0)),
+                ('capacity', models.IntegerField(default=0)),
+                ('booked', models.IntegerField(default=0)),
+                ('trainer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='classes.trainer')),
+            ],
+            options={
+                'verbose_name_plural': 'Trainer stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='WeeklyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('classes', models.IntegerField(default=0)),
+                ('capacity', models.IntegerField(default=0)),
+                ('booked', models.IntegerField(default=0)),
+                ('week_start', models.DateField(unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Weekly stats',
+                'ordering': ['week_start'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TimeSlotStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('classes', models.IntegerField(default=0)),
+                ('capacity', models.IntegerField(default=0)),
+                ('booked', models.IntegerField(default=0)),
+                ('weekday', models.PositiveSmallIntegerField(help_text='ISO weekday: 1 = Monday, 7 = Sunday.')),
+                ('hour', models.PositiveSmallIntegerField()),
+            ],
+            options={
+                'verbose_name_plural': 'Time slot stats',
+                'ordering': ['weekday', 'hour'],
+                'constraints': [models.UniqueConstraint(fields=('weekday', 'hour'), name='unique_time_slot_stats')],
+            },
+        ),
+        migrations.RunPython(backfill_schedule_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 09:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0008_classtemplate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gymclass',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
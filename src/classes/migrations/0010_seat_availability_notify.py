@@ -0,0 +1,45 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:05
+
+from django.db import migrations
+
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION classes_gymclass_notify_spots() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('seat_availability', json_build_object(
+        'id', NEW.id,
+        'available_spots', GREATEST(NEW.max_capacity - NEW.booked_count, 0)
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER classes_gymclass_notify_spots
+    AFTER UPDATE OF booked_count, max_capacity ON classes_gymclass
+    FOR EACH ROW
+    WHEN (OLD.booked_count IS DISTINCT FROM NEW.booked_count OR OLD.max_capacity IS DISTINCT FROM NEW.max_capacity)
+    EXECUTE FUNCTION classes_gymclass_notify_spots();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS classes_gymclass_notify_spots ON classes_gymclass;
+DROP FUNCTION IF EXISTS classes_gymclass_notify_spots();
+"""
+
+
+def _run_on_postgresql(sql):
+    def run(apps, schema_editor):
+        # LISTEN/NOTIFY only exists on PostgreSQL; other backends get no live updates.
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(sql, params=None)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0009_gymclass_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run_on_postgresql(CREATE_TRIGGER), _run_on_postgresql(DROP_TRIGGER)),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0010_seat_availability_notify'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='gymclass',
+            name='gymclass_schedule_cover_idx',
+        ),
+        migrations.AddIndex(
+            model_name='gymclass',
+            index=models.Index(fields=['scheduled_at', 'id'], include=('name', 'trainer', 'duration_minutes', 'max_capacity'), name='gymclass_schedule_cover_idx'),
+        ),
+    ]
@@ -1,9 +1,14 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
 from django.core.validators import MinValueValidator
 
+from src.classes.signals import booked_count_changed
+
 
 class Trainer(models.Model):
     """Represents a gym trainer employed at the facility."""
@@ -67,11 +72,29 @@ class GymClass(models.Model):
         validators=[MinValueValidator(1)],
     )
     max_capacity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    # Denormalised number of bookings, maintained by the booking write paths
+    # so listings never have to aggregate over the bookings table.
+    booked_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Last change to anything the catalogue shows for the class, its
+    # booked_count and trainer included; versions the API's ETags.
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['scheduled_at']
         verbose_name_plural = 'Gym classes'
+        indexes = [
+            # Serves the schedule listing: a range on scheduled_at ordered by
+            # (scheduled_at, id), with the card columns that only admins edit
+            # included. booked_count stays out, and is read from the table:
+            # indexing it would make every booking's UPDATE rewrite the index
+            # entries instead of being a heap-only (HOT) update.
+            models.Index(
+                fields=['scheduled_at', 'id'],
+                include=['name', 'trainer', 'duration_minutes', 'max_capacity'],
+                name='gymclass_schedule_cover_idx',
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 condition=models.Q(duration_minutes__gte=1),
@@ -86,22 +109,86 @@ class GymClass(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # booked_count belongs to the booking write paths: never write back a
+        # possibly stale in-memory value when an existing class is edited.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'booked_count'
+            ]
+        return super().save(*args, **kwargs)
+
     @property
     def end_time(self):
         """Return the datetime when the class ends (scheduled_at + duration)."""
         return self.scheduled_at + timedelta(minutes=self.duration_minutes)
 
-    @property
-    def available_spots(self):
-        """Return the number of remaining bookable spots.
+    @classmethod
+    def adjust_booked_count(cls, deltas):
+        """Apply signed per-class booking deltas to ``booked_count``.
 
-        Uses the ``booking_count`` annotation when available to avoid
-        an extra query per instance.
+        ``deltas`` maps a gym class pk to the change in its number of
+        bookings. Each row is updated with an ``F()`` expression so
+        concurrent writers never overwrite each other.
         """
-        count = getattr(self, 'booking_count', None)
-        if count is None:
-            count = self.bookings.count()
-        return self.max_capacity - count
+        changed = [gym_class_id for gym_class_id, delta in deltas.items() if delta]
+        for gym_class_id in changed:
+            cls.objects.filter(pk=gym_class_id).update(
+                booked_count=Greatest(F('booked_count') + deltas[gym_class_id], Value(0)),
+                updated_at=timezone.now(),
+            )
+        if changed:
+            booked_count_changed.send(
+                sender=cls,
+                gym_class_ids=changed,
+                deltas={gym_class_id: deltas[gym_class_id] for gym_class_id in changed},
+            )
+
+    @classmethod
+    def reserve_seat(cls, gym_class_id):
+        """Claim one seat with a single conditional ``UPDATE``.
+
+        Returns ``False`` when the class does not exist, has started or is
+        full. Inside a transaction the row stays locked until it commits.
+        """
+        reserved = cls.objects.filter(
+            pk=gym_class_id,
+            scheduled_at__gt=timezone.now(),
+            booked_count__lt=F('max_capacity'),
+        ).update(booked_count=F('booked_count') + 1, updated_at=timezone.now())
+        if reserved:
+            booked_count_changed.send(sender=cls, gym_class_ids=[gym_class_id], deltas={gym_class_id: 1})
+        return bool(reserved)
+
+    @classmethod
+    def booked_count_drift(cls):
+        """Return classes whose ``booked_count`` disagrees with their bookings."""
+        return cls.objects.annotate(
+            actual_count=Coalesce(Subquery(_booking_totals()), 0),
+        ).exclude(booked_count=F('actual_count'))
+
+    @classmethod
+    def reconcile_booked_counts(cls):
+        """Recompute drifted ``booked_count`` values; return the number fixed."""
+        with transaction.atomic():
+            drifted = {
+                pk: actual - stored
+                for pk, stored, actual in cls.booked_count_drift().values_list('pk', 'booked_count', 'actual_count')
+            }
+            if drifted:
+                cls.objects.filter(pk__in=drifted).update(
+                    booked_count=Coalesce(Subquery(_booking_totals()), 0),
+                    updated_at=timezone.now(),
+                )
+                booked_count_changed.send(sender=cls, gym_class_ids=list(drifted), deltas=drifted)
+        return len(drifted)
+
+    @property
+    def available_spots(self):
+        """Return the number of remaining bookable spots."""
+        return self.max_capacity - self.booked_count
 
     @property
     def is_full(self):
@@ -112,3 +199,133 @@ class GymClass(models.Model):
     def available_spots_display(self):
         """Return a non-negative availability value for UI display."""
         return max(self.available_spots, 0)
+
+
+def _booking_totals():
+    """Correlated subquery counting the bookings of the outer ``GymClass``."""
+    from src.bookings.models import Booking
+
+    return (
+        Booking.objects.filter(gym_class=OuterRef('pk'))
+        .order_by()
+        .values('gym_class')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+
+
+class ClassTemplate(models.Model):
+    """A weekly recurring session from which ``GymClass`` rows are generated."""
+
+    class Weekday(models.IntegerChoices):
+        MONDAY = 1
+        TUESDAY = 2
+        WEDNESDAY = 3
+        THURSDAY = 4
+        FRIDAY = 5
+        SATURDAY = 6
+        SUNDAY = 7
+
+    name = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    trainer = models.ForeignKey(
+        Trainer,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='class_templates',
+    )
+    weekday = models.PositiveSmallIntegerField(choices=Weekday.choices)
+    start_time = models.TimeField(help_text='Local start time.')
+    duration_minutes = models.PositiveIntegerField(
+        default=60,
+        validators=[MinValueValidator(1)],
+    )
+    max_capacity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['weekday', 'start_time', 'name']
+
+    def __str__(self):
+        return f'{self.name} ({self.get_weekday_display()} {self.start_time:%H:%M})'
+
+    def session_on(self, day):
+        """Return an unsaved ``GymClass`` for this template on ``day``."""
+        return GymClass(
+            name=self.name,
+            description=self.description,
+            trainer_id=self.trainer_id,
+            scheduled_at=timezone.make_aware(datetime.combine(day, self.start_time)),
+            duration_minutes=self.duration_minutes,
+            max_capacity=self.max_capacity,
+        )
+
+
+class ScheduleStats(models.Model):
+    """Precomputed totals for one bucket of the schedule.
+
+    Maintained incrementally by ``src.classes.stats`` and rebuilt from scratch
+    by the ``refresh_schedule_stats`` command, so reports read a handful of
+    rows however much history there is.
+    """
+
+    classes = models.IntegerField(default=0)
+    capacity = models.IntegerField(default=0)
+    booked = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def fill_rate(self):
+        """Return the share of seats booked (0-1), or ``None`` without capacity."""
+        return self.booked / self.capacity if self.capacity > 0 else None
+
+
+class TrainerStats(ScheduleStats):
+    """Totals over every class taught by one trainer."""
+
+    trainer = models.OneToOneField(
+        Trainer,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+
+    class Meta:
+        verbose_name_plural = 'Trainer stats'
+
+    def __str__(self):
+        return str(self.trainer)
+
+
+class TimeSlotStats(ScheduleStats):
+    """Totals over every class starting in one weekday and hour (local time)."""
+
+    weekday = models.PositiveSmallIntegerField(help_text='ISO weekday: 1 = Monday, 7 = Sunday.')
+    hour = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['weekday', 'hour']
+        verbose_name_plural = 'Time slot stats'
+        constraints = [
+            models.UniqueConstraint(fields=['weekday', 'hour'], name='unique_time_slot_stats'),
+        ]
+
+    def __str__(self):
+        return f'{self.weekday} {self.hour:02d}:00'
+
+
+class WeeklyStats(ScheduleStats):
+    """Totals over every class in one week (local time, starting Monday)."""
+
+    week_start = models.DateField(unique=True)
+
+    class Meta:
+        ordering = ['week_start']
+        verbose_name_plural = 'Weekly stats'
+
+    def __str__(self):
+        return f'Week of {self.week_start}'
@@ -0,0 +1,118 @@
+"""Keyset (seek) pagination for the class schedule.
+
+Pages are addressed by an opaque cursor naming the ``(scheduled_at, id)``
+of the row they start after or end before, rather than by page number.
+Every page is a bounded index range scan, so page 500 costs the same as
+page 1, and a class booked or added while a visitor scrolls does not shift
+the rows they have yet to see.
+"""
+from datetime import datetime
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.utils.encoding import force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+AFTER_PARAM = 'after'
+BEFORE_PARAM = 'before'
+
+
+def encode_cursor(gym_class):
+    """Return the cursor naming ``gym_class``'s position in the schedule.
+
+    ``gym_class`` is a ``GymClass`` or a ``.values()`` row with ``scheduled_at`` and ``id``.
+    """
+    if isinstance(gym_class, dict):
+        raw = f'{gym_class["scheduled_at"].isoformat()}|{gym_class["id"]}'
+    else:
+        raw = f'{gym_class.scheduled_at.isoformat()}|{gym_class.pk}'
+    return urlsafe_base64_encode(raw.encode())
+
+
+def decode_cursor(cursor):
+    """Return the ``(scheduled_at, id)`` pair in ``cursor``.
+
+    Raises ``InvalidPage`` for anything ``encode_cursor`` did not produce.
+    """
+    try:
+        scheduled_at, pk = force_str(urlsafe_base64_decode(cursor)).split('|')
+        return datetime.fromisoformat(scheduled_at), int(pk)
+    except (TypeError, ValueError) as exc:
+        raise InvalidPage('Invalid page cursor.') from exc
+
+
+class KeysetPage:
+    """One page of a keyset-paginated schedule."""
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self.next_cursor = encode_cursor(object_list[-1]) if has_next else None
+        self.previous_cursor = encode_cursor(object_list[0]) if has_previous else None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Paginate a ``GymClass`` queryset on ``(scheduled_at, id)``."""
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset.order_by('scheduled_at', 'id')
+        self.per_page = per_page
+
+    def page(self, after=None, before=None):
+        """Return the page following ``after``, preceding ``before``, or the first page."""
+        if before:
+            rows = list(self._preceding(before))
+            return self._backward_page(rows) or self.page()
+        return self._forward_page(list(self._following(after)), after)
+
+    async def apage(self, after=None, before=None):
+        """Async version of ``page()``."""
+        if before:
+            rows = [row async for row in self._preceding(before)]
+            return self._backward_page(rows) or await self.apage()
+        return self._forward_page([row async for row in self._following(after)], after)
+
+    def _following(self, after):
+        qs = self.queryset
+        if after:
+            scheduled_at, pk = decode_cursor(after)
+            qs = qs.filter(
+                Q(scheduled_at__gt=scheduled_at) | Q(scheduled_at=scheduled_at, id__gt=pk),
+                # Redundant with the Q above, but gives the planner an index range bound.
+                scheduled_at__gte=scheduled_at,
+            )
+        return qs[:self.per_page + 1]
+
+    def _preceding(self, before):
+        scheduled_at, pk = decode_cursor(before)
+        return self.queryset.filter(
+            Q(scheduled_at__lt=scheduled_at) | Q(scheduled_at=scheduled_at, id__lt=pk),
+            scheduled_at__lte=scheduled_at,
+        ).reverse()[:self.per_page + 1]
+
+    def _forward_page(self, rows, after):
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return KeysetPage(rows, has_next=has_next, has_previous=bool(after and rows))
+
+    def _backward_page(self, rows):
+        """Return the page for rows fetched backwards, or ``None`` if there are none."""
+        if not rows:
+            # Paging back past the start lands on the first page.
+            return None
+        has_previous = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page][::-1], has_next=True, has_previous=has_previous)
@@ -0,0 +1,120 @@
+"""Generation of recurring classes from ``ClassTemplate`` rows.
+
+``plan_schedule`` lays out every occurrence of the given templates over a
+number of weeks and marks the ones that cannot be created: sessions
+already on the schedule, and sessions whose trainer would be teaching
+another class at the same time. The check reads the existing classes in
+the planned window with two set-based queries and compares intervals in
+memory, so it costs the same for one session as for a full term. ``generate_schedule`` then inserts the
+remaining sessions with batched ``bulk_create`` calls.
+"""
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import timedelta
+from operator import itemgetter
+from typing import NamedTuple
+
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from src.bookings.notifications import schedule_class_reminders
+from src.classes.cache import invalidate_classes_on_commit
+from src.classes.models import GymClass
+from src.classes.stats import count_created_classes
+
+GENERATE_BATCH_SIZE = 500
+ALREADY_SCHEDULED_MESSAGE = 'Already scheduled.'
+
+
+class PlannedSession(NamedTuple):
+    gym_class: GymClass
+    conflict: str | None
+
+
+def _occurrences(templates, start_date, weeks):
+    for template in templates:
+        first = start_date + timedelta(days=(template.weekday - start_date.isoweekday()) % 7)
+        for week in range(weeks):
+            yield template.session_on(first + timedelta(weeks=week))
+
+
+def _existing_classes(sessions):
+    """Return the saved classes that planned ``sessions`` may clash with, in one window."""
+    trainer_ids = {session.trainer_id for session in sessions if session.trainer_id is not None}
+    names = {session.name for session in sessions}
+    window_end = max(session.end_time for session in sessions)
+    nearby = GymClass.objects.filter(
+        Q(trainer_id__in=trainer_ids) | Q(name__in=names),
+        scheduled_at__lt=window_end,
+    )
+    # Classes starting up to one (longest) class length before the window can still overlap it.
+    longest = nearby.aggregate(longest=Max('duration_minutes'))['longest']
+    if longest is None:
+        return []
+    window_start = min(session.scheduled_at for session in sessions) - timedelta(minutes=longest)
+    return list(
+        nearby.filter(scheduled_at__gte=window_start)
+        .order_by('scheduled_at')
+        .only('name', 'trainer_id', 'scheduled_at', 'duration_minutes')
+    )
+
+
+def _trainer_conflict(busy, session):
+    """Return the class in ``busy`` (sorted by start) overlapping ``session``, if any."""
+    for start, end, name in reversed(busy[:bisect_left(busy, session.end_time, key=itemgetter(0))]):
+        if end > session.scheduled_at:
+            return name, start
+    return None
+
+
+def plan_schedule(templates, start_date, weeks):
+    """Return a ``PlannedSession`` for each occurrence of ``templates`` in ``weeks`` weeks from ``start_date``.
+
+    ``conflict`` explains why a session would be skipped; it is ``None``
+    for sessions ``generate_schedule`` will create.
+    """
+    sessions = sorted(_occurrences(templates, start_date, weeks), key=lambda session: session.scheduled_at)
+    if not sessions:
+        return []
+
+    scheduled = set()
+    busy = defaultdict(list)
+    for existing in _existing_classes(sessions):
+        scheduled.add((existing.name, existing.scheduled_at))
+        if existing.trainer_id is not None:
+            busy[existing.trainer_id].append((existing.scheduled_at, existing.end_time, existing.name))
+
+    planned = []
+    for session in sessions:
+        conflict = None
+        clash = _trainer_conflict(busy[session.trainer_id], session) if session.trainer_id else None
+        if (session.name, session.scheduled_at) in scheduled:
+            conflict = ALREADY_SCHEDULED_MESSAGE
+        elif clash is not None:
+            name, start = clash
+            conflict = f'Trainer already teaches {name} at {timezone.localtime(start):%Y-%m-%d %H:%M}.'
+        else:
+            scheduled.add((session.name, session.scheduled_at))
+            if session.trainer_id is not None:
+                # Later sessions must not clash with this one either.
+                insort(busy[session.trainer_id], (session.scheduled_at, session.end_time, session.name))
+        planned.append(PlannedSession(session, conflict))
+    return planned
+
+
+def generate_schedule(templates, start_date, weeks, batch_size=GENERATE_BATCH_SIZE):
+    """Create the conflict-free sessions planned for ``templates``; return ``(created, skipped)``.
+
+    ``bulk_create`` bypasses the ``GymClass`` signals, so the schedule
+    statistics, catalogue cache and class reminders are updated here once
+    for the batch.
+    """
+    with transaction.atomic():
+        planned = plan_schedule(templates, start_date, weeks)
+        sessions = [session.gym_class for session in planned if session.conflict is None]
+        created = GymClass.objects.bulk_create(sessions, batch_size=batch_size)
+        count_created_classes(created)
+        schedule_class_reminders(created)
+        invalidate_classes_on_commit((gym_class.pk for gym_class in created), reorder=True)
+    return created, [session for session in planned if session.conflict is not None]
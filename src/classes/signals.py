@@ -0,0 +1,40 @@
+"""Catalogue signals and the receivers that keep cached pages fresh."""
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from src.classes.cache import invalidate_classes_on_commit
+
+# Sent by GymClass whenever booked_count changes, once per write with every
+# affected class: ``gym_class_ids`` is an iterable of GymClass pks and
+# ``deltas`` maps each of them to the signed change in its booked_count.
+booked_count_changed = Signal()
+
+
+@receiver(booked_count_changed)
+def invalidate_booked_classes(sender, gym_class_ids, **kwargs):
+    invalidate_classes_on_commit(gym_class_ids)
+
+
+@receiver(post_save, sender='classes.GymClass')
+@receiver(post_delete, sender='classes.GymClass')
+def invalidate_gym_class(sender, instance, raw=False, **kwargs):
+    # Admin edits may move the class in or out of list pages.
+    if not raw:
+        invalidate_classes_on_commit([instance.pk], reorder=True)
+
+
+@receiver(post_save, sender='classes.Trainer')
+@receiver(pre_delete, sender='classes.Trainer')
+def invalidate_trainer_classes(sender, instance, raw=False, **kwargs):
+    # Trainer names are rendered on class cards and detail pages.
+    if not raw and instance.pk is not None:
+        invalidate_classes_on_commit(instance.gym_classes.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender='classes.Trainer')
+@receiver(pre_delete, sender='classes.Trainer')
+def touch_trainer_classes(sender, instance, raw=False, **kwargs):
+    # Moves the classes' API ETags on, as for the cached pages above.
+    if not raw and instance.pk is not None:
+        instance.gym_classes.update(updated_at=timezone.now())
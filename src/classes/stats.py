@@ -0,0 +1,174 @@
+"""Maintenance of the schedule statistics tables.
+
+Every class contributes its class count, capacity and booked seats to one
+``TrainerStats``, ``TimeSlotStats`` and ``WeeklyStats`` row. Class changes
+(admin edits, generated timetables) apply signed deltas to those rows once
+the surrounding transaction commits. Bookings and cancellations do not
+touch them: they only make sure a stats refresh job is queued, which
+the job worker runs STATS_REFRESH_DELAY later, recomputing every row from
+``GymClass`` with ``rebuild_schedule_stats`` for all the bookings made in
+the meantime. The booking path never waits on a shared stats row, and any
+drift from deltas applied out of order is corrected by the next refresh;
+the ``refresh_schedule_stats`` command runs the same rebuild on demand.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from functools import partial
+
+from django.apps import apps as global_apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay, TruncWeek
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from src.classes.models import GymClass, TimeSlotStats, TrainerStats, WeeklyStats
+from src.classes.signals import booked_count_changed
+from src.jobs.models import Job
+from src.jobs.queue import enqueue_many, register
+
+REFRESH_SCHEDULE_STATS = 'classes.refresh_schedule_stats'
+# How long booked seats may lag in the reports; bookings in that window share one rebuild.
+STATS_REFRESH_DELAY = timedelta(minutes=1)
+
+
+def _buckets(trainer_id, scheduled_at):
+    """Yield ``(model, lookup)`` for every stats row a class counts towards."""
+    local = timezone.localtime(scheduled_at)
+    if trainer_id is not None:
+        yield TrainerStats, (('trainer_id', trainer_id),)
+    yield TimeSlotStats, (('weekday', local.isoweekday()), ('hour', local.hour))
+    yield WeeklyStats, (('week_start', local.date() - timedelta(days=local.weekday())),)
+
+
+def apply_changes(changes):
+    """Add signed totals to the stats rows of each class.
+
+    ``changes`` is an iterable of ``(trainer_id, scheduled_at, classes,
+    capacity, booked)`` tuples; changes to the same row are summed first.
+    """
+    totals = defaultdict(lambda: [0, 0, 0])
+    for trainer_id, scheduled_at, *amounts in changes:
+        for bucket in _buckets(trainer_id, scheduled_at):
+            for index, amount in enumerate(amounts):
+                totals[bucket][index] += amount
+    for (model, lookup), amounts in totals.items():
+        if any(amounts):
+            _add(model, dict(lookup), *amounts)
+
+
+def _add(model, lookup, classes, capacity, booked):
+    increments = {
+        'classes': F('classes') + classes,
+        'capacity': F('capacity') + capacity,
+        'booked': F('booked') + booked,
+    }
+    if model.objects.filter(**lookup).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, classes=classes, capacity=capacity, booked=booked)
+    except IntegrityError:
+        # Another writer created the row first (or its trainer is gone).
+        model.objects.filter(**lookup).update(**increments)
+
+
+def _apply_on_commit(changes):
+    transaction.on_commit(partial(apply_changes, changes), robust=True)
+
+
+def schedule_stats_refresh():
+    """Queue a stats refresh job unless one is already pending."""
+    # ON CONFLICT DO NOTHING against the pending job: no row is locked or rewritten.
+    enqueue_many([
+        Job(kind=REFRESH_SCHEDULE_STATS, key=REFRESH_SCHEDULE_STATS, run_at=timezone.now() + STATS_REFRESH_DELAY),
+    ])
+
+
+@receiver(booked_count_changed)
+def count_booked_seats(sender, gym_class_ids, deltas=None, **kwargs):
+    if deltas:
+        # After the commit, so concurrent bookings never wait on each other's insert.
+        transaction.on_commit(schedule_stats_refresh, robust=True)
+
+
+@register(REFRESH_SCHEDULE_STATS)
+def refresh_schedule_stats():
+    rebuild_schedule_stats()
+
+
+@receiver(pre_save, sender=GymClass)
+def remember_previous_stats_bucket(sender, instance, raw, **kwargs):
+    if raw or instance._state.adding:
+        return
+    instance._previous_stats_bucket = (
+        GymClass.objects.filter(pk=instance.pk)
+        .values_list('trainer_id', 'scheduled_at', 'max_capacity', 'booked_count')
+        .first()
+    )
+
+
+@receiver(post_save, sender=GymClass)
+def count_saved_class(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    current = (instance.trainer_id, instance.scheduled_at, instance.max_capacity)
+    if created:
+        _apply_on_commit([(*current[:2], 1, instance.max_capacity, instance.booked_count)])
+        return
+    previous = getattr(instance, '_previous_stats_bucket', None)
+    instance._previous_stats_bucket = None
+    if previous is None or previous[:3] == current:
+        return
+    trainer_id, scheduled_at, max_capacity, booked_count = previous
+    _apply_on_commit([
+        (trainer_id, scheduled_at, -1, -max_capacity, -booked_count),
+        (*current[:2], 1, instance.max_capacity, booked_count),
+    ])
+
+
+@receiver(post_delete, sender=GymClass)
+def count_deleted_class(sender, instance, **kwargs):
+    _apply_on_commit([
+        (instance.trainer_id, instance.scheduled_at, -1, -instance.max_capacity, -instance.booked_count),
+    ])
+
+
+def count_created_classes(gym_classes):
+    """Count classes inserted with ``bulk_create``, which sends no ``post_save``."""
+    _apply_on_commit([
+        (gym_class.trainer_id, gym_class.scheduled_at, 1, gym_class.max_capacity, gym_class.booked_count)
+        for gym_class in gym_classes
+    ])
+
+
+def rebuild_schedule_stats(apps=global_apps):
+    """Recompute every stats table from ``GymClass``; return the rows written per table."""
+    gym_classes = apps.get_model('classes', 'GymClass').objects.order_by()
+    trainer_stats = apps.get_model('classes', 'TrainerStats')
+    time_slot_stats = apps.get_model('classes', 'TimeSlotStats')
+    weekly_stats = apps.get_model('classes', 'WeeklyStats')
+    totals = {'classes': Count('pk'), 'capacity': Sum('max_capacity'), 'booked': Sum('booked_count')}
+
+    with transaction.atomic():
+        for model in (trainer_stats, time_slot_stats, weekly_stats):
+            model.objects.all().delete()
+        trainers = trainer_stats.objects.bulk_create(
+            trainer_stats(trainer_id=row.pop('trainer'), **row)
+            for row in gym_classes.filter(trainer__isnull=False).values('trainer').annotate(**totals)
+        )
+        slots = time_slot_stats.objects.bulk_create(
+            time_slot_stats(**row)
+            for row in gym_classes.annotate(
+                weekday=ExtractIsoWeekDay('scheduled_at'),
+                hour=ExtractHour('scheduled_at'),
+            ).values('weekday', 'hour').annotate(**totals)
+        )
+        weeks = weekly_stats.objects.bulk_create(
+            weekly_stats(**row)
+            for row in gym_classes.annotate(
+                week_start=TruncWeek('scheduled_at', output_field=DateField()),
+            ).values('week_start').annotate(**totals)
+        )
+    return {'trainers': len(trainers), 'time_slots': len(slots), 'weeks': len(weeks)}
@@ -0,0 +1,75 @@
+from datetime import time
+
+import pytest
+from django.contrib.admin import helpers
+
+from src.classes.models import ClassTemplate, GymClass
+
+pytestmark = pytest.mark.integration
+
+CHANGELIST_URL = '/admin/classes/classtemplate/'
+
+
+@pytest.fixture
+def class_template(trainer_factory):
+    return ClassTemplate.objects.create(
+        name='Spin',
+        trainer=trainer_factory(),
+        weekday=ClassTemplate.Weekday.MONDAY,
+        start_time=time(7, 0),
+        max_capacity=15,
+    )
+
+
+def _action_data(template, **extra):
+    return {'action': 'generate_classes', helpers.ACTION_CHECKBOX_NAME: [template.pk], **extra}
+
+
+def test_class_template_changelist_accessible_to_staff(admin_client, class_template):
+    response = admin_client.get(CHANGELIST_URL)
+
+    assert response.status_code == 200
+    assert b'Spin' in response.content
+
+
+def test_generate_action_asks_for_the_term(admin_client, class_template):
+    response = admin_client.post(CHANGELIST_URL, _action_data(class_template))
+
+    assert response.status_code == 200
+    assert b'Generate Classes' in response.content
+    assert response.context['planned'] is None
+    assert not GymClass.objects.exists()
+
+
+def test_generate_action_previews_sessions_without_creating_them(admin_client, class_template, gym_class_factory):
+    response = admin_client.post(
+        CHANGELIST_URL, _action_data(class_template, start_date='2030-01-07', weeks=3, preview='Preview'),
+    )
+
+    assert response.status_code == 200
+    assert len(response.context['planned']) == 3
+    assert response.context['conflict_count'] == 0
+    assert b'Create classes' in response.content
+    assert not GymClass.objects.exists()
+
+
+def test_generate_action_creates_sessions_on_confirmation(admin_client, class_template):
+    response = admin_client.post(
+        CHANGELIST_URL,
+        _action_data(class_template, start_date='2030-01-07', weeks=3, generate='Create classes'),
+        follow=True,
+    )
+
+    assert response.redirect_chain[-1][0] == CHANGELIST_URL
+    assert b'Created 3 class(es).' in response.content
+    assert GymClass.objects.filter(name='Spin', trainer=class_template.trainer).count() == 3
+
+
+def test_generate_action_shows_form_errors(admin_client, class_template):
+    response = admin_client.post(
+        CHANGELIST_URL, _action_data(class_template, start_date='2030-01-07', weeks=0, generate='Create classes'),
+    )
+
+    assert response.status_code == 200
+    assert response.context['form'].errors['weeks']
+    assert not GymClass.objects.exists()
@@ -0,0 +1,132 @@
+import gzip
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from src.bookings.models import Booking
+from tests.helpers import future_datetime, past_datetime
+
+pytestmark = pytest.mark.integration
+
+
+def test_class_list_returns_upcoming_classes(client, trainer_factory, gym_class_factory, booking_factory):
+    trainer = trainer_factory(first_name='Ana', last_name='Lee')
+    gc = gym_class_factory(name='Spin', trainer=trainer, max_capacity=2, scheduled_at=future_datetime(days=1))
+    booking_factory(gym_class=gc)
+    gym_class_factory(name='Old', scheduled_at=past_datetime(days=1))
+
+    response = client.get(reverse('class-api-list'))
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/json'
+    data = response.json()
+    assert [row['name'] for row in data['classes']] == ['Spin']
+    row = data['classes'][0]
+    assert row['trainer'] == 'Ana Lee'
+    assert row['available_spots'] == 1
+    assert row['is_full'] is False
+    assert data['next'] is None
+
+
+def test_class_list_pages_with_cursors(client, gym_class_factory, monkeypatch):
+    monkeypatch.setattr('src.classes.api.API_PAGE_SIZE', 2)
+    for hours in range(3):
+        gym_class_factory(name=f'C{hours}', scheduled_at=future_datetime(hours=hours))
+
+    first = client.get(reverse('class-api-list')).json()
+    second = client.get(reverse('class-api-list'), {'after': first['next']}).json()
+
+    assert [row['name'] for row in first['classes']] == ['C0', 'C1']
+    assert [row['name'] for row in second['classes']] == ['C2']
+    assert second['previous'] is not None
+
+
+def test_class_detail_and_spots(client, gym_class_factory, booking_factory):
+    gc = gym_class_factory(name='Yoga', max_capacity=1)
+    booking_factory(gym_class=gc)
+
+    detail = client.get(reverse('class-api-detail', kwargs={'pk': gc.pk})).json()
+    spots = client.get(reverse('class-api-spots', kwargs={'pk': gc.pk})).json()
+
+    assert detail['name'] == 'Yoga'
+    assert detail['is_full'] is True
+    assert spots == {'id': gc.pk, 'available_spots': 0, 'is_full': True}
+
+
+def test_unknown_class_returns_404(client, db):
+    assert client.get(reverse('class-api-detail', kwargs={'pk': 999999})).status_code == 404
+    assert client.get(reverse('class-api-spots', kwargs={'pk': 999999})).status_code == 404
+
+
+def test_matching_etag_returns_304_after_one_query(client, gym_class_factory):
+    gc = gym_class_factory()
+    url = reverse('class-api-detail', kwargs={'pk': gc.pk})
+    etag = client.get(url)['ETag']
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response.content == b''
+    assert len(ctx.captured_queries) == 1
+
+
+def test_etag_moves_when_a_seat_is_booked(client, user_factory, gym_class_factory):
+    gc = gym_class_factory(max_capacity=5)
+    urls = [reverse(name, kwargs={'pk': gc.pk}) for name in ('class-api-detail', 'class-api-spots')]
+    urls.append(reverse('class-api-list'))
+    before = [client.get(url)['ETag'] for url in urls]
+
+    # No on-commit hook runs here, as for a booking made by another process.
+    Booking.create_for_member(member=user_factory(), gym_class_id=gc.pk)
+
+    after = [client.get(url, HTTP_IF_NONE_MATCH=etag) for url, etag in zip(urls, before)]
+    assert [response.status_code for response in after] == [200, 200, 200]
+    assert after[1].json()['available_spots'] == 4
+
+
+def test_etag_moves_when_the_trainer_is_renamed(client, trainer_factory, gym_class_factory):
+    trainer = trainer_factory(first_name='Ana')
+    gc = gym_class_factory(trainer=trainer)
+    url = reverse('class-api-detail', kwargs={'pk': gc.pk})
+    etag = client.get(url)['ETag']
+
+    trainer.first_name = 'Anna'
+    trainer.save()
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()['trainer'].startswith('Anna')
+
+
+def test_responses_are_gzipped_with_a_weak_etag(client, gym_class_factory):
+    for _ in range(5):
+        gym_class_factory()
+    url = reverse('class-api-list')
+
+    plain = client.get(url)
+    compressed = client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+
+    assert compressed['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed['Vary']
+    assert json.loads(gzip.decompress(compressed.content)) == plain.json()
+    assert compressed['ETag'] == plain['ETag']
+    assert compressed['ETag'].startswith('W/"')
+    assert client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=compressed['ETag']).status_code == 304
+
+
+def test_small_and_refused_gzip_responses_share_the_etag(client, gym_class_factory):
+    gc = gym_class_factory()
+    url = reverse('class-api-spots', kwargs={'pk': gc.pk})
+
+    plain = client.get(url)
+    # Too short for gzip_page to compress, and a client that refuses gzip.
+    small = client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+    refused = client.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+
+    assert not small.has_header('Content-Encoding')
+    assert not refused.has_header('Content-Encoding')
+    assert small['ETag'] == refused['ETag'] == plain['ETag']
@@ -0,0 +1,226 @@
+from io import StringIO
+
+import pytest
+from django.contrib import messages
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.management import call_command
+from django.http import HttpRequest, HttpResponse
+from django.urls import reverse
+
+from config.routers import PrimaryReplicaRouter, allow_replica_reads, reset_replica_reads
+from src.bookings.models import Booking
+from src.classes import cache as catalogue_cache
+from src.classes.models import GymClass
+from src.classes.pagination import encode_cursor
+from src.classes.views import ClassListView
+from tests.helpers import future_datetime
+
+pytestmark = pytest.mark.integration
+
+
+def test_anonymous_class_list_is_served_from_cache(client, gym_class_factory):
+    gym_class_factory(name='Yoga')
+    url = reverse('class-list')
+
+    first = client.get(url)
+    second = client.get(url)
+
+    assert first['X-Cache'] == 'MISS'
+    assert second['X-Cache'] == 'HIT'
+    assert second.content == first.content
+    assert catalogue_cache.get_stats() == {'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+
+
+def test_cache_fills_read_from_the_primary(client, auth_client, gym_class_factory, monkeypatch):
+    member_client, user = auth_client
+    gym_class_factory()
+    reads = []
+    get_queryset = ClassListView.get_queryset
+
+    def spy(view):
+        reads.append(PrimaryReplicaRouter().db_for_read(GymClass))
+        return get_queryset(view)
+
+    monkeypatch.setattr(ClassListView, 'get_queryset', spy)
+    token = allow_replica_reads()
+    try:
+        client.get(reverse('class-list'))
+        member_client.get(reverse('class-list'))
+    finally:
+        reset_replica_reads(token)
+
+    # The anonymous page is cached; the member's page is not, and may lag.
+    assert reads == ['default', 'replica']
+
+
+def test_list_cache_is_keyed_by_query_string(client, gym_class_factory):
+    gym_class_factory()
+    url = reverse('class-list')
+
+    client.get(url)
+    response = client.get(url + '?show_past=1')
+
+    assert response['X-Cache'] == 'MISS'
+
+
+def test_authenticated_pages_are_not_cached(auth_client, gym_class_factory):
+    client, user = auth_client
+    gc = gym_class_factory()
+
+    client.get(reverse('class-detail', kwargs={'pk': gc.pk}))
+    response = client.get(reverse('class-detail', kwargs={'pk': gc.pk}))
+
+    assert 'X-Cache' not in response
+    assert catalogue_cache.get_stats()['hits'] == 0
+
+
+def test_booking_invalidates_cached_detail_page(
+    client, user_factory, gym_class_factory, django_capture_on_commit_callbacks
+):
+    gc = gym_class_factory(max_capacity=5, scheduled_at=future_datetime(days=1))
+    url = reverse('class-detail', kwargs={'pk': gc.pk})
+    client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Booking.create_for_member(member=user_factory(), gym_class_id=gc.pk)
+
+    response = client.get(url)
+    assert response['X-Cache'] == 'MISS'
+    assert b'4 / 5 spots' in response.content
+
+
+def test_booking_invalidates_only_list_pages_showing_the_class(
+    client, user_factory, gym_class_factory, django_capture_on_commit_callbacks
+):
+    booked = gym_class_factory(max_capacity=5, scheduled_at=future_datetime(days=1))
+    gym_class_factory(scheduled_at=future_datetime(days=2))
+    # The first page shows both classes, the page after the booked one only the other.
+    showing, not_showing = reverse('class-list'), reverse('class-list') + '?after=' + encode_cursor(booked)
+    for url in (showing, not_showing):
+        client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Booking.create_for_member(member=user_factory(), gym_class_id=booked.pk)
+
+    assert client.get(showing)['X-Cache'] == 'MISS'
+    assert client.get(not_showing)['X-Cache'] == 'HIT'
+
+
+def test_class_edit_invalidates_cached_list(client, gym_class_factory, django_capture_on_commit_callbacks):
+    gc = gym_class_factory(name='Old Name')
+    url = reverse('class-list')
+    client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        gc.name = 'New Name'
+        gc.save()
+
+    response = client.get(url)
+    assert response['X-Cache'] == 'MISS'
+    assert b'New Name' in response.content
+
+
+def test_trainer_edit_invalidates_cached_detail(client, gym_class_factory, django_capture_on_commit_callbacks):
+    gc = gym_class_factory()
+    url = reverse('class-detail', kwargs={'pk': gc.pk})
+    client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        gc.trainer.first_name = 'Renamed'
+        gc.trainer.save()
+
+    response = client.get(url)
+    assert response['X-Cache'] == 'MISS'
+    assert b'Renamed' in response.content
+
+
+def test_admin_bulk_cancel_invalidates_cached_detail(
+    client, admin_client, gym_class_factory, booking_factory, django_capture_on_commit_callbacks
+):
+    gc = gym_class_factory(max_capacity=2)
+    booking = booking_factory(gym_class=gc)
+    url = reverse('class-detail', kwargs={'pk': gc.pk})
+    client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        admin_client.post('/admin/bookings/booking/', {
+            'action': 'cancel_selected_bookings',
+            '_selected_action': [booking.pk],
+        })
+
+    response = client.get(url)
+    assert response['X-Cache'] == 'MISS'
+    assert b'2 / 2 spots' in response.content
+
+
+def test_page_cache_disabled_with_zero_timeout(client, settings, gym_class_factory):
+    settings.CATALOGUE_CACHE_TIMEOUT = 0
+    gym_class_factory()
+
+    client.get(reverse('class-list'))
+    response = client.get(reverse('class-list'))
+
+    assert 'X-Cache' not in response
+
+
+def test_anonymous_pages_are_public_for_shared_caches(client, settings, gym_class_factory):
+    settings.CATALOGUE_PROXY_CACHE_SECONDS = 5
+    gc = gym_class_factory()
+
+    list_page = client.get(reverse('class-list'))
+    cached_page = client.get(reverse('class-list'))
+    not_modified = client.get(reverse('class-list'), HTTP_IF_NONE_MATCH=list_page['ETag'])
+    detail_page = client.get(reverse('class-detail', kwargs={'pk': gc.pk}))
+
+    for response in (list_page, cached_page, not_modified, detail_page):
+        assert set(response['Cache-Control'].split(', ')) == {'public', 'max-age=0', 's-maxage=5'}
+        assert 'Cookie' in response['Vary']
+    assert not_modified.status_code == 304
+    # Nginx does not cache responses that set cookies.
+    assert not list_page.cookies
+
+
+def test_session_pages_are_private(auth_client, gym_class_factory):
+    client, user = auth_client
+    gc = gym_class_factory()
+
+    response = client.get(reverse('class-detail', kwargs={'pk': gc.pk}))
+
+    assert set(response['Cache-Control'].split(', ')) == {'private', 'no-cache'}
+    assert 'Cookie' in response['Vary']
+
+
+def test_anonymous_pages_with_messages_are_private(client, gym_class_factory):
+    gc = gym_class_factory()
+    storage = CookieStorage(HttpRequest())
+    storage.add(messages.INFO, 'Welcome back')
+    carrier = HttpResponse()
+    storage.update(carrier)
+    client.cookies['messages'] = carrier.cookies['messages'].value
+
+    response = client.get(reverse('class-detail', kwargs={'pk': gc.pk}))
+
+    assert b'Welcome back' in response.content
+    assert 'private' in response['Cache-Control']
+
+
+def test_shared_caching_disabled_with_zero_seconds(client, settings, gym_class_factory):
+    settings.CATALOGUE_PROXY_CACHE_SECONDS = 0
+    gym_class_factory()
+
+    response = client.get(reverse('class-list'))
+
+    assert 'private' in response['Cache-Control']
+
+
+def test_catalogue_cache_stats_command(client, gym_class_factory):
+    gym_class_factory()
+    client.get(reverse('class-list'))
+    client.get(reverse('class-list'))
+
+    out = StringIO()
+    call_command('catalogue_cache_stats', '--reset', stdout=out)
+
+    assert 'hits: 1' in out.getvalue()
+    assert 'hit ratio: 50.0%' in out.getvalue()
+    assert catalogue_cache.get_stats()['hits'] == 0
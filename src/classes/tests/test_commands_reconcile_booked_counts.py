@@ -0,0 +1,34 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from src.classes.models import GymClass
+
+pytestmark = pytest.mark.integration
+
+
+def test_reconcile_booked_counts_fixes_drifted_classes(gym_class_factory, booking_factory):
+    gc = gym_class_factory(name='Spin')
+    booking_factory(gym_class=gc)
+    GymClass.objects.filter(pk=gc.pk).update(booked_count=5)
+
+    out = StringIO()
+    call_command('reconcile_booked_counts', stdout=out)
+
+    gc.refresh_from_db()
+    assert gc.booked_count == 1
+    assert 'Reconciled booked_count for 1 class(es).' in out.getvalue()
+
+
+def test_reconcile_booked_counts_dry_run_reports_without_fixing(gym_class_factory):
+    gc = gym_class_factory(name='Spin')
+    GymClass.objects.filter(pk=gc.pk).update(booked_count=4)
+
+    out = StringIO()
+    call_command('reconcile_booked_counts', '--dry-run', stdout=out)
+
+    gc.refresh_from_db()
+    assert gc.booked_count == 4
+    assert f'{gc.pk} Spin: stored 4, actual 0' in out.getvalue()
+    assert '1 class(es) drifted.' in out.getvalue()
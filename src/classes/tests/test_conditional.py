@@ -0,0 +1,164 @@
+import pytest
+from django.db import connection
+from django.http import HttpResponse
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.views import View
+
+from src.bookings.models import Booking, WaitlistEntry
+from src.classes.conditional import ConditionalPageMixin
+from tests.helpers import future_datetime
+
+pytestmark = pytest.mark.integration
+
+
+def _revalidate(client, url, response, **extra):
+    return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **extra)
+
+
+def test_class_list_answers_304_after_one_version_query(auth_client, gym_class_factory):
+    client, user = auth_client
+    gym_class_factory(scheduled_at=future_datetime(days=1))
+    url = reverse('class-list')
+    client.get(url)  # sets the CSRF cookie the booking forms use
+    first = client.get(url)
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = _revalidate(client, url, first)
+
+    assert first.status_code == 200
+    assert first['Last-Modified']
+    assert response.status_code == 304
+    assert response['ETag'] == first['ETag']
+    assert response.content == b''
+    # The session and user lookups, then the version query.
+    assert len(ctx.captured_queries) == 3
+
+
+def test_anonymous_cache_hit_runs_no_queries(client, gym_class_factory):
+    gym_class_factory(scheduled_at=future_datetime(days=1))
+    url = reverse('class-list')
+    first = client.get(url)
+
+    with CaptureQueriesContext(connection) as ctx:
+        hit = client.get(url)
+        revalidated = _revalidate(client, url, first)
+
+    assert first['X-Cache'] == 'MISS'
+    assert hit['X-Cache'] == 'HIT'
+    assert hit['ETag'] == first['ETag']
+    assert revalidated.status_code == 304
+    assert len(ctx.captured_queries) == 0
+
+
+def test_class_list_honours_if_modified_since(auth_client, gym_class_factory):
+    client, user = auth_client
+    gym_class_factory(scheduled_at=future_datetime(days=1))
+    url = reverse('class-list')
+    first = client.get(url)
+
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+
+    assert response.status_code == 304
+
+
+def test_class_detail_honours_if_modified_since(client, gym_class_factory):
+    gc = gym_class_factory(scheduled_at=future_datetime(days=1))
+    url = reverse('class-detail', kwargs={'pk': gc.pk})
+    first = client.get(url)
+
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+
+    assert response.status_code == 304
+
+
+def test_class_list_etag_changes_with_bookings_and_new_classes(auth_client, gym_class_factory, booking_factory):
+    client, user = auth_client
+    gc = gym_class_factory(scheduled_at=future_datetime(days=1))
+    url = reverse('class-list')
+    client.get(url)  # sets the CSRF cookie the booking forms use
+    first = client.get(url)
+
+    # No on-commit invalidation runs here, as for a write made by another process.
+    booking_factory(gym_class=gc)
+    after_booking = _revalidate(client, url, first)
+    gym_class_factory(scheduled_at=future_datetime(days=2))
+    after_new_class = _revalidate(client, url, after_booking)
+
+    assert after_booking.status_code == 200
+    assert after_new_class.status_code == 200
+
+
+def test_class_list_etag_depends_on_the_query_string(client, gym_class_factory):
+    gym_class_factory(scheduled_at=future_datetime(days=1))
+    first = client.get(reverse('class-list'))
+
+    response = _revalidate(client, reverse('class-list') + '?show_past=1', first)
+
+    assert response.status_code == 200
+
+
+def test_class_pages_are_not_shared_between_visitors(client, auth_client, gym_class_factory):
+    member_client, user = auth_client
+    gc = gym_class_factory(scheduled_at=future_datetime(days=1))
+    url = reverse('class-detail', kwargs={'pk': gc.pk})
+    anonymous = client.get(url)
+
+    response = _revalidate(member_client, url, anonymous)
+
+    assert response.status_code == 200
+
+
+def test_class_detail_etag_changes_when_the_waitlist_moves(auth_client, user_factory, gym_class_factory):
+    client, user = auth_client
+    gc = gym_class_factory(max_capacity=1, scheduled_at=future_datetime(days=1))
+    Booking.create_for_member(member=user_factory(), gym_class_id=gc.pk)
+    ahead = user_factory()
+    WaitlistEntry.join(member=ahead, gym_class_id=gc.pk)
+    WaitlistEntry.join(member=user, gym_class_id=gc.pk)
+    url = reverse('class-detail', kwargs={'pk': gc.pk})
+    client.get(url)  # sets the CSRF cookie the booking forms use
+    first = client.get(url)
+    assert _revalidate(client, url, first).status_code == 304
+
+    WaitlistEntry.leave(member=ahead, gym_class_id=gc.pk)
+    response = _revalidate(client, url, first)
+
+    assert response.status_code == 200
+    assert response.context['waitlist_position'] == 1
+
+
+def test_class_detail_without_class_has_no_validators(client, db):
+    response = client.get(reverse('class-detail', kwargs={'pk': 99999}))
+
+    assert response.status_code == 404
+    assert not response.has_header('Last-Modified')
+
+
+def test_pending_messages_are_always_rendered(auth_client, gym_class_factory):
+    client, user = auth_client
+    gc = gym_class_factory(max_capacity=2, scheduled_at=future_datetime(days=1))
+    url = reverse('class-detail', kwargs={'pk': gc.pk})
+    client.post(reverse('booking-create', kwargs={'class_id': gc.pk}))
+    client.get(reverse('booking-list'))  # shows the success message
+    first = client.get(url)
+    assert _revalidate(client, url, first).status_code == 304
+
+    # Booking again only leaves a warning; the class itself is unchanged.
+    client.post(reverse('booking-create', kwargs={'class_id': gc.pk}))
+    response = _revalidate(client, url, first)
+
+    assert response.status_code == 200
+    assert b'already has a booking for this class' in response.content
+
+
+@pytest.mark.unit
+def test_views_without_a_page_version_are_served_in_full(rf):
+    class PlainView(ConditionalPageMixin, View):
+        def get(self, request):
+            return HttpResponse('page')
+
+    response = PlainView.as_view()(rf.get('/'))
+
+    assert response.status_code == 200
+    assert not response.has_header('ETag')
@@ -0,0 +1,134 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient
+from django.urls import reverse
+
+from src.classes.live import SeatBroadcaster, broadcaster
+
+pytestmark = pytest.mark.integration
+
+
+def _events(chunks):
+    return [json.loads(line[len('data: '):]) for chunk in chunks for line in chunk.splitlines()
+            if line.startswith('data: ')]
+
+
+@pytest.mark.unit
+def test_broadcaster_delivers_only_to_streams_watching_the_class():
+    async def scenario():
+        hub = SeatBroadcaster()
+        watching = hub.subscribe({1, 2})
+        other = hub.subscribe({3})
+        hub.publish('{"id": 2, "available_spots": 4}')
+        hub.unsubscribe(other)
+        return watching.get_nowait(), other.empty(), list(hub.subscribers)
+
+    update, other_empty, subscribers = async_to_sync(scenario)()
+
+    assert update == {'id': 2, 'available_spots': 4}
+    assert other_empty
+    assert len(subscribers) == 1
+
+
+@pytest.mark.unit
+def test_broadcaster_drops_updates_for_a_stream_that_fell_behind(monkeypatch):
+    monkeypatch.setattr('src.classes.live.STREAM_BUFFER', 1)
+
+    async def scenario():
+        hub = SeatBroadcaster()
+        queue = hub.subscribe({1})
+        hub.publish('{"id": 1, "available_spots": 2}')
+        hub.publish('{"id": 1, "available_spots": 1}')
+        return queue.qsize()
+
+    assert async_to_sync(scenario)() == 1
+
+
+@pytest.mark.unit
+def test_streams_wait_for_the_listener_before_their_snapshot(monkeypatch):
+    monkeypatch.setattr('src.classes.live.RECONNECT_SECONDS', 0.01)
+
+    async def scenario():
+        hub = SeatBroadcaster()
+        hub.ready = asyncio.Event()
+        waiter = asyncio.ensure_future(hub.listening())
+        await asyncio.sleep(0)
+        waiting = not waiter.done()
+        hub.ready.set()
+        await waiter
+        hub.ready.clear()
+        # A listener that cannot connect does not hold streams back for good.
+        await hub.listening()
+        return waiting
+
+    assert async_to_sync(scenario)() is True
+
+
+def test_seat_stream_needs_the_asgi_server(client, gym_class_factory):
+    gc = gym_class_factory()
+
+    response = client.get(reverse('class-live'), {'ids': gc.pk})
+
+    assert response.status_code == 501
+
+
+@pytest.mark.parametrize('ids', ['', 'abc', '1,x', ','.join(str(i) for i in range(51))])
+def test_seat_stream_rejects_bad_ids(ids):
+    response = async_to_sync(AsyncClient().get)(reverse('class-live'), {'ids': ids})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+def test_seat_stream_sends_current_spots_then_published_updates(gym_class_factory, booking_factory, monkeypatch):
+    gc = gym_class_factory(max_capacity=3)
+    booking_factory(gym_class=gc)
+    closed = []
+    monkeypatch.setattr(connection, 'close', lambda: closed.append(True))
+
+    async def scenario():
+        response = await AsyncClient().get(reverse('class-live'), {'ids': gc.pk})
+        stream = aiter(response.streaming_content)
+        chunks = [await anext(stream), await anext(stream)]
+        broadcaster.publish(json.dumps({'id': gc.pk, 'available_spots': 0}))
+        chunks.append(await anext(stream))
+        await stream.aclose()
+        return response, [chunk.decode() for chunk in chunks]
+
+    response, chunks = async_to_sync(scenario)()
+
+    assert response['Content-Type'] == 'text/event-stream'
+    assert response['Cache-Control'] == 'no-cache'
+    assert chunks[0].startswith('retry: ')
+    assert _events(chunks) == [{'id': gc.pk, 'available_spots': 2}, {'id': gc.pk, 'available_spots': 0}]
+    assert broadcaster.subscribers == {}
+    # The connection used for the snapshot is released while the stream stays open.
+    assert closed == [True]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_booking_commit_notifies_seat_availability(gym_class_factory, booking_factory):
+    if connection.vendor != 'postgresql':
+        pytest.skip('LISTEN/NOTIFY needs PostgreSQL.')
+    gc = gym_class_factory(max_capacity=3)
+    with connection.cursor() as cursor:
+        cursor.execute('LISTEN seat_availability')
+
+    booking_factory(gym_class=gc)
+
+    notifies = list(connection.connection.notifies(timeout=1, stop_after=1))
+    assert [json.loads(n.payload) for n in notifies] == [{'id': gc.pk, 'available_spots': 2}]
+
+
+@pytest.mark.parametrize('app_server, rendered', [('wsgi', False), ('asgi', True)])
+def test_detail_page_subscribes_only_under_asgi(client, gym_class_factory, settings, app_server, rendered):
+    settings.APP_SERVER = app_server
+    gc = gym_class_factory()
+
+    response = client.get(reverse('class-detail', kwargs={'pk': gc.pk}))
+
+    assert (reverse('class-live').encode() in response.content) is rendered
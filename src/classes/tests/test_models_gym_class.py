@@ -7,16 +7,16 @@ from tests.helpers import future_datetime
 
 
 @pytest.mark.unit
-def test_gym_class_available_spots_with_annotation():
+def test_gym_class_available_spots_reads_booked_count():
     gym_class = GymClass(name='Test', max_capacity=10, scheduled_at=future_datetime(days=1))
 
-    gym_class.booking_count = 3
+    gym_class.booked_count = 3
     assert gym_class.available_spots == 7
 
-    gym_class.booking_count = 10
+    gym_class.booked_count = 10
     assert gym_class.available_spots == 0
 
-    gym_class.booking_count = 12
+    gym_class.booked_count = 12
     assert gym_class.available_spots == -2
 
 
@@ -74,17 +74,98 @@ def test_members_count_matches_booking_rows(db, user_factory, gym_class_factory)
     assert gym_class.members.count() == 2
 
 
+@pytest.mark.integration
+def test_booked_count_tracks_booking_create_and_delete(db, user_factory, gym_class_factory):
+    gym_class = gym_class_factory()
+    booking = gym_class.bookings.create(member=user_factory())
+    gym_class.bookings.create(member=user_factory())
+
+    gym_class.refresh_from_db()
+    assert gym_class.booked_count == 2
+
+    booking.delete()
+
+    gym_class.refresh_from_db()
+    assert gym_class.booked_count == 1
+
+
+@pytest.mark.integration
+def test_booked_count_moves_when_booking_changes_class(db, booking_factory, gym_class_factory):
+    source = gym_class_factory()
+    target = gym_class_factory()
+    booking = booking_factory(gym_class=source)
+
+    booking.gym_class = target
+    booking.save()
+
+    source.refresh_from_db()
+    target.refresh_from_db()
+    assert source.booked_count == 0
+    assert target.booked_count == 1
+
+
+@pytest.mark.integration
+def test_booked_count_drops_when_member_is_deleted(db, booking_factory, gym_class_factory):
+    gym_class = gym_class_factory()
+    booking = booking_factory(gym_class=gym_class)
+
+    booking.member.delete()
+
+    gym_class.refresh_from_db()
+    assert gym_class.booked_count == 0
+
+
+@pytest.mark.integration
+def test_saving_class_does_not_overwrite_booked_count(db, booking_factory, gym_class_factory):
+    gym_class = gym_class_factory()
+    stale = GymClass.objects.get(pk=gym_class.pk)
+    booking_factory(gym_class=gym_class)
+
+    stale.name = 'Renamed'
+    stale.save()
+
+    gym_class.refresh_from_db()
+    assert gym_class.name == 'Renamed'
+    assert gym_class.booked_count == 1
+
+
+@pytest.mark.integration
+def test_adjust_booked_count_never_goes_negative(db, gym_class_factory):
+    gym_class = gym_class_factory()
+
+    GymClass.adjust_booked_count({gym_class.pk: -3})
+
+    gym_class.refresh_from_db()
+    assert gym_class.booked_count == 0
+
+
+@pytest.mark.integration
+def test_reconcile_booked_counts_repairs_drift(db, booking_factory, gym_class_factory):
+    drifted = gym_class_factory()
+    in_sync = gym_class_factory()
+    booking_factory(gym_class=drifted)
+    booking_factory(gym_class=in_sync)
+    GymClass.objects.filter(pk=drifted.pk).update(booked_count=7)
+
+    assert list(GymClass.booked_count_drift().values_list('pk', flat=True)) == [drifted.pk]
+    assert GymClass.reconcile_booked_counts() == 1
+
+    drifted.refresh_from_db()
+    assert drifted.booked_count == 1
+    assert not GymClass.booked_count_drift().exists()
+
+
 @pytest.mark.unit
 def test_gym_class_is_full():
     gym_class = GymClass(name='Test', max_capacity=10, scheduled_at=future_datetime(days=1))
 
-    gym_class.booking_count = 9
+    gym_class.booked_count = 9
     assert gym_class.is_full is False
 
-    gym_class.booking_count = 10
+    gym_class.booked_count = 10
     assert gym_class.is_full is True
 
-    gym_class.booking_count = 11
+    gym_class.booked_count = 11
     assert gym_class.is_full is True
 
 
@@ -92,13 +173,13 @@ def test_gym_class_is_full():
 def test_gym_class_available_spots_display():
     gym_class = GymClass(name='Test', max_capacity=10, scheduled_at=future_datetime(days=1))
 
-    gym_class.booking_count = 5
+    gym_class.booked_count = 5
     assert gym_class.available_spots_display == 5
 
-    gym_class.booking_count = 10
+    gym_class.booked_count = 10
     assert gym_class.available_spots_display == 0
 
-    gym_class.booking_count = 12
+    gym_class.booked_count = 12
     assert gym_class.available_spots_display == 0
 
 
@@ -0,0 +1,156 @@
+from datetime import date, datetime, time
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+
+from src.classes.cache import LIST_VERSION_KEY
+from src.classes.models import ClassTemplate, GymClass, TrainerStats
+from src.classes.schedule import ALREADY_SCHEDULED_MESSAGE, generate_schedule, plan_schedule
+
+pytestmark = pytest.mark.integration
+
+TERM_START = date(2030, 1, 7)  # a Monday
+
+
+@pytest.fixture
+def template_factory(db, trainer_factory):
+    def _create_template(**kwargs):
+        kwargs.setdefault('name', 'Spin')
+        kwargs.setdefault('trainer', trainer_factory())
+        kwargs.setdefault('weekday', ClassTemplate.Weekday.WEDNESDAY)
+        kwargs.setdefault('start_time', time(18, 0))
+        kwargs.setdefault('duration_minutes', 60)
+        kwargs.setdefault('max_capacity', 12)
+        return ClassTemplate.objects.create(**kwargs)
+
+    return _create_template
+
+
+def _at(day, hour, minute=0):
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+def test_plan_lays_out_one_session_per_week_on_the_template_weekday(template_factory):
+    template = template_factory()
+
+    planned = plan_schedule([template], TERM_START, weeks=3)
+
+    assert [session.gym_class.scheduled_at for session in planned] == [
+        _at(date(2030, 1, 9), 18), _at(date(2030, 1, 16), 18), _at(date(2030, 1, 23), 18),
+    ]
+    assert all(session.conflict is None for session in planned)
+    first = planned[0].gym_class
+    assert (first.name, first.trainer_id, first.max_capacity, first.pk) == ('Spin', template.trainer_id, 12, None)
+
+
+def test_plan_flags_sessions_that_are_already_scheduled(template_factory, gym_class_factory):
+    template = template_factory(trainer=None)
+    gym_class_factory(name='Spin', trainer=None, scheduled_at=_at(date(2030, 1, 16), 18))
+
+    planned = plan_schedule([template], TERM_START, weeks=3)
+
+    assert [session.conflict for session in planned] == [None, ALREADY_SCHEDULED_MESSAGE, None]
+
+
+def test_plan_flags_trainer_clashes_with_existing_classes(template_factory, gym_class_factory):
+    template = template_factory()
+    gym_class_factory(
+        name='Yoga', trainer=template.trainer, scheduled_at=_at(date(2030, 1, 9), 17, 30), duration_minutes=45,
+    )
+    # Ends exactly as the session starts, so does not clash.
+    gym_class_factory(name='HIIT', trainer=template.trainer, scheduled_at=_at(date(2030, 1, 16), 17))
+    # A different trainer at the same time is fine.
+    gym_class_factory(name='Pilates', scheduled_at=_at(date(2030, 1, 23), 18))
+
+    planned = plan_schedule([template], TERM_START, weeks=3)
+
+    assert [session.conflict for session in planned] == [
+        'Trainer already teaches Yoga at 2030-01-09 17:30.', None, None,
+    ]
+
+
+def test_plan_flags_trainer_clashes_between_templates(template_factory, trainer_factory):
+    trainer = trainer_factory()
+    spin = template_factory(name='Spin', trainer=trainer)
+    yoga = template_factory(name='Yoga', trainer=trainer, start_time=time(18, 30))
+
+    planned = plan_schedule([yoga, spin], TERM_START, weeks=1)
+
+    assert [(session.gym_class.name, session.conflict) for session in planned] == [
+        ('Spin', None), ('Yoga', 'Trainer already teaches Spin at 2030-01-09 18:00.'),
+    ]
+
+
+def test_plan_checks_conflicts_with_a_fixed_number_of_queries(
+    template_factory, gym_class_factory, django_assert_max_num_queries
+):
+    templates = [template_factory(weekday=weekday) for weekday in ClassTemplate.Weekday.values]
+    gym_class_factory(trainer=templates[0].trainer, scheduled_at=_at(date(2030, 2, 4), 18))
+
+    with django_assert_max_num_queries(2):
+        planned = plan_schedule(templates, TERM_START, weeks=12)
+
+    assert len(planned) == 84
+    assert sum(session.conflict is not None for session in planned) == 1
+
+
+def test_generate_creates_sessions_in_batches_and_skips_conflicts(
+    template_factory, gym_class_factory, django_assert_max_num_queries
+):
+    template = template_factory()
+    gym_class_factory(name='Spin', trainer=template.trainer, scheduled_at=_at(date(2030, 1, 9), 18))
+
+    # Conflict check (2), savepoint pair, 11 new rows in 3 batches of 5, and their reminder jobs.
+    with django_assert_max_num_queries(8):
+        created, skipped = generate_schedule([template], TERM_START, weeks=12, batch_size=5)
+
+    assert len(created) == 11
+    assert [session.conflict for session in skipped] == [ALREADY_SCHEDULED_MESSAGE]
+    assert GymClass.objects.filter(name='Spin').count() == 12
+
+
+def test_generate_is_idempotent(template_factory):
+    template = template_factory()
+    generate_schedule([template], TERM_START, weeks=4)
+
+    created, skipped = generate_schedule([template], TERM_START, weeks=4)
+
+    assert created == []
+    assert len(skipped) == 4
+
+
+def test_generate_updates_stats_and_catalogue_cache(template_factory, django_capture_on_commit_callbacks):
+    template = template_factory(max_capacity=10)
+    cache.set(LIST_VERSION_KEY, 1, timeout=None)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        generate_schedule([template], TERM_START, weeks=3)
+
+    stats = TrainerStats.objects.get(trainer=template.trainer)
+    assert (stats.classes, stats.capacity, stats.booked) == (3, 30, 0)
+    assert cache.get(LIST_VERSION_KEY) == 2
+
+
+def test_generate_schedule_command_uses_active_templates(template_factory):
+    template_factory(name='Spin')
+    template_factory(name='Retired', is_active=False)
+    out = StringIO()
+
+    call_command('generate_schedule', '2030-01-07', '2', stdout=out)
+
+    assert set(GymClass.objects.values_list('name', flat=True)) == {'Spin'}
+    assert 'Created 2 class(es) from 1 template(s); skipped 0 conflicting session(s).' in out.getvalue()
+
+
+def test_generate_schedule_command_dry_run_creates_nothing(template_factory):
+    template = template_factory(is_active=False)
+    out = StringIO()
+
+    call_command('generate_schedule', '2030-01-07', '2', '--template', str(template.pk), '--dry-run', stdout=out)
+
+    assert not GymClass.objects.exists()
+    assert '2030-01-09 18:00 Spin: new' in out.getvalue()
+    assert '2 to create, 0 conflicting.' in out.getvalue()
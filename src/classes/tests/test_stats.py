@@ -0,0 +1,131 @@
+from datetime import date, datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from src.bookings.models import Booking
+from src.classes.models import GymClass, TimeSlotStats, TrainerStats, WeeklyStats
+from src.classes.stats import REFRESH_SCHEDULE_STATS, rebuild_schedule_stats
+from src.jobs import queue
+from src.jobs.models import Job
+
+pytestmark = pytest.mark.integration
+
+# A Wednesday, 18:00 UTC.
+WEDNESDAY_EVENING = timezone.make_aware(datetime(2030, 1, 2, 18, 0))
+
+
+def _totals(stats):
+    return (stats.classes, stats.capacity, stats.booked)
+
+
+def _run_stats_refresh():
+    Job.objects.filter(kind=REFRESH_SCHEDULE_STATS).update(run_at=timezone.now())
+    queue.run_due_jobs(batch_size=100)
+
+
+@pytest.fixture
+def stats_class(gym_class_factory, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        return gym_class_factory(scheduled_at=WEDNESDAY_EVENING, max_capacity=10)
+
+
+def test_new_class_is_counted_in_every_bucket(stats_class):
+    assert _totals(TrainerStats.objects.get(trainer=stats_class.trainer)) == (1, 10, 0)
+    assert _totals(TimeSlotStats.objects.get(weekday=3, hour=18)) == (1, 10, 0)
+    assert _totals(WeeklyStats.objects.get(week_start=date(2029, 12, 31))) == (1, 10, 0)
+
+
+def test_booking_queues_one_refresh_of_booked_seats(stats_class, user_factory, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        booking = Booking.create_for_member(member=user_factory(), gym_class_id=stats_class.pk)
+        Booking.create_for_member(member=user_factory(), gym_class_id=stats_class.pk)
+
+    # The booking path leaves the stats rows alone and queues a single refresh.
+    assert TimeSlotStats.objects.get(weekday=3, hour=18).booked == 0
+    assert Job.objects.filter(kind=REFRESH_SCHEDULE_STATS, status=Job.Status.PENDING).count() == 1
+
+    _run_stats_refresh()
+
+    assert TimeSlotStats.objects.get(weekday=3, hour=18).booked == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        booking.delete()
+    _run_stats_refresh()
+
+    assert TrainerStats.objects.get(trainer=stats_class.trainer).booked == 1
+    assert WeeklyStats.objects.get(week_start=date(2029, 12, 31)).booked == 1
+
+
+def test_rescheduled_class_moves_between_buckets(
+    stats_class, booking_factory, trainer_factory, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        booking_factory(gym_class=stats_class)
+    _run_stats_refresh()
+    old_trainer = stats_class.trainer
+
+    with django_capture_on_commit_callbacks(execute=True):
+        stats_class.trainer = trainer_factory()
+        stats_class.scheduled_at = WEDNESDAY_EVENING + timezone.timedelta(days=7, hours=-2)
+        stats_class.max_capacity = 12
+        stats_class.save()
+
+    assert _totals(TrainerStats.objects.get(trainer=old_trainer)) == (0, 0, 0)
+    assert _totals(TrainerStats.objects.get(trainer=stats_class.trainer)) == (1, 12, 1)
+    assert _totals(TimeSlotStats.objects.get(weekday=3, hour=18)) == (0, 0, 0)
+    assert _totals(TimeSlotStats.objects.get(weekday=3, hour=16)) == (1, 12, 1)
+    assert _totals(WeeklyStats.objects.get(week_start=date(2030, 1, 7))) == (1, 12, 1)
+
+
+def test_deleted_class_is_removed_from_buckets(stats_class, booking_factory, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        booking_factory(gym_class=stats_class)
+    _run_stats_refresh()
+    stats_class.refresh_from_db()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        stats_class.delete()
+
+    assert _totals(TimeSlotStats.objects.get(weekday=3, hour=18)) == (0, 0, 0)
+    assert _totals(WeeklyStats.objects.get(week_start=date(2029, 12, 31))) == (0, 0, 0)
+
+
+def test_rebuild_matches_refreshed_stats(stats_class, gym_class_factory, booking_factory,
+                                         django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        other = gym_class_factory(trainer=stats_class.trainer, scheduled_at=WEDNESDAY_EVENING, max_capacity=5)
+        booking_factory(gym_class=other)
+        booking_factory(gym_class=stats_class)
+    _run_stats_refresh()
+
+    def snapshot():
+        return (
+            sorted((s.trainer_id, *_totals(s)) for s in TrainerStats.objects.all()),
+            sorted((s.weekday, s.hour, *_totals(s)) for s in TimeSlotStats.objects.all()),
+            sorted((s.week_start, *_totals(s)) for s in WeeklyStats.objects.all()),
+        )
+
+    refreshed = snapshot()
+    assert rebuild_schedule_stats() == {'trainers': 1, 'time_slots': 1, 'weeks': 1}
+    assert snapshot() == refreshed
+    assert _totals(TrainerStats.objects.get(trainer=stats_class.trainer)) == (2, 15, 2)
+
+
+def test_refresh_schedule_stats_command_repairs_drift(stats_class):
+    TimeSlotStats.objects.update(booked=99)
+    GymClass.objects.filter(pk=stats_class.pk).update(booked_count=3)
+
+    out = StringIO()
+    call_command('refresh_schedule_stats', stdout=out)
+
+    assert TimeSlotStats.objects.get(weekday=3, hour=18).booked == 3
+    assert 'Rebuilt schedule stats: 1 trainer(s), 1 time slot(s), 1 week(s).' in out.getvalue()
+
+
+@pytest.mark.unit
+def test_fill_rate():
+    assert TrainerStats(capacity=20, booked=5).fill_rate == 0.25
+    assert TrainerStats(capacity=0, booked=0).fill_rate is None
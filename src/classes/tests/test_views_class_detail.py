@@ -59,8 +59,8 @@ def test_class_detail_uses_correct_template(gym_class_factory, client):
     assert 'classes/class_detail.html' in [t.name for t in response.templates]
 
 
-def test_class_detail_annotates_booking_count(gym_class_factory, booking_factory, client):
-    """ClassDetailView queryset should annotate booking_count."""
+def test_class_detail_exposes_booked_count(gym_class_factory, booking_factory, client):
+    """ClassDetailView should read availability from the denormalised booked_count."""
     gc = gym_class_factory(scheduled_at=future_datetime(days=1), max_capacity=10)
     booking_factory(gym_class=gc)
 
@@ -68,5 +68,5 @@ def test_class_detail_annotates_booking_count(gym_class_factory, booking_factory
     response = client.get(url)
 
     obj = response.context['object']
-    assert hasattr(obj, 'booking_count')
-    assert obj.booking_count == 1
+    assert obj.booked_count == 1
+    assert obj.available_spots == 9
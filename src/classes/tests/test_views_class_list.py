@@ -2,6 +2,8 @@ import pytest
 from django.urls import reverse
 from tests.helpers import future_datetime, past_datetime
 
+from src.classes.views import ClassListView
+
 pytestmark = pytest.mark.integration
 
 
@@ -30,8 +32,8 @@ def test_class_list_empty_when_no_future_classes(gym_class_factory, client):
     assert len(response.context['object_list']) == 0
 
 
-def test_class_list_annotates_booking_count(gym_class_factory, booking_factory, client):
-    """Each class in the list should have a booking_count annotation."""
+def test_class_list_exposes_booked_count(gym_class_factory, booking_factory, client):
+    """Each class in the list should carry its denormalised booked_count."""
     gc = gym_class_factory(scheduled_at=future_datetime(days=1), max_capacity=10)
     booking_factory(gym_class=gc)
     booking_factory(gym_class=gc)
@@ -41,8 +43,8 @@ def test_class_list_annotates_booking_count(gym_class_factory, booking_factory,
 
     classes = list(response.context['object_list'])
     assert len(classes) == 1
-    assert hasattr(classes[0], 'booking_count')
-    assert classes[0].booking_count == 2
+    assert classes[0].booked_count == 2
+    assert classes[0].available_spots == 8
 
 
 def test_class_list_uses_correct_template(gym_class_factory, client):
@@ -66,3 +68,61 @@ def test_class_list_shows_past_classes_when_requested(gym_class_factory, client)
     names = [obj.name for obj in response.context['object_list']]
     assert 'Future' in names
     assert 'Past' in names
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    monkeypatch.setattr(ClassListView, 'paginate_by', 2)
+
+
+def _names(response):
+    return [obj.name for obj in response.context['object_list']]
+
+
+def test_class_list_pages_forward_and_back(small_pages, gym_class_factory, client):
+    """Next and previous cursors walk the schedule in (scheduled_at, id) order."""
+    for day in range(1, 6):
+        gym_class_factory(name=f'Day {day}', scheduled_at=future_datetime(days=day))
+    url = reverse('class-list')
+
+    first = client.get(url)
+    second = client.get(url + '?' + first.context['next_page_query'])
+    third = client.get(url + '?' + second.context['next_page_query'])
+    back = client.get(url + '?' + third.context['previous_page_query'])
+
+    assert _names(first) == ['Day 1', 'Day 2']
+    assert 'previous_page_query' not in first.context
+    assert _names(second) == ['Day 3', 'Day 4']
+    assert _names(third) == ['Day 5']
+    assert 'next_page_query' not in third.context
+    assert _names(back) == ['Day 3', 'Day 4']
+    assert 'rel="next"' in first.content.decode()
+
+
+def test_class_list_cursor_breaks_ties_by_id(small_pages, gym_class_factory, client):
+    """Classes sharing a start time are neither skipped nor repeated across pages."""
+    starts_at = future_datetime(days=1)
+    created = [gym_class_factory(name=f'Slot {i}', scheduled_at=starts_at) for i in range(3)]
+    url = reverse('class-list')
+
+    first = client.get(url)
+    second = client.get(url + '?' + first.context['next_page_query'])
+
+    assert _names(first) + _names(second) == [gc.name for gc in sorted(created, key=lambda gc: gc.pk)]
+
+
+def test_class_list_page_links_keep_show_past(small_pages, gym_class_factory, client):
+    """Page links keep the past-classes toggle."""
+    for days in (3, 2, 1):
+        gym_class_factory(scheduled_at=past_datetime(days=days))
+
+    response = client.get(reverse('class-list') + '?show_past=1')
+
+    assert 'show_past=1' in response.context['next_page_query']
+
+
+def test_class_list_rejects_invalid_cursor(client, db):
+    """A malformed cursor returns 404 rather than a server error."""
+    response = client.get(reverse('class-list') + '?after=not-a-cursor')
+
+    assert response.status_code == 404
@@ -1,8 +1,19 @@
+from django.conf import settings
 from django.urls import path
 
-from src.classes.views import ClassDetailView, ClassListView
+from src.classes import api, live
+from src.classes.views import AsyncClassDetailView, AsyncClassListView, ClassDetailView, ClassListView
+
+if settings.APP_SERVER == 'asgi':
+    class_list, class_detail = AsyncClassListView.as_view(), AsyncClassDetailView.as_view()
+else:
+    class_list, class_detail = ClassListView.as_view(), ClassDetailView.as_view()
 
 urlpatterns = [
-    path('', ClassListView.as_view(), name='class-list'),
-    path('<int:pk>/', ClassDetailView.as_view(), name='class-detail'),
+    path('', class_list, name='class-list'),
+    path('<int:pk>/', class_detail, name='class-detail'),
+    path('api/', api.class_list, name='class-api-list'),
+    path('api/<int:pk>/', api.class_detail, name='class-api-detail'),
+    path('api/<int:pk>/spots/', api.class_spots, name='class-api-spots'),
+    path('live/', live.seat_stream, name='class-live'),
 ]
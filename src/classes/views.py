@@ -1,37 +1,156 @@
-from django.db.models import Count
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.db.models import Count, Max
+from django.http import Http404
 from django.utils import timezone
 from django.views.generic import DetailView, ListView
 
+from src.bookings.models import WaitlistEntry
+from src.classes.cache import AnonymousPageCacheMixin, ProxyCacheHeadersMixin, detail_page_key, list_page_key
+from src.classes.conditional import ConditionalPageMixin
 from src.classes.models import GymClass
+from src.classes.pagination import AFTER_PARAM, BEFORE_PARAM, KeysetPaginator
 
 
-class ClassListView(ListView):
+class ClassListView(ProxyCacheHeadersMixin, AnonymousPageCacheMixin, ConditionalPageMixin, ListView):
     model = GymClass
     template_name = 'classes/class_list.html'
+    paginate_by = 24
 
     def get_queryset(self):
-        qs = GymClass.objects.select_related('trainer').annotate(
-            booking_count=Count('members', distinct=True),
+        # Only the card columns, which the schedule index covers.
+        return self._catalogue().select_related('trainer').only(
+            'name', 'scheduled_at', 'duration_minutes', 'max_capacity', 'booked_count',
+            'trainer__first_name', 'trainer__last_name',
         )
+
+    def _catalogue(self):
+        qs = GymClass.objects.all()
         if not self.request.GET.get('show_past'):
             qs = qs.filter(scheduled_at__gte=timezone.now())
         return qs
 
+    def get_page_version(self):
+        # Read from the database, so a write in any process counts: any edit
+        # or booking moves the maximum, an added, removed or started class
+        # the count.
+        version = self._catalogue().aggregate(updated=Max('updated_at'), classes=Count('id'))
+        return version['updated'], (version['updated'], version['classes'])
+
+    def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        self.paginator = KeysetPaginator(self.object_list, self.paginate_by)
+        try:
+            self.page = self.paginator.page(
+                after=request.GET.get(AFTER_PARAM),
+                before=request.GET.get(BEFORE_PARAM),
+            )
+        except InvalidPage as exc:
+            raise Http404(str(exc)) from exc
+        return self.render_to_response(self.get_context_data())
+
+    def paginate_queryset(self, queryset, page_size):
+        # The page was already fetched in get().
+        return self.paginator, self.page, self.page.object_list, self.page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context['page_obj']
+        if page.has_next():
+            context['next_page_query'] = self._page_query(AFTER_PARAM, page.next_cursor)
+        if page.has_previous():
+            context['previous_page_query'] = self._page_query(BEFORE_PARAM, page.previous_cursor)
+        return context
+
+    def _page_query(self, param, cursor):
+        """Return the current query string pointing at another page."""
+        query = self.request.GET.copy()
+        query.pop(AFTER_PARAM, None)
+        query.pop(BEFORE_PARAM, None)
+        query[param] = cursor
+        return query.urlencode()
+
+    def get_page_cache_key(self):
+        return list_page_key(self.request.GET.urlencode())
+
 
-class ClassDetailView(DetailView):
+class ClassDetailView(ProxyCacheHeadersMixin, AnonymousPageCacheMixin, ConditionalPageMixin, DetailView):
     model = GymClass
     template_name = 'classes/class_detail.html'
 
     def get_queryset(self):
-        return (
-            GymClass.objects.select_related('trainer')
-            .annotate(booking_count=Count('members', distinct=True))
+        return GymClass.objects.select_related('trainer')
+
+    def get_page_cache_key(self):
+        return detail_page_key(self.kwargs['pk'])
+
+    def get_page_version(self):
+        # Bookings and promotions move updated_at; joins and leaves move the
+        # waitlist figures, and with them the member's place in line.
+        version = GymClass.objects.filter(pk=self.kwargs['pk']).aggregate(
+            updated=Max('updated_at'),
+            waiting=Count('waitlist_entries'),
+            last_joined=Max('waitlist_entries__joined_at'),
         )
+        if version['updated'] is None:
+            # Unknown class: no validators, the view answers 404.
+            return None
+        last_modified = max(version['updated'], version['last_joined'] or version['updated'])
+        return last_modified, (version['updated'], version['waiting'], version['last_joined'])
+
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        try:
+            self.object = self.get_queryset().get(pk=self.kwargs['pk'])
+        except GymClass.DoesNotExist as exc:
+            raise Http404('Class not found.') from exc
+        self.already_booked = user.is_authenticated and self.object.members.filter(pk=user.pk).exists()
+        self.waitlist_position = None
+        if user.is_authenticated and not self.already_booked:
+            self.waitlist_position = WaitlistEntry.position_of(member=user, gym_class_id=self.object.pk)
+        return self.render_to_response(self.get_context_data(object=self.object))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['already_booked'] = (
-            self.request.user.is_authenticated
-            and self.object.members.filter(pk=self.request.user.pk).exists()
-        )
+        context['already_booked'] = self.already_booked
+        context['waitlist_position'] = self.waitlist_position
+        # The live stream needs the ASGI server; under WSGI it would only answer 501.
+        context['live_updates'] = settings.APP_SERVER == 'asgi'
         return context
+
+
+# Async versions of the views above, routed instead of them under the ASGI
+# server (see urls.py). Under WSGI every async handler would cost the request
+# an async_to_sync hop and gain no concurrency.
+
+class AsyncClassListView(ClassListView):
+    async def get(self, request, *args, **kwargs):
+        # Resolve the user here so context processors never touch the DB synchronously.
+        request.user = await request.auser()
+        self.object_list = self.get_queryset()
+        self.paginator = KeysetPaginator(self.object_list, self.paginate_by)
+        try:
+            self.page = await self.paginator.apage(
+                after=request.GET.get(AFTER_PARAM),
+                before=request.GET.get(BEFORE_PARAM),
+            )
+        except InvalidPage as exc:
+            raise Http404(str(exc)) from exc
+        return self.render_to_response(self.get_context_data())
+
+
+class AsyncClassDetailView(ClassDetailView):
+    async def get(self, request, *args, **kwargs):
+        user = request.user = await request.auser()
+        try:
+            self.object = await self.get_queryset().aget(pk=self.kwargs['pk'])
+        except GymClass.DoesNotExist as exc:
+            raise Http404('Class not found.') from exc
+        self.already_booked = (
+            user.is_authenticated
+            and await self.object.members.filter(pk=user.pk).aexists()
+        )
+        self.waitlist_position = None
+        if user.is_authenticated and not self.already_booked:
+            self.waitlist_position = await WaitlistEntry.aposition_of(member=user, gym_class_id=self.object.pk)
+        return self.render_to_response(self.get_context_data(object=self.object))
@@ -0,0 +1,39 @@
+from django.contrib import admin, messages
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'status', 'run_at', 'attempts', 'last_error', 'created_at']
+    list_filter = ['status', 'kind']
+    search_fields = ['kind', 'key']
+    readonly_fields = ['created_at']
+    date_hierarchy = 'run_at'
+    actions = ['retry_jobs']
+    list_per_page = 25
+
+    @admin.action(description='Retry selected jobs now')
+    def retry_jobs(self, request, queryset):
+        # A running job is still with its worker.
+        jobs = queryset.exclude(status=Job.Status.RUNNING)
+        retried = 0
+        for job in jobs:
+            job.status, job.attempts, job.run_at = Job.Status.PENDING, 0, timezone.now()
+            try:
+                with transaction.atomic():
+                    job.save(update_fields=['status', 'attempts', 'run_at'])
+            except IntegrityError:
+                # A pending job with the same key already does this job's work.
+                continue
+            retried += 1
+        self.message_user(request, f'Queued {retried} job(s) to run again.')
+        skipped = queryset.count() - retried
+        if skipped:
+            self.message_user(
+                request,
+                f'Skipped {skipped} job(s) that are running or already have a pending job with the same key.',
+                messages.WARNING,
+            )
@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    name = 'src.jobs'
+    verbose_name = 'Background jobs'
@@ -0,0 +1,74 @@
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from src.jobs.queue import run_due_jobs
+
+
+def work(stop, batch_size, poll_interval, once):
+    """Run due jobs until ``stop`` is set, or until none are due with ``once``."""
+    try:
+        while not stop.is_set():
+            if not run_due_jobs(batch_size):
+                if once:
+                    return
+                stop.wait(poll_interval)
+    finally:
+        connections.close_all()
+
+
+def _work_in_process(*args):
+    # The parent handles Ctrl+C and SIGTERM and tells its children to stop.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    work(*args)
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs from the job table with a pool of worker threads or processes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pool', choices=['thread', 'process'], default='thread',
+            help='Run workers as threads (the default; suits I/O-bound jobs such as email) or processes.',
+        )
+        parser.add_argument('--concurrency', type=int, default=4, help='Number of workers (default: 4).')
+        parser.add_argument('--batch-size', type=int, default=10, help='Jobs claimed per query (default: 10).')
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Seconds an idle worker waits before checking for due jobs again (default: 1).',
+        )
+        parser.add_argument('--once', action='store_true', help='Exit once no jobs are due.')
+
+    def handle(self, *args, pool, concurrency, batch_size, poll_interval, once, **options):
+        if pool == 'process':
+            # Forked children must not share the parent's database connections.
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            stop = context.Event()
+            workers = [
+                context.Process(target=_work_in_process, args=(stop, batch_size, poll_interval, once))
+                for _ in range(concurrency)
+            ]
+        else:
+            stop = threading.Event()
+            workers = [
+                threading.Thread(target=work, args=(stop, batch_size, poll_interval, once))
+                for _ in range(concurrency)
+            ]
+
+        def shut_down(signum, frame):
+            self.stdout.write('Stopping workers after their current jobs...')
+            stop.set()
+
+        signal.signal(signal.SIGINT, shut_down)
+        signal.signal(signal.SIGTERM, shut_down)
+        self.stdout.write(f'Running {concurrency} {pool} worker(s).')
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.stdout.write(self.style.SUCCESS('Workers stopped.'))
@@ -0,0 +1,52 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A unit of background work, stored in the database until a worker runs it.
+
+    Jobs are deleted once they succeed. A job that keeps failing is kept
+    with ``status=failed`` and its last error for inspection in the admin.
+    While a worker runs a job it is ``running`` and ``run_at`` holds the end
+    of the worker's lease.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        FAILED = 'failed', 'Failed'
+
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    key = models.CharField(
+        max_length=200,
+        null=True,
+        blank=True,
+        help_text='Optional deduplication key: at most one pending job per key.',
+    )
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['run_at', 'id']
+        indexes = [
+            # The dequeue scan: due pending jobs and expired leases in run_at order.
+            models.Index(
+                fields=['run_at', 'id'],
+                condition=models.Q(status__in=['pending', 'running']),
+                name='job_due_run_at_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'],
+                condition=models.Q(status='pending'),
+                name='unique_pending_job_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} #{self.pk}'
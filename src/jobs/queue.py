@@ -0,0 +1,121 @@
+"""A small job queue kept in the ``Job`` table.
+
+Jobs are enqueued with ``enqueue()`` on the caller's database connection,
+so a job enqueued inside a transaction commits or rolls back with the rows
+written next to it and no worker can see it earlier. Workers claim due jobs
+with ``SELECT ... FOR UPDATE SKIP LOCKED``, so any number of them can poll
+the table without handing the same job out twice or waiting on each other.
+The claim marks a job ``running`` with a lease of LEASE and commits before
+the handler runs, so no row lock is held while it sends email and a keyed
+``enqueue()`` never waits on it; the outcome is recorded in a second short
+transaction. If the worker dies mid-job the lease runs out and another
+worker picks the job up again, as one more attempt.
+
+Handlers are plain functions taking the payload as keyword arguments,
+registered under a job kind with ``@register``.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from src.jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+RETRY_DELAY = timedelta(seconds=30)
+# A job still running after this is taken to have lost its worker.
+LEASE = timedelta(minutes=10)
+LOST_WORKER_ERROR = 'The worker running the job stopped before it finished.'
+
+HANDLERS = {}
+
+
+def register(kind):
+    """Register the decorated function as the handler for ``kind`` jobs."""
+    def decorator(handler):
+        HANDLERS[kind] = handler
+        return handler
+    return decorator
+
+
+def enqueue(kind, payload=None, *, run_at=None, key=None):
+    """Add a job; with ``key``, replace the pending job with that key instead of adding another."""
+    fields = {'kind': kind, 'payload': payload or {}, 'run_at': run_at or timezone.now()}
+    if key is None:
+        return Job.objects.create(**fields)
+    pending = Job.objects.filter(key=key, status=Job.Status.PENDING)
+    if pending.update(**fields):
+        return pending.get()
+    try:
+        with transaction.atomic():
+            return Job.objects.create(key=key, **fields)
+    except IntegrityError:
+        # Another writer enqueued the same key first.
+        pending.update(**fields)
+        return pending.get()
+
+
+def enqueue_many(jobs):
+    """Insert unsaved ``Job`` instances in one statement, skipping keys that are already pending."""
+    return Job.objects.bulk_create(jobs, ignore_conflicts=True)
+
+
+def run_due_jobs(batch_size=1):
+    """Claim up to ``batch_size`` due jobs and run them; return how many were claimed."""
+    jobs = _claim(batch_size)
+    for job in jobs:
+        _run(job)
+    return len(jobs)
+
+
+def _claim(batch_size):
+    """Mark up to ``batch_size`` due jobs running, in a transaction of their own."""
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status__in=[Job.Status.PENDING, Job.Status.RUNNING], run_at__lte=now)
+            .order_by('run_at', 'id')[:batch_size]
+        )
+        claimed = []
+        for job in jobs:
+            if job.status == Job.Status.RUNNING:
+                logger.warning('Job %s (%s) lost its worker on attempt %s.', job.pk, job.kind, job.attempts)
+                job.last_error = LOST_WORKER_ERROR
+                if job.attempts >= MAX_ATTEMPTS:
+                    job.status = Job.Status.FAILED
+                    continue
+            job.status = Job.Status.RUNNING
+            job.attempts += 1
+            job.run_at = now + LEASE
+            claimed.append(job)
+        Job.objects.bulk_update(jobs, ['status', 'attempts', 'run_at', 'last_error'])
+    return claimed
+
+
+def _run(job):
+    try:
+        handler = HANDLERS.get(job.kind)
+        if handler is None:
+            raise LookupError(f'No handler is registered for {job.kind!r} jobs.')
+        with transaction.atomic():
+            handler(**job.payload)
+    except Exception as exc:
+        logger.exception('Job %s (%s) failed on attempt %s.', job.pk, job.kind, job.attempts)
+        job.last_error = f'{type(exc).__name__}: {exc}'
+        if job.attempts >= MAX_ATTEMPTS:
+            job.status = Job.Status.FAILED
+        else:
+            job.status = Job.Status.PENDING
+            job.run_at = timezone.now() + RETRY_DELAY * 2 ** (job.attempts - 1)
+        try:
+            with transaction.atomic():
+                job.save(update_fields=['last_error', 'status', 'run_at'])
+        except IntegrityError:
+            # The same key was enqueued again while the job ran; that job replaces the retry.
+            job.delete()
+    else:
+        job.delete()
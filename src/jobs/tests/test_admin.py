@@ -0,0 +1,42 @@
+import pytest
+from django.urls import reverse
+
+from src.jobs import queue
+from src.jobs.models import Job
+
+pytestmark = pytest.mark.integration
+
+
+def _retry(admin_client, *jobs):
+    return admin_client.post(
+        reverse('admin:jobs_job_changelist'),
+        {'action': 'retry_jobs', '_selected_action': [job.pk for job in jobs]},
+        follow=True,
+    )
+
+
+def test_retry_requeues_failed_jobs(admin_client):
+    job = Job.objects.create(kind='tests.fail', status=Job.Status.FAILED, attempts=queue.MAX_ATTEMPTS)
+
+    response = _retry(admin_client, job)
+
+    job.refresh_from_db()
+    assert response.status_code == 200
+    assert job.status == Job.Status.PENDING
+    assert job.attempts == 0
+
+
+def test_retry_skips_failed_jobs_whose_key_is_pending_again(admin_client):
+    failed = Job.objects.create(kind='tests.fail', key='k', status=Job.Status.FAILED, attempts=queue.MAX_ATTEMPTS)
+    pending = queue.enqueue('tests.fail', key='k')
+    running = Job.objects.create(kind='tests.fail', status=Job.Status.RUNNING)
+
+    response = _retry(admin_client, failed, running)
+
+    failed.refresh_from_db()
+    running.refresh_from_db()
+    assert response.status_code == 200
+    assert failed.status == Job.Status.FAILED
+    assert running.status == Job.Status.RUNNING
+    assert list(Job.objects.filter(status=Job.Status.PENDING)) == [pending]
+    assert b'Skipped 2 job(s)' in response.content
@@ -0,0 +1,26 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from src.jobs import queue
+from src.jobs.models import Job
+
+# Worker threads use their own connections, so the jobs must really be committed.
+pytestmark = [pytest.mark.integration, pytest.mark.django_db(transaction=True)]
+
+
+def test_run_worker_once_runs_due_jobs_and_exits(monkeypatch):
+    calls = []
+    monkeypatch.setitem(queue.HANDLERS, 'tests.record', lambda **payload: calls.append(payload))
+    monkeypatch.setattr('signal.signal', lambda *args: None)
+    for n in range(3):
+        queue.enqueue('tests.record', {'n': n})
+
+    out = StringIO()
+    call_command('run_worker', '--once', '--concurrency', '1', stdout=out)
+
+    assert sorted(call['n'] for call in calls) == [0, 1, 2]
+    assert not Job.objects.exists()
+    assert 'Running 1 thread worker(s).' in out.getvalue()
+    assert 'Workers stopped.' in out.getvalue()
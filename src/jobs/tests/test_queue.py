@@ -0,0 +1,180 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from src.jobs import queue
+from src.jobs.models import Job
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def handler(db, monkeypatch):
+    calls = []
+    monkeypatch.setitem(queue.HANDLERS, 'tests.record', lambda **payload: calls.append(payload))
+    return calls
+
+
+def test_enqueue_adds_a_job_due_now(db):
+    job = queue.enqueue('tests.record', {'n': 1})
+
+    assert job.status == Job.Status.PENDING
+    assert job.payload == {'n': 1}
+    assert job.run_at <= timezone.now()
+
+
+def test_enqueue_with_key_replaces_the_pending_job(db):
+    later = timezone.now() + timedelta(hours=2)
+    first = queue.enqueue('tests.record', {'n': 1}, key='k')
+    second = queue.enqueue('tests.record', {'n': 2}, key='k', run_at=later)
+
+    assert second.pk == first.pk
+    assert Job.objects.count() == 1
+    assert second.payload == {'n': 2}
+    assert second.run_at == later
+
+
+def test_enqueue_many_skips_keys_already_pending(db):
+    queue.enqueue('tests.record', key='a')
+
+    queue.enqueue_many([Job(kind='tests.record', key='a'), Job(kind='tests.record', key='b')])
+
+    assert sorted(Job.objects.values_list('key', flat=True)) == ['a', 'b']
+
+
+def test_run_due_jobs_runs_and_deletes_due_jobs_in_order(handler):
+    queue.enqueue('tests.record', {'n': 2})
+    queue.enqueue('tests.record', {'n': 1}, run_at=timezone.now() - timedelta(minutes=1))
+    queue.enqueue('tests.record', {'n': 3}, run_at=timezone.now() + timedelta(hours=1))
+
+    assert queue.run_due_jobs(batch_size=10) == 2
+
+    assert handler == [{'n': 1}, {'n': 2}]
+    assert list(Job.objects.values_list('payload', flat=True)) == [{'n': 3}]
+
+
+def test_run_due_jobs_returns_zero_when_nothing_is_due(handler):
+    queue.enqueue('tests.record', run_at=timezone.now() + timedelta(hours=1))
+
+    assert queue.run_due_jobs() == 0
+    assert handler == []
+
+
+def test_failed_job_is_retried_later_with_backoff(db, monkeypatch):
+    def fail(**payload):
+        raise RuntimeError('SMTP is down')
+
+    monkeypatch.setitem(queue.HANDLERS, 'tests.fail', fail)
+    job = queue.enqueue('tests.fail')
+
+    queue.run_due_jobs()
+
+    job.refresh_from_db()
+    assert job.status == Job.Status.PENDING
+    assert job.attempts == 1
+    assert job.last_error == 'RuntimeError: SMTP is down'
+    assert job.run_at > timezone.now() + queue.RETRY_DELAY / 2
+
+
+def test_job_is_marked_failed_after_max_attempts(db, monkeypatch):
+    monkeypatch.setitem(queue.HANDLERS, 'tests.fail', lambda: 1 / 0)
+    job = queue.enqueue('tests.fail')
+    Job.objects.filter(pk=job.pk).update(attempts=queue.MAX_ATTEMPTS - 1)
+
+    queue.run_due_jobs()
+
+    job.refresh_from_db()
+    assert job.status == Job.Status.FAILED
+    assert job.attempts == queue.MAX_ATTEMPTS
+
+
+def test_failed_handler_rolls_back_its_own_writes(db, monkeypatch):
+    def write_then_fail():
+        queue.enqueue('tests.record', key='side-effect')
+        raise RuntimeError('boom')
+
+    monkeypatch.setitem(queue.HANDLERS, 'tests.fail', write_then_fail)
+    queue.enqueue('tests.fail')
+
+    queue.run_due_jobs()
+
+    assert not Job.objects.filter(key='side-effect').exists()
+
+
+def test_unknown_kind_fails_with_lookup_error(db):
+    job = queue.enqueue('tests.unknown')
+
+    queue.run_due_jobs()
+
+    job.refresh_from_db()
+    assert job.last_error == "LookupError: No handler is registered for 'tests.unknown' jobs."
+
+
+def test_handler_runs_after_the_claim_commits(db, monkeypatch):
+    seen = []
+
+    def record_status(**payload):
+        seen.append(Job.objects.get(key='k').status)
+        # A keyed enqueue neither waits on nor replaces the running job.
+        queue.enqueue('tests.record', {'n': 2}, key='k')
+
+    monkeypatch.setitem(queue.HANDLERS, 'tests.status', record_status)
+    queue.enqueue('tests.status', {'n': 1}, key='k')
+
+    queue.run_due_jobs()
+
+    assert seen == [Job.Status.RUNNING]
+    assert list(Job.objects.values_list('kind', 'status')) == [('tests.record', Job.Status.PENDING)]
+
+
+def test_retry_is_dropped_when_the_key_was_enqueued_again(db, monkeypatch):
+    claim = queue._claim
+
+    def claim_then_enqueue(batch_size):
+        jobs = claim(batch_size)
+        # Another request enqueues the same key while the job runs.
+        queue.enqueue('tests.record', {'n': 2}, key='k')
+        return jobs
+
+    monkeypatch.setattr(queue, '_claim', claim_then_enqueue)
+    monkeypatch.setitem(queue.HANDLERS, 'tests.fail', lambda: 1 / 0)
+    queue.enqueue('tests.fail', key='k')
+
+    queue.run_due_jobs()
+
+    assert list(Job.objects.values_list('kind', 'status')) == [('tests.record', Job.Status.PENDING)]
+
+
+def test_job_of_a_lost_worker_is_claimed_again_after_its_lease(handler):
+    job = queue.enqueue('tests.record', {'n': 1})
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.Status.RUNNING, attempts=1, run_at=timezone.now() - timedelta(seconds=1)
+    )
+
+    assert queue.run_due_jobs() == 1
+
+    assert handler == [{'n': 1}]
+    assert not Job.objects.exists()
+
+
+def test_running_job_is_not_claimed_while_its_lease_lasts(handler):
+    job = queue.enqueue('tests.record')
+    Job.objects.filter(pk=job.pk).update(status=Job.Status.RUNNING, run_at=timezone.now() + queue.LEASE)
+
+    assert queue.run_due_jobs() == 0
+    assert handler == []
+
+
+def test_job_that_keeps_losing_its_worker_is_marked_failed(handler):
+    job = queue.enqueue('tests.record')
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.Status.RUNNING, attempts=queue.MAX_ATTEMPTS, run_at=timezone.now() - timedelta(seconds=1)
+    )
+
+    assert queue.run_due_jobs() == 0
+
+    job.refresh_from_db()
+    assert handler == []
+    assert job.status == Job.Status.FAILED
+    assert job.last_error == queue.LOST_WORKER_ERROR
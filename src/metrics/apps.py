@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class MetricsConfig(AppConfig):
+    name = 'src.metrics'
+    verbose_name = 'Metrics'
+
+    def ready(self):
+        from src.metrics import signals  # noqa: F401
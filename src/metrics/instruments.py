@@ -0,0 +1,32 @@
+"""Prometheus metrics exported at ``/metrics``.
+
+Under Gunicorn, PROMETHEUS_MULTIPROC_DIR (set in gunicorn.conf.py) makes
+prometheus_client keep every worker's samples in mmap-backed files there.
+Recording a sample is a write to shared memory with no locking across
+processes; the work of merging the files is done by the scrape.
+"""
+from prometheus_client import Counter, Gauge, Histogram
+
+REQUEST_LATENCY = Histogram(
+    'gym_http_request_duration_seconds',
+    'Time to produce a response, by URL name.',
+    ['view', 'method', 'status'],
+)
+BOOKINGS_CREATED = Counter('gym_bookings_created', 'Bookings made by members.')
+BOOKINGS_REJECTED = Counter('gym_bookings_rejected', 'Booking attempts refused, by reason.', ['reason'])
+SEAT_RESERVATION = Histogram(
+    'gym_booking_seat_reservation_seconds',
+    'Time spent claiming a seat in Booking.create_for_member, including waiting on the class row lock.',
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_CONNECTIONS_OPENED = Counter(
+    'gym_db_connections_opened', 'New database connections; a steady climb means connections are not reused.',
+    ['alias'],
+)
+DB_POOL_CONNECTIONS = Gauge(
+    'gym_db_pool_connections', 'Connections held by the workers\' pools (size) and how many are idle (available).',
+    ['alias', 'state'], multiprocess_mode='livesum',
+)
+CATALOGUE_CACHE_LOOKUPS = Counter(
+    'gym_catalogue_cache_lookups', 'Anonymous catalogue page cache lookups, by result (hit or miss).', ['result'],
+)
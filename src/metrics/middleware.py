@@ -0,0 +1,49 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+
+from src.metrics.instruments import DB_POOL_CONNECTIONS, REQUEST_LATENCY
+
+UNRESOLVED_VIEW = '<unresolved>'
+
+
+class PrometheusMiddleware:
+    """Time every request by URL name and sample the database pool afterwards."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, started)
+        return response
+
+    def observe(self, request, response, started):
+        match = request.resolver_match
+        # URL names, not paths, so class and booking ids do not each get a series.
+        view = match.view_name if match else UNRESOLVED_VIEW
+        REQUEST_LATENCY.labels(
+            view=view, method=request.method, status=response.status_code,
+        ).observe(time.perf_counter() - started)
+        # Pools are shared by all of a worker's threads, whichever thread this runs on.
+        for connection in connections.all():
+            pool = getattr(connection, 'pool', None)
+            if pool is not None:
+                stats = pool.get_stats()
+                DB_POOL_CONNECTIONS.labels(alias=connection.alias, state='size').set(stats['pool_size'])
+                DB_POOL_CONNECTIONS.labels(alias=connection.alias, state='available').set(stats['pool_available'])
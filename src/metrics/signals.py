@@ -0,0 +1,9 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from src.metrics.instruments import DB_CONNECTIONS_OPENED
+
+
+@receiver(connection_created)
+def count_new_connection(sender, connection, **kwargs):
+    DB_CONNECTIONS_OPENED.labels(alias=connection.alias).inc()
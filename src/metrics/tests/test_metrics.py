@@ -0,0 +1,73 @@
+import pytest
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from src.bookings.models import Booking
+from tests.helpers import past_datetime
+
+pytestmark = pytest.mark.integration
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_metrics_endpoint_serves_prometheus_text(client):
+    response = client.get(reverse('metrics'))
+
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=')
+    assert b'# TYPE gym_bookings_created_total counter' in response.content
+
+
+def test_metrics_endpoint_merges_worker_files(client, monkeypatch, tmp_path):
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+
+    response = client.get(reverse('metrics'))
+
+    # No worker has written samples to the empty directory yet.
+    assert response.status_code == 200
+    assert b'gym_bookings_created' not in response.content
+
+
+def test_request_latency_is_recorded_per_url_name(client, gym_class_factory):
+    gc = gym_class_factory()
+    labels = {'view': 'class-detail', 'method': 'GET', 'status': '200'}
+    before = sample('gym_http_request_duration_seconds_count', **labels)
+
+    client.get(reverse('class-detail', kwargs={'pk': gc.pk}))
+    client.get(reverse('class-detail', kwargs={'pk': gc.pk}))
+
+    assert sample('gym_http_request_duration_seconds_count', **labels) == before + 2
+
+
+def test_booking_outcomes_are_counted_by_reason(auth_client, gym_class_factory):
+    client, user = auth_client
+    gc = gym_class_factory(max_capacity=5)
+    started = gym_class_factory(scheduled_at=past_datetime(days=1))
+    created = sample('gym_bookings_created_total')
+    duplicate = sample('gym_bookings_rejected_total', reason='duplicate')
+    too_late = sample('gym_bookings_rejected_total', reason='started')
+    reservations = sample('gym_booking_seat_reservation_seconds_count')
+
+    client.post(reverse('booking-create', kwargs={'class_id': gc.pk}))
+    client.post(reverse('booking-create', kwargs={'class_id': gc.pk}))
+    client.post(reverse('booking-create', kwargs={'class_id': started.pk}))
+
+    assert Booking.objects.filter(member=user).count() == 1
+    assert sample('gym_bookings_created_total') == created + 1
+    assert sample('gym_bookings_rejected_total', reason='duplicate') == duplicate + 1
+    assert sample('gym_bookings_rejected_total', reason='started') == too_late + 1
+    assert sample('gym_booking_seat_reservation_seconds_count') == reservations + 3
+
+
+def test_catalogue_cache_lookups_are_counted(client, gym_class_factory):
+    gc = gym_class_factory()
+    hits = sample('gym_catalogue_cache_lookups_total', result='hit')
+    misses = sample('gym_catalogue_cache_lookups_total', result='miss')
+
+    client.get(reverse('class-detail', kwargs={'pk': gc.pk}))
+    client.get(reverse('class-detail', kwargs={'pk': gc.pk}))
+
+    assert sample('gym_catalogue_cache_lookups_total', result='miss') == misses + 1
+    assert sample('gym_catalogue_cache_lookups_total', result='hit') == hits + 1
@@ -0,0 +1,16 @@
+import os
+
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector
+
+
+def metrics_view(request):
+    """Expose the metrics in the Prometheus text format."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        # Merge the samples every worker process has written.
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,96 @@
+"""The async views served through Django's ASGI request handler."""
+import importlib
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, override_settings
+from django.urls import clear_url_caches, resolve, reverse
+
+from config import urls as root_urls
+from src.bookings import urls as booking_urls
+from src.bookings.models import Booking
+from src.bookings.views import AsyncBookingListView, BookingListView
+from src.classes import urls as class_urls
+from src.classes.views import AsyncClassDetailView, AsyncClassListView, ClassDetailView, ClassListView
+from tests.helpers import future_datetime
+
+pytestmark = pytest.mark.integration
+
+
+def _route_views():
+    # The URLconfs pick the sync or async views when imported.
+    importlib.reload(class_urls)
+    importlib.reload(booking_urls)
+    importlib.reload(root_urls)
+    clear_url_caches()
+
+
+@pytest.fixture
+def asgi_views():
+    with override_settings(APP_SERVER='asgi'):
+        _route_views()
+        yield
+    _route_views()
+
+
+def _get(client, url):
+    return async_to_sync(client.get)(url)
+
+
+def test_class_list_and_detail_render_over_asgi(asgi_views, gym_class_factory):
+    gc = gym_class_factory(name='Async Yoga', scheduled_at=future_datetime(days=1))
+    client = AsyncClient()
+
+    listing = _get(client, reverse('class-list'))
+    detail = _get(client, reverse('class-detail', kwargs={'pk': gc.pk}))
+
+    assert [obj.name for obj in listing.context['object_list']] == ['Async Yoga']
+    assert detail.context['object'] == gc
+    assert detail.context['already_booked'] is False
+
+
+def test_missing_class_returns_404_over_asgi(asgi_views, db):
+    response = _get(AsyncClient(), reverse('class-detail', kwargs={'pk': 999999}))
+
+    assert response.status_code == 404
+
+
+def test_booking_list_requires_login_over_asgi(asgi_views, db):
+    response = _get(AsyncClient(), reverse('booking-list'))
+
+    assert response.status_code == 302
+    assert '/accounts/login/' in response.url
+
+
+def test_member_books_and_sees_booking_over_asgi(asgi_views, gym_class_factory, user_factory):
+    gc = gym_class_factory(scheduled_at=future_datetime(days=1), max_capacity=3)
+    member = user_factory()
+    client = AsyncClient()
+    client.force_login(member)
+
+    booked = async_to_sync(client.post)(reverse('booking-create', kwargs={'class_id': gc.pk}))
+    dashboard = _get(client, reverse('booking-list'))
+    detail = _get(client, reverse('class-detail', kwargs={'pk': gc.pk}))
+
+    assert booked.status_code == 302
+    assert booked.url == reverse('booking-list')
+    assert Booking.objects.filter(member=member, gym_class=gc).exists()
+    assert [b.gym_class_id for b in dashboard.context['upcoming_bookings']] == [gc.pk]
+    assert detail.context['already_booked'] is True
+    gc.refresh_from_db()
+    assert gc.booked_count == 1
+
+
+def test_urls_route_the_async_views_under_asgi(asgi_views, db):
+    assert resolve(reverse('class-list')).func.view_class is AsyncClassListView
+    assert resolve(reverse('class-detail', kwargs={'pk': 1})).func.view_class is AsyncClassDetailView
+    assert resolve(reverse('booking-list')).func.view_class is AsyncBookingListView
+    assert AsyncClassListView.view_is_async and AsyncBookingListView.view_is_async
+
+
+def test_urls_route_the_sync_views_under_wsgi(db):
+    # Sync workers would otherwise pay an async_to_sync hop on every request.
+    assert resolve(reverse('class-list')).func.view_class is ClassListView
+    assert resolve(reverse('class-detail', kwargs={'pk': 1})).func.view_class is ClassDetailView
+    assert resolve(reverse('booking-list')).func.view_class is BookingListView
+    assert not ClassListView.view_is_async and not BookingListView.view_is_async
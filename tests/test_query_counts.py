@@ -0,0 +1,155 @@
+"""N+1 regression tests: the query count of each page must not grow with its rows.
+
+Every view is seeded with 1, 10 and 100 rows in turn (each size inside its
+own rolled-back transaction) and requested once per size; the number of
+queries must be the pinned count every time. A template or admin column
+that touches ``class.bookings`` or ``trainer.gym_classes`` per row fails
+here with the counts per size, and so does any query added to a page.
+"""
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from src.bookings.models import Booking, WaitlistEntry
+from tests.helpers import future_datetime, past_datetime
+
+pytestmark = pytest.mark.integration
+
+ROW_COUNTS = (1, 10, 100)
+
+
+@pytest.fixture(autouse=True)
+def fast_password_hashing(settings):
+    # Seeding creates hundreds of members; the default hasher would dominate the run.
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+def assert_constant_queries(seed, fetch, expected):
+    """Run ``fetch(seed(rows))`` for each row count and assert it always issues ``expected`` queries.
+
+    On failure the message shows the count per row count and the queries of
+    the first run that missed, so a new query is visible in the diff.
+    """
+    counts, missed = {}, None
+    for rows in ROW_COUNTS:
+        with transaction.atomic():
+            target = seed(rows)
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                response = fetch(target)
+            assert response.status_code in (200, 302), response.status_code
+            counts[rows] = len(ctx.captured_queries)
+            if counts[rows] != expected and missed is None:
+                missed = [query['sql'] for query in ctx.captured_queries]
+            transaction.set_rollback(True)
+    assert counts == dict.fromkeys(ROW_COUNTS, expected), (
+        f'Expected {expected} queries per request, got {counts}:\n' + '\n'.join(
+            f'{number}. {sql}' for number, sql in enumerate(missed, start=1)
+        )
+    )
+
+
+@pytest.fixture
+def seed_classes(gym_class_factory, booking_factory):
+    """Create ``rows`` upcoming classes, each with its own trainer and a booking."""
+    def _seed(rows):
+        classes = []
+        for i in range(rows):
+            gym_class = gym_class_factory(scheduled_at=future_datetime(hours=i + 1))
+            booking_factory(gym_class=gym_class)
+            classes.append(gym_class)
+        return classes
+
+    return _seed
+
+
+@pytest.fixture
+def seed_full_class(user_factory, gym_class_factory, booking_factory):
+    """Create one class with ``rows`` bookings and ``rows`` members on its waitlist."""
+    def _seed(rows, capacity=None, member=None):
+        gym_class = gym_class_factory(max_capacity=capacity or rows)
+        for _ in range(rows):
+            booking_factory(gym_class=gym_class)
+        for position in range(1, rows + 1):
+            WaitlistEntry.objects.create(member=user_factory(), gym_class=gym_class, position=position)
+        if member is not None:
+            booking_factory(member=member, gym_class=gym_class)
+        return gym_class
+
+    return _seed
+
+
+def test_class_list_query_count_is_constant(client, seed_classes):
+    assert_constant_queries(seed_classes, lambda classes: client.get(reverse('class-list')), expected=2)
+
+
+def test_class_detail_query_count_is_constant(auth_client, seed_full_class):
+    client, user = auth_client
+
+    assert_constant_queries(
+        seed_full_class,
+        lambda gym_class: client.get(reverse('class-detail', kwargs={'pk': gym_class.pk})),
+        expected=6,
+    )
+
+
+def test_booking_list_query_count_is_constant(auth_client, gym_class_factory, booking_factory):
+    client, user = auth_client
+
+    def seed(rows):
+        for i in range(rows):
+            # Half upcoming, half completed, so both sections of the dashboard fill up.
+            scheduled_at = future_datetime(hours=i + 1) if i % 2 else past_datetime(days=i + 1)
+            booking_factory(member=user, gym_class=gym_class_factory(scheduled_at=scheduled_at))
+
+    assert_constant_queries(seed, lambda _: client.get(reverse('booking-list')), expected=4)
+
+
+def test_booking_create_query_count_is_constant(auth_client, seed_full_class):
+    client, user = auth_client
+
+    def seed(rows):
+        return seed_full_class(rows, capacity=rows + 1)
+
+    def book(gym_class):
+        response = client.post(reverse('booking-create', kwargs={'class_id': gym_class.pk}))
+        assert Booking.objects.filter(member=user, gym_class=gym_class).exists()
+        return response
+
+    assert_constant_queries(seed, book, expected=9)
+
+
+def test_booking_cancel_query_count_is_constant(auth_client, seed_full_class):
+    client, user = auth_client
+
+    def seed(rows):
+        # The cancelled seat goes to the head of the waitlist.
+        gym_class = seed_full_class(rows, capacity=rows + 1, member=user)
+        return Booking.objects.get(member=user, gym_class=gym_class)
+
+    def cancel(booking):
+        response = client.post(reverse('booking-cancel', kwargs={'pk': booking.pk}))
+        assert not Booking.objects.filter(pk=booking.pk).exists()
+        return response
+
+    assert_constant_queries(seed, cancel, expected=14)
+
+
+def test_admin_gym_class_changelist_query_count_is_constant(admin_client, seed_classes):
+    assert_constant_queries(
+        seed_classes, lambda _: admin_client.get(reverse('admin:classes_gymclass_changelist')), expected=8,
+    )
+
+
+def test_admin_booking_changelist_query_count_is_constant(admin_client, seed_classes):
+    assert_constant_queries(
+        seed_classes, lambda _: admin_client.get(reverse('admin:bookings_booking_changelist')), expected=9,
+    )
+
+
+def test_admin_report_query_count_is_constant(admin_client, seed_classes):
+    assert_constant_queries(
+        seed_classes, lambda _: admin_client.get(reverse('admin:bookings_booking_report')), expected=4,
+    )
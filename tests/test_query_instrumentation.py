@@ -0,0 +1,83 @@
+"""The opt-in per-request query instrumentation middleware."""
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, override_settings
+from django.urls import reverse
+
+from config.middleware import QueryInstrumentationMiddleware, query_shape
+from src.classes.models import GymClass
+
+pytestmark = pytest.mark.integration
+
+
+def test_instrumentation_is_off_by_default(client, gym_class_factory):
+    gc = gym_class_factory()
+
+    response = client.get(reverse('class-detail', kwargs={'pk': gc.pk}))
+
+    assert 'Server-Timing' not in response.headers
+
+
+@override_settings(QUERY_INSTRUMENTATION=True)
+def test_server_timing_header_and_request_log(auth_client, gym_class_factory, caplog):
+    client, user = auth_client
+    gc = gym_class_factory()
+
+    with caplog.at_level(logging.INFO, logger='config.middleware'):
+        response = client.get(reverse('class-detail', kwargs={'pk': gc.pk}))
+
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('db;dur=')
+    assert 'render;dur=' in timing
+    assert 'total;dur=' in timing
+    [record] = caplog.records
+    stats = record.request_stats
+    assert stats['path'] == reverse('class-detail', kwargs={'pk': gc.pk})
+    assert stats['status'] == 200
+    # The session, the user, the class, the booking check and the waitlist lookup.
+    assert stats['queries'] >= 4
+    assert f'desc="{stats["queries"]} queries"' in timing
+    assert stats['slowest_sql'].startswith('SELECT')
+    assert f'queries={stats["queries"]}' in record.getMessage()
+
+
+@override_settings(QUERY_INSTRUMENTATION=True)
+def test_async_views_are_counted_over_asgi(gym_class_factory, caplog):
+    gym_class_factory()
+
+    with caplog.at_level(logging.INFO, logger='config.middleware'):
+        response = async_to_sync(AsyncClient().get)(reverse('class-list'))
+
+    assert 'Server-Timing' in response.headers
+    assert caplog.records[0].request_stats['queries'] >= 1
+
+
+@override_settings(QUERY_INSTRUMENTATION=True, QUERY_REPEAT_THRESHOLD=3)
+def test_repeated_query_shape_is_logged_as_n_plus_one(gym_class_factory, caplog):
+    classes = [gym_class_factory() for _ in range(4)]
+
+    def view(request):
+        for gc in classes:
+            GymClass.objects.filter(pk=gc.pk).exists()
+        GymClass.objects.filter(pk__in=[gc.pk for gc in classes]).count()
+        return HttpResponse()
+
+    middleware = QueryInstrumentationMiddleware(view)
+    with caplog.at_level(logging.INFO, logger='config.middleware'):
+        middleware(RequestFactory().get('/n-plus-one/'))
+
+    [warning] = [record for record in caplog.records if record.levelno == logging.WARNING]
+    assert warning.request_stats['count'] == 4
+    assert warning.request_stats['path'] == '/n-plus-one/'
+    assert 'LIMIT' in warning.request_stats['sql']
+
+
+def test_query_shape_folds_literals_and_in_lists():
+    assert query_shape('SELECT * FROM t WHERE id IN (%s, %s, %s) LIMIT 21') == (
+        query_shape('SELECT * FROM t WHERE id IN (%s, %s) LIMIT 1')
+    )
+    assert query_shape("SELECT 'a' FROM t") == query_shape("SELECT 'b' FROM t")
+    assert query_shape('SELECT * FROM bookings_booking') == 'SELECT * FROM bookings_booking'
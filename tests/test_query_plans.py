@@ -0,0 +1,106 @@
+"""Query-plan regression tests for the schedule and booking hot paths.
+
+Seeds a schedule large enough that PostgreSQL would rather use an index
+than scan, runs ``EXPLAIN`` on the querysets the views build, and fails if
+a sequential scan of the classes or bookings table comes back. Skipped on
+other database backends.
+"""
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory
+from django.utils import timezone
+
+from src.bookings.models import Booking
+from src.bookings.views import BookingListView
+from src.classes.models import GymClass, Trainer
+from src.classes.views import ClassDetailView, ClassListView
+
+pytestmark = pytest.mark.integration
+
+HISTORY_CLASSES = 50_000
+UPCOMING_CLASSES = 200
+MEMBERS = 2_000
+BOOKINGS_PER_MEMBER = 20
+HOT_TABLES = ('classes_gymclass', 'bookings_booking')
+
+
+@pytest.fixture
+def large_schedule(db):
+    if connection.vendor != 'postgresql':
+        pytest.skip('Query plans are only checked on PostgreSQL.')
+
+    now = timezone.now()
+    trainers = Trainer.objects.bulk_create(
+        Trainer(first_name=f'First{i}', last_name=f'Last{i}', specialisation='General') for i in range(20)
+    )
+    past = (
+        GymClass(
+            name=f'Past {i}',
+            trainer=trainers[i % len(trainers)],
+            scheduled_at=now - timedelta(hours=i + 1),
+            max_capacity=20,
+        )
+        for i in range(HISTORY_CLASSES)
+    )
+    upcoming = (
+        GymClass(
+            name=f'Upcoming {i}',
+            trainer=trainers[i % len(trainers)],
+            scheduled_at=now + timedelta(hours=i + 1),
+            max_capacity=20,
+        )
+        for i in range(UPCOMING_CLASSES)
+    )
+    classes = GymClass.objects.bulk_create([*past, *upcoming], batch_size=5_000)
+    members = User.objects.bulk_create(
+        (User(username=f'member{i}') for i in range(MEMBERS)), batch_size=5_000
+    )
+    Booking.objects.bulk_create(
+        (
+            Booking(member=member, gym_class=classes[(m * 97 + b * 1_009) % len(classes)])
+            for m, member in enumerate(members)
+            for b in range(BOOKINGS_PER_MEMBER)
+        ),
+        batch_size=5_000,
+        ignore_conflicts=True,
+    )
+    with connection.cursor() as cursor:
+        for table in ('classes_trainer', 'auth_user', *HOT_TABLES):
+            cursor.execute(f'ANALYZE {table}')
+    return classes, members
+
+
+def _sequential_scans(queryset):
+    plan = queryset.explain()
+    return [table for table in HOT_TABLES if f'Seq Scan on {table}' in plan]
+
+
+def _view(view_class, user=None, **kwargs):
+    request = RequestFactory().get('/')
+    request.user = user
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view
+
+
+def test_upcoming_class_list_uses_index(large_schedule):
+    queryset = _view(ClassListView).get_queryset()
+
+    assert _sequential_scans(queryset) == []
+
+
+def test_class_detail_uses_index(large_schedule):
+    classes, _ = large_schedule
+    queryset = _view(ClassDetailView, pk=classes[-1].pk).get_queryset().filter(pk=classes[-1].pk)
+
+    assert _sequential_scans(queryset) == []
+
+
+def test_booking_list_uses_index(large_schedule):
+    _, members = large_schedule
+    queryset = _view(BookingListView, user=members[0]).get_queryset()
+
+    assert _sequential_scans(queryset) == []
@@ -0,0 +1,91 @@
+"""Read-replica routing: the router and the sticky-primary middleware."""
+import pytest
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from config import middleware
+from config.middleware import ReplicaRoutingMiddleware
+from config.routers import PrimaryReplicaRouter, allow_replica_reads, reset_replica_reads
+from src.classes.models import GymClass
+
+pytestmark = pytest.mark.unit
+
+router = PrimaryReplicaRouter()
+
+
+@pytest.fixture
+def replica():
+    # The router only names the database; no replica connection is opened.
+    with override_settings(DATABASE_ROUTERS=['config.routers.PrimaryReplicaRouter'], REPLICA_STICKY_SECONDS=5):
+        yield
+
+
+def read_db_during(method, session, path='/classes/'):
+    """Run a request through the middleware and return where a GymClass read would go."""
+    seen = {}
+
+    def view(request):
+        seen['read'] = router.db_for_read(GymClass)
+        seen['session'] = router.db_for_read(Session)
+        return HttpResponse()
+
+    request = getattr(RequestFactory(), method)(path)
+    request.session = session
+    ReplicaRoutingMiddleware(view)(request)
+    return seen
+
+
+def test_reads_outside_a_request_use_the_primary(replica):
+    assert router.db_for_read(GymClass) == 'default'
+
+
+def test_writes_and_migrations_use_the_primary(replica):
+    token = allow_replica_reads()
+    try:
+        assert router.db_for_write(GymClass) == 'default'
+    finally:
+        reset_replica_reads(token)
+    assert router.allow_migrate('default', 'classes') is True
+    assert router.allow_migrate('replica', 'classes') is False
+
+
+def test_safe_request_reads_from_the_replica_but_sessions_from_the_primary(replica):
+    seen = read_db_during('get', SessionStore())
+
+    assert seen == {'read': 'replica', 'session': 'default'}
+    # The flag does not leak out of the request.
+    assert router.db_for_read(GymClass) == 'default'
+
+
+def test_write_request_stays_on_the_primary_and_sticks_the_session(replica, monkeypatch):
+    monkeypatch.setattr(middleware.time, 'time', lambda: 1000.0)
+    session = SessionStore()
+
+    assert read_db_during('post', session)['read'] == 'default'
+    assert session[middleware.PRIMARY_UNTIL_SESSION_KEY] == 1005.0
+    # Read-your-writes: the redirect after the POST reads from the primary.
+    assert read_db_during('get', session)['read'] == 'default'
+
+    monkeypatch.setattr(middleware.time, 'time', lambda: 1005.5)
+    assert read_db_during('get', session)['read'] == 'replica'
+
+
+def test_failed_write_request_does_not_stick(replica):
+    session = SessionStore()
+
+    def rejected(request):
+        return HttpResponse(status=403)
+
+    request = RequestFactory().post('/bookings/book/1/')
+    request.session = session
+    ReplicaRoutingMiddleware(rejected)(request)
+
+    assert middleware.PRIMARY_UNTIL_SESSION_KEY not in session
+
+
+def test_middleware_is_unused_without_a_replica():
+    with pytest.raises(MiddlewareNotUsed):
+        ReplicaRoutingMiddleware(lambda request: HttpResponse())
@@ -0,0 +1,45 @@
+import pytest
+
+from tests.test_settings_security import _run_settings_check
+
+pytestmark = pytest.mark.unit
+
+PRINT_CACHE = (
+    'import django, os; os.environ["DJANGO_SETTINGS_MODULE"]="config.settings"; django.setup(); '
+    'from django.conf import settings; print(settings.CACHES["default"]["BACKEND"])'
+)
+PRODUCTION = {
+    'ENVIRONMENT': 'production',
+    'SECRET_KEY': 'valid-50-character-secret-key-that-is-very-long-and-secure',
+    'DEBUG': 'False',
+    'ALLOWED_HOSTS': 'example.com',
+}
+
+
+def test_production_defaults_to_the_shared_file_cache():
+    code, stdout, stderr = _run_settings_check({**PRODUCTION, 'CACHE_BACKEND': None}, python_code=PRINT_CACHE)
+
+    assert code == 0, f'Setup failed: {stderr}'
+    assert stdout == 'django.core.cache.backends.filebased.FileBasedCache'
+
+
+def test_development_defaults_to_locmem():
+    code, stdout, stderr = _run_settings_check(
+        {'ENVIRONMENT': 'development', 'CACHE_BACKEND': None}, python_code=PRINT_CACHE,
+    )
+
+    assert code == 0, f'Setup failed: {stderr}'
+    assert stdout == 'django.core.cache.backends.locmem.LocMemCache'
+
+
+def test_production_rejects_locmem_with_several_workers():
+    code, stdout, stderr = _run_settings_check({**PRODUCTION, 'CACHE_BACKEND': 'locmem', 'GUNICORN_WORKERS': '3'})
+
+    assert code != 0
+    assert 'CACHE_BACKEND=locmem gives each Gunicorn worker its own page cache' in stderr
+
+
+def test_production_allows_locmem_with_one_worker():
+    code, stdout, stderr = _run_settings_check({**PRODUCTION, 'CACHE_BACKEND': 'locmem', 'GUNICORN_WORKERS': '1'})
+
+    assert code == 0, f'Setup failed: {stderr}'
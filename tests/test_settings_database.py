@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from tests.test_settings_security import _run_settings_check
+
+pytestmark = pytest.mark.unit
+
+PRINT_DATABASE = (
+    'import django, json, os; os.environ["DJANGO_SETTINGS_MODULE"]="config.settings"; django.setup(); '
+    'from django.conf import settings; db = settings.DATABASES["default"]; '
+    'print(json.dumps({"max_age": db["CONN_MAX_AGE"], "health_checks": db["CONN_HEALTH_CHECKS"], '
+    '"pool": db.get("OPTIONS", {}).get("pool")}))'
+)
+
+
+def _database_settings(env_overrides):
+    code, stdout, stderr = _run_settings_check(env_overrides, python_code=PRINT_DATABASE)
+    assert code == 0, f'Setup failed: {stderr}'
+    return json.loads(stdout)
+
+
+def test_persistent_connections_are_on_by_default():
+    db = _database_settings({
+        'APP_SERVER': None, 'DB_CONN_MAX_AGE': None, 'DB_CONN_HEALTH_CHECKS': None, 'DB_POOL': None,
+    })
+
+    assert db == {'max_age': 60, 'health_checks': True, 'pool': None}
+
+
+def test_persistent_connections_are_configurable():
+    db = _database_settings({'DB_CONN_MAX_AGE': '0', 'DB_CONN_HEALTH_CHECKS': 'False', 'DB_POOL': None})
+
+    assert db['max_age'] == 0
+    assert db['health_checks'] is False
+
+
+def test_asgi_disables_persistent_connections():
+    db = _database_settings({'APP_SERVER': 'asgi', 'DB_CONN_MAX_AGE': '60', 'DB_POOL': None})
+
+    assert db['max_age'] == 0
+
+
+def test_pool_is_sized_from_gunicorn_threads():
+    db = _database_settings({
+        'DB_POOL': 'True',
+        'GUNICORN_THREADS': '4',
+        'DB_POOL_MIN_SIZE': None,
+        'DB_POOL_MAX_SIZE': None,
+        'DB_POOL_TIMEOUT': None,
+    })
+
+    assert db['pool'] == {'min_size': 1, 'max_size': 4, 'timeout': 10.0}
+    assert db['max_age'] == 0
+
+
+def test_pool_rejects_max_size_below_min_size():
+    code, stdout, stderr = _run_settings_check({
+        'DB_POOL': 'True',
+        'DB_POOL_MIN_SIZE': '4',
+        'DB_POOL_MAX_SIZE': '2',
+    })
+
+    assert code != 0
+    assert 'DB_POOL_MAX_SIZE must not be smaller than DB_POOL_MIN_SIZE.' in stderr
+
+
+PRINT_REPLICA = (
+    'import django, json, os; os.environ["DJANGO_SETTINGS_MODULE"]="config.settings"; django.setup(); '
+    'from django.conf import settings; replica = settings.DATABASES.get("replica"); '
+    'print(json.dumps({"replica": replica and {"host": replica["HOST"], "port": replica["PORT"], '
+    '"name": replica["NAME"], "mirror": replica["TEST"]["MIRROR"]}, "routers": settings.DATABASE_ROUTERS}))'
+)
+
+
+def test_no_replica_by_default():
+    code, stdout, stderr = _run_settings_check({'DB_REPLICA_HOST': None}, python_code=PRINT_REPLICA)
+
+    assert code == 0, stderr
+    assert json.loads(stdout) == {'replica': None, 'routers': []}
+
+
+def test_replica_host_adds_a_routed_replica():
+    code, stdout, stderr = _run_settings_check(
+        {'DB_REPLICA_HOST': 'db-replica', 'DB_REPLICA_PORT': None}, python_code=PRINT_REPLICA,
+    )
+
+    assert code == 0, stderr
+    assert json.loads(stdout) == {
+        'replica': {'host': 'db-replica', 'port': '5432', 'name': 'gym_db', 'mirror': 'default'},
+        'routers': ['config.routers.PrimaryReplicaRouter'],
+    }
@@ -0,0 +1,89 @@
+import gzip
+import json
+
+import pytest
+from django.core.management import call_command
+
+from config import storage
+from tests.test_settings_security import _run_settings_check
+
+pytestmark = pytest.mark.unit
+
+CSS = 'body { background: url("../img/logo.svg"); }\n' + '.card { padding: 1rem; margin: 0 auto; }\n' * 20
+SVG = '<svg xmlns="http://www.w3.org/2000/svg">' + '<rect width="1" height="1"/>' * 20 + '</svg>'
+
+
+@pytest.fixture
+def collected(settings, tmp_path):
+    """Run collectstatic with the production storage over a small source tree and return STATIC_ROOT."""
+    source = tmp_path / 'static'
+    (source / 'css').mkdir(parents=True)
+    (source / 'img').mkdir()
+    (source / 'css' / 'main.css').write_text(CSS)
+    (source / 'css' / 'tiny.css').write_text('p { margin: 0; }')
+    (source / 'img' / 'logo.svg').write_text(SVG)
+    (source / 'img' / 'photo.png').write_bytes(b'\x89PNG' + bytes(range(256)) * 4)
+    settings.STATICFILES_DIRS = [source]
+    settings.STATICFILES_FINDERS = ['django.contrib.staticfiles.finders.FileSystemFinder']
+    settings.STATIC_ROOT = tmp_path / 'staticfiles'
+    settings.STORAGES = {
+        **settings.STORAGES,
+        'staticfiles': {'BACKEND': 'config.storage.CompressedManifestStaticFilesStorage'},
+    }
+    call_command('collectstatic', interactive=False, verbosity=0)
+    return settings.STATIC_ROOT
+
+
+def _manifest(root):
+    return json.loads((root / 'staticfiles.json').read_text())['paths']
+
+
+def test_collectstatic_writes_hashed_names(collected):
+    paths = _manifest(collected)
+
+    hashed_css = paths['css/main.css']
+    assert hashed_css != 'css/main.css'
+    # References inside CSS point at the hashed file too.
+    assert paths['img/logo.svg'].split('/')[-1] in (collected / hashed_css).read_text()
+
+
+def test_collectstatic_writes_gzip_siblings_of_hashed_text_assets(collected):
+    paths = _manifest(collected)
+    hashed_css = collected / paths['css/main.css']
+
+    assert gzip.decompress((collected / f'{paths["css/main.css"]}.gz').read_bytes()) == hashed_css.read_bytes()
+    assert (collected / f'{paths["img/logo.svg"]}.gz').exists()
+    # Unhashed originals are never referenced, so they get no copies.
+    assert not (collected / 'css' / 'main.css.gz').exists()
+
+
+def test_collectstatic_skips_tiny_and_binary_files(collected):
+    paths = _manifest(collected)
+
+    assert not (collected / f'{paths["css/tiny.css"]}.gz').exists()
+    assert not (collected / f'{paths["img/photo.png"]}.gz').exists()
+
+
+def test_collectstatic_writes_brotli_siblings(collected):
+    brotli = pytest.importorskip('brotli')
+    name = _manifest(collected)['css/main.css']
+
+    assert brotli.decompress((collected / f'{name}.br').read_bytes()) == (collected / name).read_bytes()
+
+
+def test_compressed_copies_drop_encodings_that_do_not_shrink(monkeypatch):
+    monkeypatch.setattr(storage, 'brotli', None)
+
+    assert storage.compressed_copies(b'x' * 1000).keys() == {'.gz'}
+    assert storage.compressed_copies(bytes(range(256))) == {}
+
+
+def test_production_uses_the_compressed_manifest_storage():
+    code, stdout, stderr = _run_settings_check(
+        {'ENVIRONMENT': 'production', 'SECRET_KEY': 'a-strong-production-secret-key-0123456789'},
+        'import os; os.environ["DJANGO_SETTINGS_MODULE"]="config.settings"; '
+        'from django.conf import settings; print(settings.STORAGES["staticfiles"]["BACKEND"])',
+    )
+
+    assert code == 0, stderr
+    assert stdout.strip() == 'config.storage.CompressedManifestStaticFilesStorage'